@@ -0,0 +1,60 @@
+"""
+In this script we benchmark Bernstein's batch gcd of the product_tree module against the pairwise
+gcds, to find the RSA moduli of a set which share a prime, for growing numbers of moduli
+    Usage: python benchmarks/bench_batch_gcd.py [bits of the moduli] [numbers of moduli...]
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import time
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.modular_arithmetic import gcd
+from rsa.product_tree import batch_gcd
+from utils.prime_utils import gen_rsa_prime
+
+
+def pairwise_gcd(moduli: list) -> list:
+    """
+    The quadratic method: the gcd of every pair of moduli
+    """
+    res = [1] * len(moduli)
+    for i in range(len(moduli)):
+        for j in range(i + 1, len(moduli)):
+            g = gcd(moduli[i], moduli[j])
+            if g != 1:
+                res[i], res[j] = g, g
+    return res
+
+
+def main():
+    bits = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    counts = [int(count) for count in sys.argv[2:]] or [50, 100, 200, 400]
+
+    # A pool of primes, the last modulus shares a prime with the first one
+    primes = [gen_rsa_prime(bits // 2) for _ in range(2 * max(counts) + 1)]
+
+    print(f"===== Batch gcd benchmark, {bits} bits moduli =====")
+    print(f"{'| moduli':<10} | {'pairwise (s)':<13} | {'batch (s)':<10} | {'speedup':<8}")
+    print("-" * 50)
+
+    for count in counts:
+        moduli = [primes[2 * i] * primes[2 * i + 1] for i in range(count - 1)] + [primes[0] * primes[-1]]
+
+        start = time.perf_counter()
+        pairwise = pairwise_gcd(moduli)
+        pairwise_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = batch_gcd(moduli)
+        batch_time = time.perf_counter() - start
+
+        assert [g != 1 for g in pairwise] == [g != 1 for g in batch]
+        print(f"| {count:<8} | {pairwise_time:<13.3f} | {batch_time:<10.3f} | {pairwise_time / batch_time:<8.1f}")
+
+    return 
+
+
+if __name__ == "__main__":
+    main() 
@@ -0,0 +1,48 @@
+"""
+In this script we benchmark the division engine of the modular_arithmetic module (euclidian_div)
+against the builtin divmod of python, for divisors from 512 to 4096 bits and dividends of twice
+that size (the typical case of a reduction modulo an RSA modulus)
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import random
+import timeit
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.modular_arithmetic import euclidian_div
+
+
+def ops_per_sec(func, a, b, repeat = 5) -> float:
+    """
+    Returns the number of calls per second of func(a, b), taking the best of several runs
+    """
+    number = 1
+    # We increase the number of calls until a run takes at least 0.2 seconds
+    while timeit.timeit(lambda: func(a, b), number = number) < 0.2:
+        number *= 2
+
+    best = min(timeit.repeat(lambda: func(a, b), number = number, repeat = repeat))
+    return number / best
+
+
+def main():
+    print("===== Division benchmark : operations per second =====")
+    print(f"{'| bits':<8} | {'euclidian_div':<15} | {'builtin divmod':<15} | {'ratio':<8}")
+    print("-" * 56)
+
+    for bits in [512, 1024, 2048, 3072, 4096]:
+        b = random.getrandbits(bits) | (1 << (bits - 1))
+        a = random.getrandbits(2 * bits)
+
+        ours = ops_per_sec(euclidian_div, a, b)
+        builtin = ops_per_sec(divmod, a, b)
+
+        print(f"| {bits:<6} | {ours:<15.0f} | {builtin:<15.0f} | {builtin / ours:<8.1f}")
+
+    return 
+
+
+if __name__ == "__main__":
+    main() 
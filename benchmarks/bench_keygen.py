@@ -0,0 +1,65 @@
+"""
+In this script we benchmark the RSA key generation pipeline of prime_utils (generate_keypair),
+reporting the number of keys generated per minute for each modulus size, and the number of
+Miller-Rabin tests needed per prime, with and without the incremental sieve search
+    Usage: python benchmarks/bench_keygen.py [number of keys per size] [sizes...]
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import time
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import secrets
+
+from utils.prime_utils import generate_keypair, incremental_prime_search, is_prime
+
+
+def _tests_without_sieve(bits: int) -> int:
+    """
+    The number of Miller-Rabin tests to find a prime by testing consecutive odd numbers
+    """
+    n, tests = secrets.randbits(bits) | (1 << (bits - 1)) | 1, 1
+    while not is_prime(n, "miller-rabin"):
+        n, tests = n + 2, tests + 1
+    return tests
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sizes = [int(bits) for bits in sys.argv[2:]] or [1024, 2048, 4096]
+
+    print("===== Key generation benchmark =====")
+    print(f"{'| bits':<8} | {'keys':<6} | {'mean (s)':<10} | {'worst (s)':<10} | {'keys / min':<10}")
+    print("-" * 56)
+
+    for bits in sizes:
+        times = []
+        for _ in range(count):
+            start = time.perf_counter()
+            generate_keypair(bits)
+            times.append(time.perf_counter() - start)
+
+        mean = sum(times) / len(times)
+        print(f"| {bits:<6} | {count:<6} | {mean:<10.2f} | {max(times):<10.2f} | {60 / mean:<10.1f}")
+
+    print()
+    print("===== Miller-Rabin tests per prime =====")
+    print(f"{'| bits':<8} | {'primes':<6} | {'no sieve':<10} | {'incremental':<11} | {'ratio':<6}")
+    print("-" * 52)
+
+    for bits in sizes:
+        half = bits // 2
+        stats = {}
+        naive = sum(_tests_without_sieve(half) for _ in range(count)) / count
+        for _ in range(count):
+            incremental_prime_search(half, stats = stats)
+        sieved = stats["tests"] / count
+        print(f"| {half:<6} | {count:<6} | {naive:<10.1f} | {sieved:<11.1f} | {naive / sieved:<6.1f}")
+
+    return 
+
+
+if __name__ == "__main__":
+    main() 
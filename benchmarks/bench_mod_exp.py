@@ -0,0 +1,42 @@
+"""
+In this script we benchmark the sliding window modular expenentiation of the modular_arithmetic
+module (mod_exp) against the builtin pow, for private key sized exponents on 1024 to 4096 bits moduli,
+the influence of the window size and of a precomputed Montgomery context
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import random
+import timeit
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.modular_arithmetic import mod_exp, MontgomeryContext
+
+
+def main():
+    print("===== Modular exponentiation benchmark : milliseconds per operation =====")
+    print(f"{'| bits':<8} | {'window':<8} | {'mod_exp':<10} | {'builtin pow':<12} | {'ratio':<8}")
+    print("-" * 58)
+
+    for bits in [1024, 2048, 3072, 4096]:
+        n = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        a = random.getrandbits(bits - 1)
+        d = random.getrandbits(bits)
+        number = max(1, 4096 // bits)
+
+        builtin = timeit.timeit(lambda: pow(a, d, n), number = number) / number
+        for window in [1, 4, None]:
+            ours = timeit.timeit(lambda: mod_exp(a, d, n, window), number = number) / number
+            label = "auto" if window is None else str(window)
+            print(f"| {bits:<6} | {label:<8} | {ours * 1000:<10.2f} | {builtin * 1000:<12.2f} | {ours / builtin:<8.1f}")
+
+        ctx = MontgomeryContext(n)
+        ours = timeit.timeit(lambda: mod_exp(a, d, n, context = ctx), number = number) / number
+        print(f"| {bits:<6} | {'mont':<8} | {ours * 1000:<10.2f} | {builtin * 1000:<12.2f} | {ours / builtin:<8.1f}")
+
+    return 
+
+
+if __name__ == "__main__":
+    main() 
@@ -0,0 +1,50 @@
+"""
+In this script we benchmark the multiplication backends of the multiplication module (schoolbook,
+karatsuba and toom-3 on limb arrays) against the builtin multiplication of python, for operands 
+from 256 to 16384 bits, after tuning the crossover thresholds on the running machine
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import random
+import timeit
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.multiplication import *
+
+
+def us_per_op(func, a, b) -> float:
+    """
+    Returns the time of a call func(a, b) in microseconds, taking the best of several runs
+    """
+    number = 1
+    # We increase the number of calls until a run takes at least 0.1 seconds
+    while timeit.timeit(lambda: func(a, b), number = number) < 0.1:
+        number *= 2
+
+    return min(timeit.repeat(lambda: func(a, b), number = number, repeat = 3)) / number * 1e6
+
+
+def main():
+    karatsuba, toom3 = tune_thresholds()
+    print(f"Tuned thresholds : karatsuba from {karatsuba} limbs, toom-3 from {toom3} limbs ({LIMB_BITS} bits limbs)")
+
+    names = ["builtin", "schoolbook", "karatsuba", "toom3"]
+    print("===== Multiplication benchmark : microseconds per operation (ratio to builtin) =====")
+    print(f"{'| bits':<8} | " + " | ".join(f"{name:<18}" for name in names))
+    print("-" * 90)
+
+    bits = 256
+    while bits <= 16384:
+        a, b = random.getrandbits(bits), random.getrandbits(bits)
+        times = [us_per_op(get_backend(name), a, b) for name in names]
+        row = " | ".join(f"{t:<9.1f} ({t / times[0]:<6.0f})" for t in times)
+        print(f"| {bits:<6} | {row}")
+        bits *= 2
+
+    return 
+
+
+if __name__ == "__main__":
+    main() 
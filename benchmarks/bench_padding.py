@@ -0,0 +1,63 @@
+"""
+In this script we benchmark the encryption paddings against the RSA encryption they precede: the
+time to encode one block (in batches, the PKCS#1 v1.5 padding drawing on the buffered random pool,
+OAEP hashing with MGF1) and to decode it, next to the time to encrypt it with the public key, for
+growing key sizes. The single block pad_pkcs1 is also timed against its batch version.
+    Usage: python benchmarks/bench_padding.py [key sizes in bits...]
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import time
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.rsa_pkcs1 import get_padding
+from utils.padding_pkcs1 import pad_pkcs1
+from utils.prime_utils import generate_keypair
+
+
+def per_block(fn, blocks: int, number: int = 20) -> float:
+    """
+    The time per block (in microseconds) of a function processing 'blocks' blocks per call
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / (number * blocks) * 1e6
+
+
+def main():
+    sizes = [int(bits) for bits in sys.argv[1:]] or [1024, 2048, 4096]
+
+    print("===== Encryption paddings against the encryption, time per block =====")
+    print(f"{'| bits':<8} | {'padding':<12} | {'encode (us)':<12} | {'decode (us)':<12} | {'encrypt (us)':<13} | {'overhead':<8}")
+    print("-" * 82)
+
+    for bits in sizes:
+        key = generate_keypair(bits).public_key()
+        k = (key.n.bit_length() + 7) >> 3
+
+        for name in ["pkcs1", "oaep-sha256", "oaep-sha512"]:
+            scheme = get_padding(name)
+            if k <= scheme.overhead:
+                continue
+
+            plains = [os.urandom(k - scheme.overhead) for _ in range(64)]
+            encoded = scheme.encode_many(plains, k)
+            ms = [int.from_bytes(block, "big") for block in encoded]
+
+            encode = per_block(lambda: scheme.encode_many(plains, k), 64)
+            decode = per_block(lambda: scheme.decode_many(encoded, k), 64)
+            encrypt = per_block(lambda: key.encrypt_many(ms), 64, number = 2)
+
+            print(f"| {bits:<6} | {name:<12} | {encode:<12.2f} | {decode:<12.2f} | {encrypt:<13.1f} | {(encode + decode) / encrypt:<8.2%}")
+
+        single = per_block(lambda: [pad_pkcs1(plain, k) for plain in plains], 64)
+        print(f"| {bits:<6} | {'pad_pkcs1':<12} | {single:<12.2f} | {'':<12} | {'':<13} |")
+
+    return 
+
+
+if __name__ == "__main__":
+    main()
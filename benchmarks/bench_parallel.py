@@ -0,0 +1,85 @@
+"""
+In this script we benchmark the process pool layer (rsa_parallel) : we decrypt a batch of 
+ciphertexts with an increasing number of workers and report the scaling curve, i.e the 
+speedup and the parallel efficiency relative to a single worker. We also compare the latency 
+of a single decryption with its half expenentiations run sequentially and concurrently, and the
+throughput of a file encryption streamed in this process and memory mapped on a process pool.
+    Usage: python benchmarks/bench_parallel.py [modulus bits] [number of ciphertexts]
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import random
+import tempfile
+import time
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.rsa_parallel import *
+from rsa.rsa_txt import encrypt_file, encrypt_file_mmap
+
+
+def main():
+    bits = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    cores = os.cpu_count() or 1
+
+    # We generate the key with the pool itself
+    with RSAPool(max_workers = cores) as pool:
+        start = time.perf_counter()
+        p, q = pool.find_primes(2, bits // 2)
+        print(f"Found two {bits // 2} bits primes in {time.perf_counter() - start:.2f}s on {cores} workers")
+
+    key = RSAPrivateKey(p, q)
+    cs = rsa_enc_many([random.randrange(2, key.n) for _ in range(count)], key)
+
+    print(f"===== Parallel decryption of {count} ciphertexts, {bits} bits modulus =====")
+    print(f"{'| workers':<10} | {'time (s)':<10} | {'ops/s':<10} | {'speedup':<8} | {'efficiency':<10}")
+    print("-" * 60)
+
+    workers, base = 1, None
+    while workers <= cores:
+        with RSAPool(key, max_workers = workers) as pool:
+            pool.decrypt_many(cs[:workers])    # Warming up the workers
+            start = time.perf_counter()
+            pool.decrypt_many(cs)
+            elapsed = time.perf_counter() - start
+
+        base = base or elapsed
+        print(f"| {workers:<8} | {elapsed:<10.2f} | {count / elapsed:<10.1f} | {base / elapsed:<8.2f} | {base / elapsed / workers:<10.2f}")
+        workers = workers * 2 if workers * 2 <= cores or workers == cores else cores
+
+    print(f"===== Latency of a single decryption, {bits} bits modulus =====")
+    start = time.perf_counter()
+    for c in cs[:8]:
+        key.decrypt(c)
+    print(f"Sequential halves : {(time.perf_counter() - start) / 8 * 1000:.2f} ms")
+
+    with RSAPool(key, max_workers = len(key.primes)) as pool:
+        pool.decrypt(cs[0])    # Warming up the workers
+        start = time.perf_counter()
+        for c in cs[:8]:
+            pool.decrypt(c)
+        print(f"Concurrent halves on {len(key.primes)} processes : {(time.perf_counter() - start) / 8 * 1000:.2f} ms")
+
+    print(f"===== Encryption of a 4 MB file, {bits} bits modulus =====")
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "plain"), os.path.join(tmp, "cipher")
+        with open(src, "wb") as f:
+            f.write(os.urandom(4 << 20))
+
+        start = time.perf_counter()
+        encrypt_file(src, dst, key)
+        elapsed = time.perf_counter() - start
+        print(f"Streamed in this process : {4 / elapsed:.2f} MB/s")
+
+        start = time.perf_counter()
+        encrypt_file_mmap(src, dst, key, max_workers = cores)
+        elapsed = time.perf_counter() - start
+        print(f"Memory mapped on {cores} workers : {4 / elapsed:.2f} MB/s")
+
+    return 
+
+
+if __name__ == "__main__":
+    main() 
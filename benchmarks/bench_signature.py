@@ -0,0 +1,62 @@
+"""
+In this script we benchmark the signatures of PKCS#1: the signing on the CRT path of the private key
+against the verification, whose public expenentiation s^65537 mod n is done by the sliding window 
+of mod_exp and by the short ladder of fermat_exp (16 squarings and one multiplication), and the 
+batch verification of many signatures, one ladder per signature or a single product test.
+    Usage: python benchmarks/bench_signature.py [key sizes in bits...]
+"""
+import os   # To add the path of our modules to the python path 
+import sys 
+import time
+
+# Adding the modules' path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.rsa_pkcs1 import *
+from utils.prime_utils import generate_keypair
+
+
+def per_call(fn, count: int = 1, number: int = 20) -> float:
+    """
+    The time per item (in microseconds) of a function processing 'count' items per call
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - start) / (number * count) * 1e6
+
+
+def main():
+    sizes = [int(bits) for bits in sys.argv[1:]] or [1024, 2048, 4096]
+    batch = 64
+
+    print("===== Signing and verifying, time per signature =====")
+    print(f"{'| bits':<8} | {'scheme':<8} | {'sign (us)':<10} | {'mod_exp (us)':<12} | {'ladder (us)':<11} | {'verify (us)':<11} | {'batch (us)':<10} | {'screening (us)':<14}")
+    print("-" * 108)
+
+    for bits in sizes:
+        key = generate_keypair(bits)
+        public = key.public_key()
+        messages = [os.urandom(64) for _ in range(batch)]
+
+        for name in ["pkcs1", "pss"]:
+            signatures = sign_many(messages, key, name)
+            ss = [int.from_bytes(signature, "big") for signature in signatures]
+
+            signing = per_call(lambda: sign(messages[0], key, name), number = 5)
+            window = per_call(lambda: [mod_exp(s, public.e, public.n, context = public.context_n) for s in ss], batch, number = 3)
+            ladder = per_call(lambda: public.encrypt_many(ss), batch, number = 3)
+            single = per_call(lambda: verify(messages[0], signatures[0], public, name), number = 50)
+            many = per_call(lambda: verify_many(messages, signatures, public, name), batch, number = 3)
+
+            screening = ""
+            if name == "pkcs1":
+                screening = f"{per_call(lambda: verify_many(messages, signatures, public, name, screening = True), batch, number = 3):.1f}"
+
+            print(f"| {bits:<6} | {name:<8} | {signing:<10.1f} | {window:<12.1f} | {ladder:<11.1f} | {single:<11.1f} | {many:<10.1f} | {screening:<14}")
+
+    return 
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,47 @@
 In this python script we show how our raw and padded RSA algorithms operate on text messages of diffirent sizes,
 with diffirent keys, i.e showcasing the functionality of the RSA algorithm
 """
-import os   # To add the path of our modules to the python path 
-import sys 
+import os   # To add the path of our modules to the python path
+import sys
+import io
 
-# Adding the modules' path 
+# Adding the modules' path
 parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(parent_dir)
 
-# We import our modules for encryption with the RSA and padding 
-
+# We import our modules for encryption with the RSA and padding
+from rsa.rsa_txt import *
+from utils.prime_utils import generate_keypair
+from utils.text_message_utils import long_to_bytes, bytes_to_long
 
 
 def main():
-    
+    print("===== The raw RSA on a short message, read as a single integer ======")
+    key = RSAPrivateKey(759902534011993492390886979244737626978083, 1462428735316547974645342609)
+    m = long_to_bytes("Hello, World!")
+    c = key.public_key().encrypt(m)
+    print(c)
+    print(bytes_to_long(key.decrypt(c)))
+
+    print("===== The padded RSA on a text message, cut into blocks of k - 11 bytes ======")
+    cipher = encrypt_text("Hello, World! " * 4, key)
+    print(f"{len(cipher)} bytes of cipher text, blocks of {modulus_size(key.n)} bytes")
+    print(decrypt_text(cipher, key))
+
+    print("===== Streaming a larger message with a 1024 bits key ======")
+    key = generate_keypair(1024)
+    message = ("The RSA cryptosystem. " * 1000).encode("utf-8")
+    cipher = io.BytesIO()
+    for block in encrypt_stream(io.BytesIO(message), key):
+        cipher.write(block)
+    print(f"{len(message)} bytes of message, {cipher.tell()} bytes of cipher text")
 
+    cipher.seek(0)
+    print(b"".join(decrypt_stream(cipher, key)) == message)
 
-    return 
+    return
 
 
 
 if __name__ == "__main__":
-    main() 
+    main()
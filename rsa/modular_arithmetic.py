@@ -3,18 +3,142 @@ modular_arithmetic.py
 
 This module contains all necessary functions to perform modular 
 arithmetic for the RSA applications. This includes everything from
-efficient integer multiplication via karatsuba for faster overall computations,
-gcd, extended euclide, modular inversion and etc. 
+fast division, gcd, extended euclide, modular inversion, modular expenentiation and etc. 
+The multiplications can be routed through the karatsuba or toom-3 backends of the 
+multiplication module (the 'mul' argument of mod_exp, MontgomeryContext and CRTBasis).
 
 Functions:
-    - euclidian_div(a, b) : Performs euclidian division on two integers
-    - gcd(a, b) : Computes the gcd of two integers via the euclidian algorithm
+    - euclidian_div(a, b) : Performs euclidian division on two integers (schoolbook limb / Burnikel-Ziegler)
+    - gcd(a, b) : Computes the gcd of two integers via the euclidian algorithm (Lehmer's variant)
     - euclidian_ext(a,b) : Performs the extended euclidian algorithm 
     - mod_inv(a, n) : Finds the modular inverse of an integer modulo an integer 
-    - mod_exp(a, e, n) : Performs fast modular expenetiation  
+    - mod_inv_many(values, n) : Finds many modular inverses with a single inversion
+    - jacobi(a, n) : Computes the Jacobi symbol (a / n)
+    - mod_exp(a, e, n, window, context, mul) : Performs fast modular expenetiation (sliding window)
+    - fermat_exponent(e) / fermat_exp(a, k, n, context) : The short ladder of the exponents 2^k + 1 (3, 65537)
+    - MontgomeryContext(n, mul) : Division free modular multiplications for a fixed odd modulus
+    - CRTBasis(moduli, mul) : Precomputed chinese remainders basis with Garner's recombination
     - chinese_remainders(A, R) : For fast decryption for the RSA
 """
 
+# Size (in bits) of the machine-word "limbs" used by the schoolbook division
+_LIMB_BITS = 64
+
+# Divisor size (in bits) above which the recursive Burnikel-Ziegler division
+# takes over from the schoolbook limb division
+_BZ_THRESHOLD = 2048
+
+
+def _divmod_limbs(a: int, b: int) -> tuple:
+    """
+    Schoolbook long division (Knuth's algorithm D) on 64 bits limbs, for a >= 0 and b > 0.
+    Each quotient limb is estimated from the two leading limbs of the running remainder 
+    divided by the leading limb of the (normalized) divisor, which is off by at most 2, 
+    and then corrected. The cost is O(n²) in the bit length of the operands.
+    """
+    if a < b:
+        return 0, a
+
+    # Normalization: we shift both operands so that the leading limb of b has its top bit set
+    shift = -b.bit_length() % _LIMB_BITS
+    a <<= shift
+    b <<= shift
+
+    n = b.bit_length() // _LIMB_BITS    # Number of limbs of the divisor
+    m = (a.bit_length() + _LIMB_BITS - 1) // _LIMB_BITS - n    # Number of quotient limbs - 1
+    b_top = b >> (_LIMB_BITS * (n - 1))    # Leading limb of the divisor
+    limb_max = (1 << _LIMB_BITS) - 1
+
+    q = 0
+    for j in range(m, -1, -1):
+        b_j = b << (_LIMB_BITS * j)
+
+        # Estimating the quotient limb from the two leading limbs of the remainder
+        q_hat = (a >> (_LIMB_BITS * (j + n - 1))) // b_top
+        if q_hat > limb_max:
+            q_hat = limb_max
+
+        # Subtracting and correcting the estimate (at most twice)
+        a -= q_hat * b_j
+        while a < 0:
+            q_hat -= 1
+            a += b_j
+
+        q = (q << _LIMB_BITS) | q_hat
+
+    # We undo the normalization on the remainder
+    return q, a >> shift
+
+
+def _div2n1n(a: int, b: int, n: int) -> tuple:
+    """
+    Burnikel-Ziegler recursive division of a 2n bits integer a by an n bits integer b, 
+    with the precondition a < 2^n * b. The division is split into two 3n/2 by n 
+    divisions, each of them in turn is reduced to a n by n/2 division.
+    """
+    if n <= _BZ_THRESHOLD:
+        return _divmod_limbs(a, b)
+
+    # We need n to be even to split it in halves
+    pad = n & 1
+    if pad:
+        a <<= 1
+        b <<= 1
+        n += 1
+
+    half_n = n >> 1
+    mask = (1 << half_n) - 1
+    b1, b2 = b >> half_n, b & mask
+
+    q1, r = _div3n2n(a >> n, (a >> half_n) & mask, b, b1, b2, half_n)
+    q2, r = _div3n2n(r, a & mask, b, b1, b2, half_n)
+
+    if pad:
+        r >>= 1
+
+    return (q1 << half_n) | q2, r
+
+
+def _div3n2n(a12: int, a3: int, b: int, b1: int, b2: int, n: int) -> tuple:
+    """
+    Helper of _div2n1n : divides (a12 * 2^n + a3) by b = b1 * 2^n + b2, where 
+    a12 < 2^n * b. The quotient is estimated by dividing a12 by b1 and then corrected.
+    """
+    if a12 >> n == b1:
+        q, r = (1 << n) - 1, a12 - (b1 << n) + b1
+    else:
+        q, r = _div2n1n(a12, b1, n)
+
+    r = ((r << n) | a3) - q * b2
+    while r < 0:
+        q -= 1
+        r += b
+
+    return q, r
+
+
+def _divmod_pos(a: int, b: int) -> tuple:
+    """
+    Division engine for a >= 0 and b > 0, dispatching between the schoolbook limb division
+    for small divisors, and the Burnikel-Ziegler division for large ones. For the latter, 
+    the dividend is cut into chunks of the size of b, which are divided from the most 
+    significant one.
+    """
+    n = b.bit_length()
+    if n <= _BZ_THRESHOLD:
+        return _divmod_limbs(a, b)
+
+    mask = (1 << n) - 1
+    chunks = (a.bit_length() + n - 1) // n
+
+    q, r = 0, 0
+    for i in range(chunks - 1, -1, -1):
+        q_i, r = _div2n1n((r << n) | ((a >> (n * i)) & mask), b, n)
+        q = (q << n) | q_i
+
+    return q, r
+
+
 def euclidian_div(a: int, b: int) -> tuple:
     """
     Performs the euclidian division on two given integers
@@ -23,12 +147,16 @@ def euclidian_div(a: int, b: int) -> tuple:
         q is the quotient 
         r is the remainder ( 0 <= r < |b|)
 
+    The division runs in O(n²) in the bit length of the operands through a schoolbook
+    division on 64 bits limbs, and switches to the Burnikel-Ziegler recursive division
+    for large divisors.
+
     Args:
         a (int) : The devidend
         b (int) : The devisor 
 
     Raises:
-        ValueError : If the divisor 'b' is zero or if either of 'a' and 'b' are negative 
+        ValueError : If the divisor 'b' is zero
 
     Returns:
         tuple : A tuple containing the quotient and the remainder of
@@ -39,6 +167,8 @@ def euclidian_div(a: int, b: int) -> tuple:
     Example:
         >>> euclidian_div(10,3)
         (3,1)
+        >>> euclidian_div(-7,3)
+        (-3,2)
     """
     if b == 0:
         raise ValueError("Divisor must not be zero.")
@@ -47,24 +177,73 @@ def euclidian_div(a: int, b: int) -> tuple:
     abs_a = abs(a)
     abs_b = abs(b)
 
-    q = 0
-    r = abs_a
-
     # Division process
-    while r >= abs_b:
-        r -= abs_b
+    q, r = _divmod_pos(abs_a, abs_b)
+
+    # Adjusting the sign of the quotient and remainder, the remainder stays in [0, |b|)
+    if a < 0 and r != 0:
         q += 1
+        r = abs_b - r
 
-    # Adjusting the sign of the quotient and remainder
-    if (a < 0 and b > 0) or (a > 0 and b < 0):
-        q *= -1
-        if r != 0:
-            r = abs_b - r
+    if (a < 0) != (b < 0):
+        q = -q
 
     return q, r
+# Size (in bits) of the leading digits used by the single precision steps of Lehmer's gcd
+_LEHMER_BITS = 62
+
+
+def _lehmer(a: int, b: int) -> tuple:
+    """
+    Lehmer's extended euclidian algorithm for a, b >= 0. Returns the gcd g and the cofactor u 
+    of a, such that u.a = g mod b. While the operands are large, the quotients of the euclidian 
+    algorithm are simulated on their leading machine-word digits only (Knuth's algorithm L), 
+    and the resulting 2x2 matrix is applied to the full operands once, replacing many full size
+    division steps. The sequence of quotients, and hence u, is the same as the textbook algorithm.
+    """
+    u0, u1 = 1, 0    # The cofactors of a for the current pair (a, b)
+
+    # For a < b, the first step of the algorithm (of quotient 0) swaps them 
+    if a < b:
+        a, b, u0, u1 = b, a, 0, 1
+
+    while b.bit_length() > _LEHMER_BITS:
+        # The leading digits of a and b, at the same position
+        shift = a.bit_length() - _LEHMER_BITS
+        x, y = a >> shift, b >> shift
+
+        # Single precision steps, as long as the quotient is certain given the truncation
+        A, B, C, D = 1, 0, 0, 1
+        while y + C != 0 and y + D != 0:
+            q = (x + A) // (y + C)
+            if q != (x + B) // (y + D):
+                break
+            A, C = C, A - q * C
+            B, D = D, B - q * D
+            x, y = y, x - q * y
+
+        if B == 0:
+            # No quotient could be certified, we do a full division step
+            q, r = euclidian_div(a, b)
+            a, b = b, r
+            u0, u1 = u1, u0 - q * u1
+        else:
+            a, b = A * a + B * b, C * a + D * b
+            u0, u1 = A * u0 + B * u1, C * u0 + D * u1
+
+    # The remaining steps on small operands
+    while b != 0:
+        q, r = euclidian_div(a, b)
+        a, b = b, r
+        u0, u1 = u1, u0 - q * u1
+
+    return a, u0
+
+
 def gcd(a: int, b:int) -> int :
     """
         Perform euclid's algorihtm in order to obtain the gcd of two given integers a, b. 
+        We use Lehmer's variant, which runs the steps on the leading digits of the integers.
 
         Args: 
             a (int): the first integer
@@ -84,10 +263,7 @@ def gcd(a: int, b:int) -> int :
     if (a <= 0) or (b <= 0):
         raise ValueError("The inputs have to be > 0")
 
-    while b != 0 :    # Here we utilize the function we defined previously 
-        a, b = b, euclidian_div(a, b)[1]    # We use the fact the the GCD of a, b is the same as a, a%b
-
-    return a    # When b becomes 0, a is the GCD
+    return _lehmer(a, b)[0]
 
 
 def euclidian_ext(a: int, b: int) -> tuple:
@@ -96,6 +272,8 @@ def euclidian_ext(a: int, b: int) -> tuple:
     integers. i.e, returns the respective values of u,v and gcd, the 
     values in the bezout identity, where : 
         - u.a + v.b = gcd(a,b) 
+    Only the coefficient u is tracked through Lehmer's algorithm, v is 
+    then given by the exact division (gcd(a,b) - u.a) / b
 
     Args : 
         a (int) The first integer
@@ -104,31 +282,30 @@ def euclidian_ext(a: int, b: int) -> tuple:
     Returns : 
         tuple : a tuple containing the values returned by teh extended euclidian 
         algroithm :
+            d (int) : gcd(a,b), non negative
             u (int) : 'a' cofficinet in the bezout identity
             v (int) : 'b' cofficinet in the bezout identity
-            d (int) : gcd(a,b)
     Example : 
-        >>> euclidian_extended(4,11) 
-        (3, -1, 1) 
+        >>> euclidian_ext(4,11) 
+        (1, 3, -1) 
     """
-    
-    # Coefficient initilization
-    u0, v0, u1, v1 = 1, 0, 0, 1
+    if b == 0:
+        return (abs(a), 1 if a >= 0 else -1, 0)
 
-    # The iterations 
-    while b != 0:
-        q, r = euclidian_div(a, b)
-        a, b = b, r 
-        u0, u1 = u1, u0 - q * u1 
-        v0, v1 = v1, v0 - q * v1
+    d, u = _lehmer(abs(a), abs(b))
+    if a < 0:
+        u = -u
+    v, _ = euclidian_div(d - u * a, b)
 
-    return a, u0, v0
+    return d, u, v
 
 def mod_inv(a, n) -> int:
     """
     Find the modular inverse of a given integer with respect to 
     a given modulus. Naturally the given integer should be coprime
-    with n
+    with n. A single pass of the extended euclidian algorithm gives 
+    both the gcd and the inverse.
+
     Args:
         a (int) : The given integer to inverse
         n (int) : The modulues
@@ -139,26 +316,325 @@ def mod_inv(a, n) -> int:
     Raises:
         ValueError : if a is not coprime with n (necessary and sufficient for the existence of the inverse) 
     """
-    if gcd(a, n) != 1:
+    if n <= 0:
+        raise ValueError("The modulus has to be > 0")
+
+    d, inverse = _lehmer(euclidian_div(a, n)[1], n)
+    if d != 1:
         raise ValueError(f"{a} and {n} are not coprime, the inverse doesn't exist")
 
-    # We simply return the result given by the extended euclid function taken modulo n 
-    
-    inverse = euclidian_ext(a, n)[0]
     _, inverse = euclidian_div(inverse, n)
 
     return inverse
-def mod_exp(a: int, e: int, n: int) -> int:
+
+
+def mod_inv_many(values: list, n: int) -> list:
+    """
+    Finds the modular inverses of many integers modulo the same n with Montgomery's simultaneous
+    inversion trick: with the prefix products p_i = a1 * ... * ai, a single inversion of p_k 
+    gives all the inverses, 1/ai = p_(i-1) * (1 / p_i), going backwards with 1/p_(i-1) = ai * (1 / p_i). 
+    This costs one inversion and 3(k - 1) multiplications.
+
+    Args:
+        values (list) : The integers to inverse, all coprime with n
+        n (int) : The modulus 
+
+    Returns:
+        inverses (list) : The modular inverses, in order
+
+    Raises:
+        ValueError : if one of the integers is not coprime with n 
+
+    Example:
+        >>> mod_inv_many([2, 3, 4], 7)
+        [4, 5, 2]
+    """
+    values = [euclidian_div(a, n)[1] for a in values]
+    if len(values) == 0:
+        return []
+
+    # The prefix products
+    prefix = [values[0]]
+    for a in values[1:]:
+        prefix.append(euclidian_div(prefix[-1] * a, n)[1])
+
+    try:
+        inv = mod_inv(prefix[-1], n)
+    except ValueError:
+        raise ValueError(f"The integers are not all coprime with {n}, the inverses don't exist")
+
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inverses[i] = euclidian_div(prefix[i - 1] * inv, n)[1]
+        inv = euclidian_div(inv * values[i], n)[1]
+    inverses[0] = inv
+
+    return inverses
+
+
+def jacobi(a: int, n: int) -> int:
+    """
+    Computes the Jacobi symbol (a / n) for an odd n > 0 with the binary algorithm: the factors
+    2 of a are removed with (2 / n) = -1 exactly when n = 3 or 5 mod 8, and the quadratic 
+    reciprocity swaps a and n, changing the sign when both are 3 mod 4. For a prime n, it is 
+    the Legendre symbol: 1 if a is a non zero square modulo n, -1 if it isn't, 0 if n divides a.
+
+    Args:
+        a (int) : The integer 
+        n (int) : The odd modulus > 0
+
+    Returns:
+        symbol (int) : -1, 0 or 1
+
+    Raises:
+        ValueError : if n is even or <= 0 
+
+    Example:
+        >>> jacobi(5, 21), jacobi(2, 7), jacobi(3, 7)
+        (1, 1, -1)
+    """
+    if n <= 0 or n & 1 == 0:
+        raise ValueError("The Jacobi symbol is defined for an odd modulus > 0")
+
+    a = euclidian_div(a, n)[1]
+    symbol = 1
+    while a != 0:
+        # The factors 2 of a
+        twos = (a & -a).bit_length() - 1
+        a >>= twos
+        if twos & 1 and n & 7 in (3, 5):
+            symbol = -symbol
+
+        # Quadratic reciprocity
+        if a & 3 == 3 and n & 3 == 3:
+            symbol = -symbol
+        a, n = euclidian_div(n, a)[1], a
+
+    return symbol if n == 1 else 0
+
+
+def _builtin_mul(x: int, y: int) -> int:
+    """
+    The default multiplication backend, python's own multiplication
+    """
+    return x * y
+
+
+def _window_size(bits: int) -> int:
+    """
+    Chooses the window size of the sliding window exponentiation from the bit length of 
+    the exponent, balancing the size of the odd powers table (2^(k-1) entries) against 
+    the number of multiplications saved (about bits / (k + 1) multiplications)
+    """
+    if bits > 671:
+        return 6
+    if bits > 239:
+        return 5
+    if bits > 79:
+        return 4
+    if bits > 23:
+        return 3
+    if bits > 7:
+        return 2
+    return 1
+
+
+def _window_recode(e: int, window: int = None) -> list:
+    """
+    Recodes a positive exponent for the left to right sliding window method. The exponent 
+    is scanned from its leading bit and cut into windows of at most k bits starting and ending
+    with a 1, separated by runs of zeros. Each step of the result is a pair (s, i) : square s 
+    times then multiply by the i'th odd power a^(2i + 1) (i = None for the trailing squarings).
+    Since it only depends on the exponent, the recoding can be shared by many expenentiations.
+    """
+    if window is None:
+        window = _window_size(e.bit_length())
+
+    bits = bin(e)[2:]    # The binary representation of the exponent, leading bit first
+    steps = []
+    zeros, i, length = 0, 0, len(bits)
+
+    while i < length:
+        if bits[i] == "0":
+            zeros += 1
+            i += 1
+            continue
+
+        # We look for the longest window of at most k bits ending with a 1 
+        j = min(i + window, length)
+        while bits[j - 1] == "0":
+            j -= 1
+
+        steps.append((zeros + j - i, int(bits[i:j], 2) >> 1))
+        zeros, i = 0, j
+
+    if zeros:
+        steps.append((zeros, None))
+
+    return steps
+
+
+def _window_exp(a, e: int, mul, sqr, one, window: int = None, steps: list = None):
+    """
+    Exponentiation engine by the left to right sliding window method, independant of the
+    representation of the elements : mul and sqr are the (reduced) multiplication and squaring, 
+    one is the neutral element. We precompute the odd powers a, a^3, ..., a^(2^k - 1) that the
+    recoding of the exponent uses, then follow its steps. A precomputed recoding (steps) can 
+    be given to skip the scan of the exponent.
+    """
+    if e == 0:
+        return one
+
+    if steps is None:
+        steps = _window_recode(e, window)
+
+    # Precomputing the table of odd powers, up to the largest one used
+    size = max(i for _, i in steps if i is not None) + 1
+    table = [a]
+    if size > 1:
+        a_sqr = sqr(a)
+        for _ in range(size - 1):
+            table.append(mul(table[-1], a_sqr))
+
+    # The leading window starts from the neutral element, we don't need to square it
+    res = table[steps[0][1]]
+    for squarings, i in steps[1:]:
+        for _ in range(squarings):
+            res = sqr(res)
+        if i is not None:
+            res = mul(res, table[i])
+
+    return res
+
+
+class MontgomeryContext:
+    """
+    Montgomery arithmetic modulo a fixed odd integer n. With R = 2^k > n, an integer a is 
+    represented by aR mod n, and the product of two representations is reduced by the
+    REDC algorithm: T -> T * R^(-1) mod n, using only multiplications, masks and shifts 
+    by k bits. The constants R, R² mod n and n' = -n^(-1) mod R are computed once, which 
+    makes it worth it whenever many operations share the same modulus (as in the RSA). 
+
+    Attributes:
+        n (int) : the modulus, odd and > 1
+        k (int) : the bit size of R, i.e R = 2^k 
+        r (int) : R mod n, the representation of 1 
+        r2 (int) : R² mod n, used to convert into the Montgomery representation
+        n_prime (int) : -n^(-1) mod R 
+
+    Args:
+        n (int) : the modulus, odd and > 1
+        mul (callable) : the multiplication backend (see the multiplication module), python's by default
+
+    Example:
+        >>> ctx = MontgomeryContext(13)
+        >>> ctx.from_mont(ctx.mul(ctx.to_mont(5), ctx.to_mont(7)))
+        9
+        >>> ctx.pow(2, 10)
+        10
+    """
+
+    def __init__(self, n: int, mul = None):
+        if n <= 1 or n & 1 == 0:
+            raise ValueError("The modulus of a Montgomery context has to be odd and > 1")
+
+        self.n = n
+        self._mul = mul or _builtin_mul
+        self.k = n.bit_length()
+        self.mask = (1 << self.k) - 1
+
+        # n^(-1) mod 2^k by Newton (Hensel) iterations, the number of correct bits doubles each step
+        inv, bits = 1, 1
+        while bits < self.k:
+            bits <<= 1
+            inv = (inv * (2 - n * inv)) & ((1 << bits) - 1)
+        self.n_prime = (-inv) & self.mask
+
+        self.r = euclidian_div(1 << self.k, n)[1]
+        self.r2 = euclidian_div(self.r * self.r, n)[1]
+
+    def reduce(self, t: int) -> int:
+        """
+        The REDC algorithm, returns t * R^(-1) mod n for 0 <= t < nR
+        """
+        m = self._mul(t & self.mask, self.n_prime) & self.mask
+        t = (t + self._mul(m, self.n)) >> self.k
+        if t >= self.n:
+            t -= self.n
+        return t
+
+    def to_mont(self, a: int) -> int:
+        """
+        Converts an integer to its Montgomery representation aR mod n
+        """
+        if a < 0 or a >= self.n:
+            a = euclidian_div(a, self.n)[1]
+        return self.reduce(self._mul(a, self.r2))
+
+    def from_mont(self, x: int) -> int:
+        """
+        Converts a Montgomery representation back to the integer it represents
+        """
+        return self.reduce(x)
+
+    def mul(self, x: int, y: int) -> int:
+        """
+        Multiplies two Montgomery representations
+        """
+        return self.reduce(self._mul(x, y))
+
+    def sqr(self, x: int) -> int:
+        """
+        Squares a Montgomery representation
+        """
+        return self.reduce(self._mul(x, x))
+
+    def pow(self, a: int, e: int, window: int = None) -> int:
+        """
+        Computes a^e mod n by the sliding window method in the Montgomery domain, 
+        a and the result are given in the usual representation
+        """
+        if e < 0:
+            a, e = mod_inv(euclidian_div(a, self.n)[1], self.n), -e
+
+        x = _window_exp(self.to_mont(a), e, self.mul, self.sqr, self.r, window)
+        return self.from_mont(x)
+
+    def pow_many(self, bases, e: int, window: int = None) -> list:
+        """
+        Computes a^e mod n for every a of an iterable, sharing the recoding of the exponent
+        """
+        if e < 0:
+            return [self.pow(a, e, window) for a in bases]
+
+        steps = _window_recode(e, window) if e else None
+        return [
+            self.from_mont(_window_exp(self.to_mont(a), e, self.mul, self.sqr, self.r, steps = steps))
+            for a in bases
+        ]
+
+
+def mod_exp(a: int, e: int, n: int, window: int = None, context: MontgomeryContext = None, mul = None) -> int:
     """
     Perform fast modular expenentiation on an a give integer, 
     Utilizing the formula (a mod n) ^ n1) * (a mod n) ^ n2 = 
-    (a mod n) ^ (n1 + n2). We will take the expenentation to e/2 
-    each time 
+    (a mod n) ^ (n1 + n2). We use the sliding window method: the exponent
+    is cut into windows of at most k bits, each handled by k squarings and one 
+    multiplication with a precomputed odd power of a. Every product is reduced 
+    modulo n, so the intermediate values never exceed n² 
 
     Args: 
         a (int) : the base of the expenentiation, positive integer
-        e (int) : the expenent, a signed integer
+        e (int) : the expenent, a signed integer (for e < 0, a has to be invertible modulo n)
         n (int) : the modulus of the expenentiation
+        window (int) : the window size k, chosen from the bit length of e if not given
+        context (MontgomeryContext) : a precomputed Montgomery context for n, if given the 
+        reductions are done by REDC instead of divisions
+        mul (callable) : the multiplication backend (see the multiplication module), python's by default
+
+    Raises:
+        ValueError : If the modulus isn't positive or the window size is smaller than 1
+        ValueError : If the given context is not for the modulus n
 
     Returns: 
         res (int) : the result of the modular expenetiation 
@@ -167,22 +643,167 @@ def mod_exp(a: int, e: int, n: int) -> int:
        >>> mod_exp(2,3,5)
         3
     """
+    if n <= 0:
+        raise ValueError("The modulus has to be > 0")
 
-    # Base case step : When e = 0 
-    if e == 0:
-        return 1 
+    if window is not None and window < 1:
+        raise ValueError("The window size has to be >= 1")
 
-    res = 1    # Initializing the result 
+    if context is not None:
+        if context.n != n:
+            raise ValueError("The Montgomery context doesn't match the modulus")
+        return context.pow(a, e, window)
 
-    while (e > 0):
-        if ((euclidian_div(e,2)[1] != 0)):
-            res *= a 
-    
-        # We update the value of the exponent 
-        e = euclidian_div(e, 2)[0] # The quotient of e by 2
-        a = a * a # We update a to a² 
+    a = euclidian_div(a, n)[1]
+
+    # For negative exponents, we exponentiate the inverse 
+    if e < 0:
+        a, e = mod_inv(a, n), -e
+
+    mul = mul or _builtin_mul
+
+    def mul_mod(x, y):
+        return euclidian_div(mul(x, y), n)[1]
+
+    def sqr_mod(x):
+        return euclidian_div(mul(x, x), n)[1]
+
+    return _window_exp(a, e, mul_mod, sqr_mod, euclidian_div(1, n)[1], window)
+
+
+def fermat_exponent(e: int) -> int:
+    """
+    Returns k if the exponent is e = 2^k + 1 with k >= 1 (3, 5, 17, 257 and 65537, the usual RSA
+    public exponents), None otherwise
+
+    Example:
+        >>> fermat_exponent(65537), fermat_exponent(7)
+        (16, None)
+    """
+    if e > 2 and (e - 1) & (e - 2) == 0:
+        return (e - 1).bit_length() - 1
+    return None
+
+
+def fermat_exp(a: int, k: int, n: int, context: MontgomeryContext = None) -> int:
+    """
+    Computes a^(2^k + 1) mod n by k squarings and a single multiplication, a^(2^k) * a, without
+    the recoding, the table and the generic steps of the sliding window. In the Montgomery 
+    domain the REDC of the squarings is inlined, and the last multiplication by a (in the usual 
+    representation) also leaves the domain: (a^(2^k) R) * a * R^(-1) = a^(2^k + 1), so the whole
+    expenentiation costs k + 2 reductions (17 squarings and one multiplication for e = 65537, 
+    counting the conversion into the domain as a squaring by R²).
+
+    Args:
+        a (int) : the base of the expenentiation
+        k (int) : the exponent is 2^k + 1, see fermat_exponent
+        n (int) : the modulus 
+        context (MontgomeryContext) : a precomputed Montgomery context for n, otherwise the 
+        products are reduced by division 
+
+    Raises:
+        ValueError : If the given context is not for the modulus n
+
+    Example:
+        >>> fermat_exp(2, 16, 1000003) == pow(2, 65537, 1000003)
+        True
+    """
+    if context is None:
+        a = euclidian_div(a, n)[1]
+        x = a
+        for _ in range(k):
+            x = euclidian_div(x * x, n)[1]
+        return euclidian_div(x * a, n)[1]
+
+    if context.n != n:
+        raise ValueError("The Montgomery context doesn't match the modulus")
+
+    x = context.to_mont(a)
+    if a < 0 or a >= n:
+        a = euclidian_div(a, n)[1]
+
+    mul, mask, shift, n_prime = context._mul, context.mask, context.k, context.n_prime
+    for _ in range(k):
+        t = mul(x, x)
+        t = (t + mul(mul(t & mask, n_prime) & mask, n)) >> shift
+        x = t - n if t >= n else t
+
+    return context.mul(x, a)
+
+class CRTBasis:
+    """
+    A basis of pairwise coprime moduli for the chinese remainders theorem, with everything 
+    the recombination needs computed once: the partial products P_i = a1 * ... * a(i-1) and the 
+    inverses C_i = P_i^(-1) mod ai. The coprimality is checked once as well, by the existence of 
+    the inverse of the product of the previous moduli (instead of a gcd per pair). 
+    A system of residues is then solved by Garner's mixed radix algorithm: 
+    x = x + P_i * ((mi - x) * C_i mod ai) for every modulus, which is O(k) multiplications
+    and reductions, without any inversion.
+
+    Args:
+        moduli (list) : The pairwise coprime moduli ai, positive integers 
+        mul (callable) : The multiplication backend (see the multiplication module), python's by default
+
+    Raises:
+        ValueError : If the list is empty, or if the moduli are not positive or not all coprime
+
+    Example:
+        >>> basis = CRTBasis([3, 4, 5])
+        >>> basis.combine([2, 3, 1])
+        11
+        >>> basis.combine_many([[2, 3, 1], [0, 0, 1]])
+        [11, 36]
+    """
+
+    def __init__(self, moduli: list, mul = None):
+        moduli = list(moduli)
+        self._mul = mul or _builtin_mul
+        if len(moduli) == 0:
+            raise ValueError("The input cannot be empty")
+
+        self.moduli = moduli
+        self.products = []
+        self.inverses = []
+
+        prod = 1
+        for ai in moduli:
+            if ai <= 0:
+                raise ValueError("The moduli have to be > 0")
+            # The inverse of the previous product exists if and only if ai is coprime with the previous moduli
+            inv = 0
+            if ai > 1:
+                try:
+                    inv = mod_inv(prod, ai)
+                except ValueError:
+                    raise ValueError("The moduli are not all coprime")
+
+            self.products.append(prod)
+            self.inverses.append(inv)
+            prod *= ai
+
+        self.M = prod    # The product of all the moduli 
+
+    def combine(self, residues: list) -> int:
+        """
+        Returns the solution in [0, M) of the system x = mi mod ai given by the residues mi
+        """
+        if len(residues) != len(self.moduli):
+            raise ValueError("The number of remainder and modulos is not equal")
+
+        x = 0
+        for ai, prod, inv, mi in zip(self.moduli, self.products, self.inverses, residues):
+            # The mixed radix digit of x in the basis, and its contribution
+            _, h = euclidian_div(self._mul(mi - x, inv), ai)
+            x += self._mul(prod, h)
+
+        return x
+
+    def combine_many(self, batch) -> list:
+        """
+        Solves many systems sharing this basis, returns the solutions in order
+        """
+        return [self.combine(residues) for residues in batch]
 
-    return euclidian_div (res, n)[1] 
 
 def chinese_remainders(A: list, R: list) -> int:
     """
@@ -190,6 +811,7 @@ def chinese_remainders(A: list, R: list) -> int:
     purpose being to get faster decryption for the RSA. The statement of the theorem for clarity 
     and to uniform notatio: Let the system of modular equations for the ai being pairwise coprime : 
     x = m1 mod a1, x = m2 mod a2 .. x = mn mod an has a unique solution mod M, the prodcut of the miA
+    For many systems with the same moduli, a CRTBasis should be built once instead.
 
     Args: 
         A (list): The array of the the modulies ai 
@@ -211,24 +833,4 @@ def chinese_remainders(A: list, R: list) -> int:
     if len(A) != len(R) :
         raise ValueError("The number of remainder and modulos is not equal")
 
-    if len(A) == 0 :
-        raise ValueError("The input cannot be empty")
-    
-    for i in range(len(A)):
-        for j in range(i + 1, len(A)): 
-            if i != j and gcd(A[i], A[j]) != 1:
-                raise ValueError("The moduli are not all coprime")
-
-    M = 1   # Computing the product of the mi, i.e M 
-    for mi in A:
-        M *= mi 
-
-    x = 0   # Computing the result using the formula in the theorem's proof
-    for i in range(len(A)):
-        ni, _ = euclidian_div(M, A[i])
-        _, invi , _ = euclidian_ext(ni, A[i])
-        x += R[i] * ni * invi 
-
-    # We return the final result modulo M 
-    return euclidian_div(x, M)[1]
-
+    return CRTBasis(A).combine(R)
@@ -0,0 +1,287 @@
+"""
+multiplication.py
+
+This module contains the big integer multiplication algorithms, built from scratch on top of
+machine-word sized limbs, as the pluggable multiplication backends of the modular arithmetic.
+The integers are cut into limbs of 30 bits (little endian), the schoolbook multiplication works
+on these limb arrays, and the Karatsuba and Toom-3 multiplications split the integers on limb
+boundaries, recursing down to the schoolbook one under crossover thresholds (in limbs), which
+can be tuned on the running machine.
+
+Functions:
+    - to_limbs(a) / from_limbs(limbs) : Converts a non negative integer to and from its limb array
+    - mul_schoolbook(a, b) : The O(n²) schoolbook multiplication on limb arrays
+    - mul_karatsuba(a, b) : The O(n^1.58) Karatsuba multiplication
+    - mul_toom3(a, b) : The O(n^1.46) Toom-3 (Toom-Cook) multiplication
+    - get_backend(name) : Returns the multiplication function of a backend
+    - tune_thresholds() : Measures and sets the crossover thresholds between the algorithms
+"""
+
+import operator
+import random
+import time
+
+from rsa.modular_arithmetic import euclidian_div
+
+# Size (in bits) of the limbs
+LIMB_BITS = 30
+_LIMB_MASK = (1 << LIMB_BITS) - 1
+
+# Crossover thresholds (in limbs of the smaller operand), under which the simpler algorithm is used
+KARATSUBA_THRESHOLD = 24
+TOOM3_THRESHOLD = 96
+
+
+def to_limbs(a: int) -> list:
+    """
+    Converts a non negative integer into its array of limbs, least significant first
+
+    Example:
+        >>> to_limbs(2 ** 30 + 5)
+        [5, 1]
+    """
+    limbs = []
+    while a:
+        limbs.append(a & _LIMB_MASK)
+        a >>= LIMB_BITS
+    return limbs
+
+
+def from_limbs(limbs: list) -> int:
+    """
+    Converts an array of limbs, least significant first, back into an integer
+    """
+    a = 0
+    for limb in reversed(limbs):
+        a = (a << LIMB_BITS) | limb
+    return a
+
+
+def _schoolbook(a: int, b: int) -> int:
+    """
+    Schoolbook multiplication of a, b >= 0 on their limb arrays: every limb of a is multiplied
+    by every limb of b, and the carries are propagated along the row
+    """
+    x, y = to_limbs(a), to_limbs(b)
+    if not x or not y:
+        return 0
+
+    res = [0] * (len(x) + len(y))
+    for i, xi in enumerate(x):
+        if xi == 0:
+            continue
+        carry = 0
+        for j, yj in enumerate(y):
+            t = res[i + j] + xi * yj + carry
+            res[i + j] = t & _LIMB_MASK
+            carry = t >> LIMB_BITS
+        res[i + len(y)] = carry
+
+    return from_limbs(res)
+
+
+def _split_bits(a: int, b: int, parts: int) -> int:
+    """
+    The size of the pieces (in bits, a multiple of the limb size) to cut the largest operand into 'parts' pieces
+    """
+    limbs = -(-max(a.bit_length(), b.bit_length()) // LIMB_BITS)
+    return -(-limbs // parts) * LIMB_BITS
+
+
+def _karatsuba(a: int, b: int, base) -> int:
+    """
+    Karatsuba multiplication of a, b >= 0: with a = a1 * X + a0 and b = b1 * X + b0,
+    a * b = z2 * X² + z1 * X + z0, where z1 = (a0 + a1)(b0 + b1) - z2 - z0 only costs one
+    multiplication. Under the threshold, the base multiplication is used
+    """
+    if min(a.bit_length(), b.bit_length()) <= KARATSUBA_THRESHOLD * LIMB_BITS:
+        return base(a, b)
+
+    m = _split_bits(a, b, 2)
+    mask = (1 << m) - 1
+    a1, a0 = a >> m, a & mask
+    b1, b0 = b >> m, b & mask
+
+    z0 = _karatsuba(a0, b0, base)
+    z2 = _karatsuba(a1, b1, base)
+    z1 = _karatsuba(a0 + a1, b0 + b1, base) - z0 - z2
+
+    return (z2 << (2 * m)) + (z1 << m) + z0
+
+
+def _signed(mul, a: int, b: int) -> int:
+    """
+    Applies a multiplication of non negative integers to signed ones
+    """
+    res = mul(abs(a), abs(b))
+    return -res if (a < 0) != (b < 0) else res
+
+
+def _toom3(a: int, b: int) -> int:
+    """
+    Toom-3 multiplication of a, b >= 0: both are cut into 3 pieces, seen as polynomials of
+    degree 2 in X, evaluated at 0, 1, -1, -2 and infinity. The 5 products of the evaluations
+    (instead of 9 products of pieces) determine the product polynomial of degree 4, which is
+    interpolated with Bodrato's sequence, using only exact divisions by 2 and 3
+    """
+    if min(a.bit_length(), b.bit_length()) <= TOOM3_THRESHOLD * LIMB_BITS:
+        return _karatsuba(a, b, _schoolbook)
+
+    m = _split_bits(a, b, 3)
+    mask = (1 << m) - 1
+    a0, a1, a2 = a & mask, (a >> m) & mask, a >> (2 * m)
+    b0, b1, b2 = b & mask, (b >> m) & mask, b >> (2 * m)
+
+    # Evaluations at 1, -1 and -2
+    pa, pb = a0 + a2, b0 + b2
+    a_1, b_1 = pa + a1, pb + b1
+    a_m1, b_m1 = pa - a1, pb - b1
+    a_m2, b_m2 = ((a_m1 + a2) << 1) - a0, ((b_m1 + b2) << 1) - b0
+
+    # Pointwise products
+    r0 = _toom3(a0, b0)
+    r1 = _toom3(a_1, b_1)
+    r_m1 = _signed(_toom3, a_m1, b_m1)
+    r_m2 = _signed(_toom3, a_m2, b_m2)
+    r_inf = _toom3(a2, b2)
+
+    # Interpolation
+    s3, _ = euclidian_div(r_m2 - r1, 3)
+    s1 = (r1 - r_m1) >> 1
+    s2 = r_m1 - r0
+    s3 = ((s2 - s3) >> 1) + (r_inf << 1)
+    s2 = s2 + s1 - r_inf
+    s1 = s1 - s3
+
+    return r0 + (s1 << m) + (s2 << (2 * m)) + (s3 << (3 * m)) + (r_inf << (4 * m))
+
+
+def mul_schoolbook(a: int, b: int) -> int:
+    """
+    Multiplies two integers with the schoolbook multiplication on limb arrays, O(n²)
+
+    Example:
+        >>> mul_schoolbook(-12345678901234567890, 98765432109876543210)
+        -1219326311370217952237463801111263526900
+    """
+    return _signed(_schoolbook, a, b)
+
+
+def mul_karatsuba(a: int, b: int) -> int:
+    """
+    Multiplies two integers with the Karatsuba multiplication, O(n^1.58)
+    """
+    return _signed(lambda x, y: _karatsuba(x, y, _schoolbook), a, b)
+
+
+def mul_toom3(a: int, b: int) -> int:
+    """
+    Multiplies two integers with the Toom-3 multiplication, O(n^1.46), which uses the
+    Karatsuba multiplication under its threshold
+    """
+    return _signed(_toom3, a, b)
+
+
+# The multiplication backends, "builtin" being python's own multiplication
+BACKENDS = {
+    "builtin": operator.mul,
+    "schoolbook": mul_schoolbook,
+    "karatsuba": mul_karatsuba,
+    "toom3": mul_toom3,
+}
+
+
+def get_backend(name: str):
+    """
+    Returns the multiplication function of a backend, to be given as the 'mul' argument
+    of mod_exp, MontgomeryContext or CRTBasis
+
+    Raises:
+        ValueError : If the backend doesn't exist
+
+    Example:
+        >>> mod_exp(3, 1000, 1009, mul = get_backend("karatsuba"))
+        404
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown multiplication backend {name}, the backends are {list(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def _time(mul, a, b, number) -> float:
+    """
+    The time taken by 'number' multiplications of a by b 
+    """
+    start = time.perf_counter()
+    for _ in range(number):
+        mul(a, b)
+    return time.perf_counter() - start
+
+
+def _crossover(slow, fast, start, limit, number) -> int:
+    """
+    Doubles the operand size (in limbs) from 'start' until the fast multiplication beats the slow one
+    """
+    limbs = start
+    while limbs < limit:
+        a = random.getrandbits(limbs * LIMB_BITS)
+        b = random.getrandbits(limbs * LIMB_BITS)
+        if _time(fast, a, b, number) < _time(slow, a, b, number):
+            return limbs
+        limbs *= 2
+    return limit
+
+
+def tune_thresholds(limit: int = 1024, number: int = 3) -> tuple:
+    """
+    Measures the crossover thresholds on the running machine and sets them: the size from which
+    the Karatsuba multiplication beats the schoolbook one, and the Toom-3 one beats Karatsuba
+
+    Args:
+        limit (int) : The largest operand size (in limbs) tried
+        number (int) : The number of multiplications timed per size
+
+    Returns:
+        tuple : The thresholds (KARATSUBA_THRESHOLD, TOOM3_THRESHOLD) in limbs
+    """
+    global KARATSUBA_THRESHOLD, TOOM3_THRESHOLD
+
+    # Measuring Karatsuba with a single level of recursion above the schoolbook multiplication
+    KARATSUBA_THRESHOLD, TOOM3_THRESHOLD = limit, limit
+    karatsuba = _crossover(_schoolbook, lambda x, y: _karatsuba_once(x, y), 4, limit, number)
+    KARATSUBA_THRESHOLD = karatsuba
+
+    toom3 = _crossover(
+        lambda x, y: _karatsuba(x, y, _schoolbook), lambda x, y: _toom3_once(x, y), 2 * karatsuba, limit, number
+    )
+    TOOM3_THRESHOLD = max(toom3, karatsuba)
+
+    return KARATSUBA_THRESHOLD, TOOM3_THRESHOLD
+
+
+def _karatsuba_once(a: int, b: int) -> int:
+    """
+    A single level of Karatsuba above the schoolbook multiplication, for the tuning
+    """
+    m = _split_bits(a, b, 2)
+    mask = (1 << m) - 1
+    a1, a0 = a >> m, a & mask
+    b1, b0 = b >> m, b & mask
+    z0, z2 = _schoolbook(a0, b0), _schoolbook(a1, b1)
+    z1 = _schoolbook(a0 + a1, b0 + b1) - z0 - z2
+    return (z2 << (2 * m)) + (z1 << m) + z0
+
+
+def _toom3_once(a: int, b: int) -> int:
+    """
+    A single level of Toom-3 above the Karatsuba multiplication, for the tuning
+    """
+    global TOOM3_THRESHOLD
+    saved = TOOM3_THRESHOLD
+
+    # With the threshold just above the size of the pieces, the recursive calls stop at Karatsuba
+    TOOM3_THRESHOLD = _split_bits(a, b, 3) // LIMB_BITS + 1
+    try:
+        return _toom3(a, b)
+    finally:
+        TOOM3_THRESHOLD = saved
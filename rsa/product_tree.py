@@ -0,0 +1,170 @@
+"""
+product_tree.py
+
+This module contains the product and remainder trees, to work on whole collections of integers
+at once instead of one at a time. The product tree of a list of integers holds their pairwise
+products, level by level up to the product of all of them. Going back down, a remainder tree
+reduces one huge integer modulo every leaf, each node reducing the remainder of its parent, so
+the n reductions cost O(log n) levels of products of the same total size, quasi-linear instead
+of the n full size divisions. The reverse operation, rebuilding an integer from its residues,
+climbs the tree the same way.
+
+Bernstein's batch gcd uses both trees to find, for every RSA modulus of a large set, its gcd with
+the product of all the other ones, i.e the primes it shares with another modulus of the set.
+
+Functions:
+    - product_tree(values, max_bits) : The levels of the product tree of a list of integers
+    - remainder_tree(x, tree) : The remainders of x modulo the leaves of a product tree
+    - remainders(x, moduli) : The remainders of x modulo many integers
+    - chinese_remainders_tree(residues, moduli) : The integer with the given residues modulo pairwise coprime moduli
+    - batch_gcd(moduli) : The gcd of every modulus with the product of the other ones
+"""
+
+from rsa.modular_arithmetic import euclidian_div, gcd, mod_inv
+
+
+def product_tree(values: list, max_bits: int = None) -> list:
+    """
+    Builds the product tree of a list of integers: its levels from the leaves (the integers) up
+    to the root (their product), every node being the product of its two children, an odd node
+    out being carried up as it is.
+
+    Args:
+        values (list) : The integers, the leaves of the tree
+        max_bits (int) : If given, the tree stops growing once a node reaches that size, the top
+        level then has several nodes (which is enough to reduce an integer of max_bits bits)
+
+    Returns:
+        tree (list) : The levels of the tree, tree[0] being the leaves
+
+    Example:
+        >>> product_tree([3, 5, 7, 11, 13])
+        [[3, 5, 7, 11, 13], [15, 77, 13], [1155, 13], [15015]]
+    """
+    tree = [list(values)]
+    while len(tree[-1]) > 1 and (max_bits is None or max(node.bit_length() for node in tree[-1]) < max_bits):
+        level = tree[-1]
+        tree.append([level[i] * level[i + 1] for i in range(0, len(level) - 1, 2)])
+        if len(level) & 1:
+            tree[-1].append(level[-1])
+    return tree
+
+
+def remainder_tree(x: int, tree: list, squares: bool = False) -> list:
+    """
+    Reduces x modulo every leaf of a product tree: x is reduced modulo the top nodes, then the
+    remainder modulo a node is reduced modulo its two children, down to the leaves.
+
+    Args:
+        x (int) : The integer to reduce
+        tree (list) : The product tree of the moduli
+        squares (bool) : To reduce modulo the squares of the nodes instead (for the batch gcd)
+
+    Returns:
+        remainders (list) : x mod every leaf (or every leaf squared), in order
+
+    Example:
+        >>> remainder_tree(1000, product_tree([3, 5, 7, 11, 13]))
+        [1, 0, 6, 10, 12]
+    """
+    def modulus(node):
+        return node * node if squares else node
+
+    res = [euclidian_div(x, modulus(node))[1] for node in tree[-1]]
+    for level in reversed(tree[:-1]):
+        res = [euclidian_div(res[i >> 1], modulus(node))[1] for i, node in enumerate(level)]
+    return res
+
+
+def remainders(x: int, moduli: list) -> list:
+    """
+    Reduces an integer modulo many integers > 0 with a remainder tree, the tree stopping at the
+    size of x since a node larger than x leaves it unchanged
+
+    Example:
+        >>> remainders(2 ** 100, [3, 5, 7, 1000003])
+        [1, 1, 2, 253109]
+    """
+    if len(moduli) == 0:
+        return []
+    return remainder_tree(x, product_tree(moduli, x.bit_length() + 1))
+
+
+def chinese_remainders_tree(residues: list, moduli: list) -> int:
+    """
+    Rebuilds the integer 0 <= x < M = m1 * ... * mk from its residues modulo pairwise coprime
+    moduli, going up the product tree: with Mi = M / mi, x = sum of ci * Mi mod M where ci =
+    ri / Mi mod mi. All the Mi mod mi come from a single remainder tree of M modulo the mi²,
+    as (M mod mi²) / mi, and the sum is built bottom up: a node is left * right product +
+    right * left product. This is quasi-linear in the size of M, for many moduli.
+
+    Args:
+        residues (list) : The residues ri
+        moduli (list) : The pairwise coprime moduli mi > 1
+
+    Raises:
+        ValueError : If the lists don't have the same length or the moduli aren't coprime
+
+    Returns:
+        x (int) : The integer with x = ri mod mi for every i
+
+    Example:
+        >>> chinese_remainders_tree([2, 3, 2], [3, 5, 7])
+        23
+    """
+    if len(residues) != len(moduli) or len(moduli) == 0:
+        raise ValueError("There has to be as many residues as moduli, and at least one")
+
+    tree = product_tree(moduli)
+    M = tree[-1][0]
+
+    # ci = ri / Mi mod mi, with Mi mod mi = (M mod mi²) / mi
+    values = []
+    for r, m, rem in zip(residues, moduli, remainder_tree(M, tree, squares = True)):
+        try:
+            values.append(euclidian_div(r * mod_inv(euclidian_div(rem, m)[0], m), m)[1])
+        except ValueError:
+            raise ValueError(f"The moduli are not pairwise coprime, {m} isn't coprime with the others")
+
+    # The linear combination, level by level: (left, right) -> left * right node + right * left node
+    for level in tree[:-1]:
+        up = [
+            values[i] * level[i + 1] + values[i + 1] * level[i] for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) & 1:
+            up.append(values[-1])
+        values = up
+
+    return euclidian_div(values[0], M)[1]
+
+
+def batch_gcd(moduli: list) -> list:
+    """
+    Bernstein's batch gcd: for every modulus Ni of the list, computes gcd(Ni, P / Ni) where P is
+    the product of all of them. The remainders of P modulo every Ni² come from one remainder tree,
+    and then gcd(Ni, P / Ni) = gcd(Ni, (P mod Ni²) / Ni). A result other than 1 means that Ni shares
+    a prime with another modulus of the list: when it is Ni itself, both of its primes are shared
+    (or Ni appears twice), and a pairwise gcd with the other flagged moduli separates them. For n
+    moduli it costs O(n log n) multiplications, instead of the n² / 2 pairwise gcds.
+
+    Args:
+        moduli (list) : The moduli > 1, typically the RSA moduli of many public keys
+
+    Returns:
+        gcds (list) : gcd(Ni, product of the other moduli) for every modulus, in order
+
+    Example:
+        >>> batch_gcd([35, 77, 143, 17 * 19])
+        [7, 77, 11, 1]
+    """
+    if len(moduli) == 0:
+        return []
+
+    tree = product_tree(moduli)
+    res = remainder_tree(tree[-1][0], tree, squares = True)
+
+    gcds = []
+    for n, rem in zip(moduli, res):
+        q = euclidian_div(rem, n)[0]
+        gcds.append(gcd(n, q) if q > 0 else n)
+    return gcds
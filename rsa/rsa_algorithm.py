@@ -10,11 +10,15 @@ The functions will be given necessay arguments. Hence we will be having flexibil
 in encryption and decryption (for example, instead of the private key, we will be giving 
 the integer factorisation of the private key)
     Functions: 
-        - rsa_enc(n, e, m)
-        - rsa_dec(c, n, d = None, p = None, q = None)
+        - rsa_enc(m, n, e = 65537, context = None)
+        - rsa_dec(c, n, d = None, p = None, q = None, context = None, e = 65537)
+        - rsa_enc_many(ms, key)
+        - rsa_dec_many(cs, key, exponents = None) : batch decryption, by Fiat's batch RSA for distinct exponents
+        - RSAPrivateKey(p, q, e = 65537, d = None, extra_primes = ()) : (multi-prime) private key with precomputed CRT parameters
+        - RSAPublicKey(n, e = 65537) : public key with a precomputed Montgomery context, and the short ladder for e = 2^k + 1
 """ 
 
-def rsa_enc(m, n  ,e = 65537): 
+def rsa_enc(m, n  ,e = 65537, context = None): 
     """
     Performs the RSA encryption on a given word (m), in this case, it has to be coprime with n to ensure the
     bijectivity of the encryption method.
@@ -23,47 +27,345 @@ def rsa_enc(m, n  ,e = 65537):
         m (int) : The message to be encrypted using the RSA, such that gcd(m, n) = 1
         e (int) : The expoenent of the encryption, to make it more secure, we take 65537 as the default value. e has to be coprime with n
         n (int) : The modulus of the expenetiation. 
+        context (MontgomeryContext) : Optional precomputed Montgomery context for n, to share across encryptions 
 
     Example:
     >>> rsa_enc()
 
     """
     
-    # We already have the fast modular expenetiation function in the modular_arithmetic module, hence we just use it 
+    # We already have the fast modular expenetiation function in the modular_arithmetic module, hence we just use it,
+    # with the short ladder of fermat_exp for the exponents 2^k + 1 (3, 65537)
+    k = fermat_exponent(e)
+    if k is not None and n > 0:
+        return fermat_exp(m, k, n, context = context)
 
-    return mod_exp(m, e, n)
+    return mod_exp(m, e, n, context = context)
 
-def rsa_dec(c, n, d = None, p = None, q = None):
+def _montgomery_or_none(n):
+    """
+    Returns a Montgomery context for n when it applies (n odd and > 1), otherwise None, in 
+    which case mod_exp falls back to reductions by division
+    """
+    if n > 1 and n & 1:
+        return MontgomeryContext(n)
+    return None
+
+
+class RSAPrivateKey:
+    """
+    An RSA private key given by its prime factorisation, with everything needed for the 
+    decryption computed once at construction: the private exponent d, the CRT exponents 
+    dp = d mod (p - 1), dq = d mod (q - 1), the coefficient q_inv = q^(-1) mod p and the 
+    Montgomery contexts of p, q and n. Decrypting is then only two half size expenentiations
+    and Garner's recombination m = mq + q * (q_inv * (mp - mq) mod p).
+
+    Multi-prime keys (n = p * q * r_3 * ... * r_k, as in PKCS#1 v2.1) are given with extra_primes. 
+    Each extra prime r_i has its exponent d_i = d mod (r_i - 1) and the coefficient 
+    t_i = (p * q * ... * r_(i-1))^(-1) mod r_i, so that the recombination stays O(k): 
+    m = m + (p * q * ... * r_(i-1)) * ((m_i - m) * t_i mod r_i) for every extra prime. Since 
+    the cost of an expenentiation is cubic in the size of the modulus, k primes of n/k bits 
+    make the decryption about k²/4 times cheaper than with two primes.
+
+    Args:
+        p (int) : The first prime factor of n 
+        q (int) : The second prime factor of n 
+        e (int) : The public exponent, coprime with phi(n) = (p - 1)(q - 1)...
+        d (int) : The private exponent, computed as e^(-1) mod phi(n) if not given
+        extra_primes (list) : The other prime factors of n, for a multi-prime key
+
+    Raises:
+        ValueError : If the prime factors are not distinct, or if e is not invertible modulo phi(n)
+
+    Example:
+        >>> key = RSAPrivateKey(43, 11, 17)
+        >>> key.decrypt(rsa_enc(42, key.n, key.e))
+        42
+    """
+
+    def __init__(self, p, q, e = 65537, d = None, extra_primes = ()):
+        self.primes = [p, q] + list(extra_primes)
+        if len(set(self.primes)) != len(self.primes):
+            raise ValueError("The prime factors of the modulus have to be distinct")
+
+        self.p, self.q, self.e = p, q, e
+        self.n = 1
+        for r in self.primes:
+            self.n *= r
+
+        # If the value of d is not precalculated, we do the precedure using modular_arithmetic module
+        if d is None:
+            phi = 1    # Euler's tuotient function 
+            for r in self.primes:
+                phi *= r - 1
+            d = mod_inv(e, phi)
+        self.d = d
+
+        # The CRT parameters
+        self.crt_exponents = [euclidian_div(d, r - 1)[1] for r in self.primes]
+        self.dp, self.dq = self.crt_exponents[:2]
+        self.q_inv = mod_inv(q, p)
+
+        # Garner's coefficients of the extra primes, pairs (product of the previous primes, its inverse mod r_i)
+        self.coefficients = []
+        prod = p * q
+        for r in self.primes[2:]:
+            self.coefficients.append((prod, mod_inv(euclidian_div(prod, r)[1], r)))
+            prod *= r
+
+        # The Montgomery contexts for the modulus and its factors, one per independant half expenentiation
+        self.contexts = [_montgomery_or_none(r) for r in self.primes]
+        self.context_p, self.context_q = self.contexts[:2]
+        self.context_n = _montgomery_or_none(self.n)
+
+    def public_key(self):
+        """
+        Returns the public key (n, e) corresponding to this private key
+        """
+        return RSAPublicKey(self.n, self.e)
+
+    def half_exp(self, i, c, builtin = False):
+        """
+        Computes the i'th half expenentiation of the decryption c^(d mod (p_i - 1)) mod p_i, these
+        are independant and can run concurrently. With builtin, python's pow is used instead of mod_exp
+        """
+        if builtin:
+            return pow(c, self.crt_exponents[i], self.primes[i])
+        return mod_exp(c, self.crt_exponents[i], self.primes[i], context = self.contexts[i])
+
+    def combine(self, residues):
+        """
+        Garner's recombination of the residues modulo each prime factor into the integer modulo n
+        """
+        m_p, m_q = residues[0], residues[1]
+        _, h = euclidian_div(self.q_inv * (m_p - m_q), self.p)
+        m = m_q + h * self.q
+
+        for (prod, t), r, m_r in zip(self.coefficients, self.primes[2:], residues[2:]):
+            _, h = euclidian_div((m_r - m) * t, r)
+            m += prod * h
+
+        return m
+
+    def decrypt(self, c):
+        """
+        Decrypts a cipher integer using the chinese remainders theorem with Garner's recombination
+
+        Args:
+            c (int) : The cipher text encrypted using the public key (n, e)
+
+        Returns:
+            m (int) : The decrypted message 
+        """
+        return self.combine([self.half_exp(i, c) for i in range(len(self.primes))])
+
+    def decrypt_many(self, cs):
+        """
+        Decrypts a list of cipher integers, the recodings of the CRT exponents are shared by all the expenentiations 
+        """
+        cs = list(cs)
+        residues = [
+            _pow_many(cs, d_r, r, context) 
+            for d_r, r, context in zip(self.crt_exponents, self.primes, self.contexts)
+        ]
+
+        return [self.combine(column) for column in zip(*residues)]
+
+    def root(self, v, r):
+        """
+        Computes the r'th root of v modulo n, i.e v^(1/r) with r coprime with phi(n), using the CRT
+        """
+        return self.combine([
+            mod_exp(v, mod_inv(r, p_i - 1), p_i, context = context) 
+            for p_i, context in zip(self.primes, self.contexts)
+        ])
+
+
+class RSAPublicKey:
+    """
+    An RSA public key (n, e) with the Montgomery context of n computed once, to be shared 
+    by all the encryptions under this key. For the exponents 2^k + 1 (3, 65537), which make 
+    the public operation of almost every key, the sliding window is replaced by the short 
+    ladder of fermat_exp: k squarings and one multiplication.
+
+    Args:
+        n (int) : The modulus 
+        e (int) : The public exponent 
+
+    Example:
+        >>> RSAPublicKey(33, 7).encrypt(2)
+        29
+    """
+
+    def __init__(self, n, e = 65537):
+        self.n, self.e = n, e
+        self.context_n = _montgomery_or_none(n)
+        self.fermat_k = fermat_exponent(e)
+
+    def encrypt(self, m):
+        """
+        Encrypts a message integer m, i.e returns m^e mod n 
+        """
+        if self.fermat_k is not None:
+            return fermat_exp(m, self.fermat_k, self.n, context = self.context_n)
+        return mod_exp(m, self.e, self.n, context = self.context_n)
+
+    def encrypt_many(self, ms):
+        """
+        Encrypts a list of message integers, the recoding of e is shared by all the expenentiations 
+        """
+        if self.fermat_k is not None:
+            return [fermat_exp(m, self.fermat_k, self.n, context = self.context_n) for m in ms]
+        return _pow_many(ms, self.e, self.n, self.context_n)
+
+
+def _pow_many(bases, e, n, context):
+    """
+    Computes a^e mod n for every a of an iterable, through the Montgomery context when there is one
+    """
+    if context is not None:
+        return context.pow_many(bases, e)
+    return [mod_exp(a, e, n) for a in bases]
+
+
+def rsa_dec(c, n, d = None, p = None, q = None, context = None, e = 65537):
     """
     Performs the RSA decryption given a cipher message (c) and either the private key (n, d) or 
     the prime facorisation of n.
 
     Args: 
         c (int) : The cipher text encrypted using the public key (n, e)
+        n (int | RSAPrivateKey) : The modulus, or a precomputed private key, which is the fastest way to decrypt many messages
+        d (int) : The private exponent 
+        p (int) : The first prime factor of n 
+        q (int) : The second prime factor of n 
+        context (MontgomeryContext) : Optional precomputed Montgomery context for n, used when decrypting with d 
+        e (int) : The public exponent, needed to compute d when only p and q are given 
+
+    Raises:
+        ValueError : If the prime factorisation doesn't match n, or if neither d nor p and q are given
 
+    Example:
+        >>> rsa_dec(29, 33, d = 3)
+        2
     """
+    if isinstance(n, RSAPrivateKey):
+        return n.decrypt(c)
+
+    # We decipher using the chinese remainders theorem for more efficiency (if p and q arent None)
     if p != None and q != None:
         if n != p * q:
             raise ValueError(f"Invalid prime facotorization for {n}, {n} != {p} * {q}")
 
-    # If the value of d is not precalculated, we do the precedure using modular_arithmetic module
-    if d == None: 
-        phi = (p - 1) * (q - 1)  # Euler's tuotient function 
-    d = mod_inv(e, phi)
+        return RSAPrivateKey(p, q, e, d).decrypt(c)
 
-    # We decipher using the chinese remainders theorem for more efficiency (if p and q arent None)
-    if p != None and q != None:
-        _, dp = euclidian_div(d, p - 1)
-        _, dq = euclidian_div(d, q - 1)
+    if d == None:
+        raise ValueError("Either the private exponent d or the prime factorisation of n is needed")
 
-        m_p = pow(c, dp, p)
-        m_q = pow(c, dq, q)
+    # In the second case we just use regular modular expenentiation
+    return mod_exp(c, d, n, context = context)
 
-        A = [p, q]
-        R = [m_p, m_q]
 
-        return chinese_remainders(A, R)
+def rsa_enc_many(ms, key):
+    """
+    Performs the RSA encryption of many messages under the same public key, the Montgomery 
+    context of n and the recoding of e being computed once for the whole batch.
 
-    # In the second case we just use regular modular expenentiation
-    else:
-        return mod_exp(c, d, n)
+    Args: 
+        ms (iterable) : The message integers to encrypt 
+        key (RSAPublicKey | RSAPrivateKey) : The key to encrypt with 
+
+    Returns: 
+        cs (list) : The cipher integers, in the order of the messages 
+
+    Example:
+        >>> rsa_enc_many([2, 3], RSAPublicKey(33, 7))
+        [29, 9]
+    """
+    if isinstance(key, RSAPrivateKey):
+        key = key.public_key()
+
+    return key.encrypt_many(ms)
+
+
+def _batch_up(cs, exponents, key):
+    """
+    Upward pass of the batch RSA decryption, builds the binary tree over the ciphertexts where
+    a node holds the product E of the exponents of its leaves, and v = v_L^(E_R) * v_R^(E_L) mod n, 
+    so that the E'th root of v is the product of the roots of its leaves
+    """
+    if len(cs) == 1:
+        return exponents[0], euclidian_div(cs[0], key.n)[1], None, None
+
+    mid = len(cs) // 2
+    left = _batch_up(cs[:mid], exponents[:mid], key)
+    right = _batch_up(cs[mid:], exponents[mid:], key)
+
+    v = mod_exp(left[1], right[0], key.n, context = key.context_n) * mod_exp(right[1], left[0], key.n, context = key.context_n)
+    return left[0] * right[0], euclidian_div(v, key.n)[1], left, right
+
+
+def _batch_down(node, m, key, ms):
+    """
+    Downward pass of the batch RSA decryption, splits the root m = m_L * m_R of a node into the roots
+    of its children. With X = 0 mod E_L and X = 1 mod E_R, we get m^X = v_L^(X / E_L) * v_R^((X - 1) / E_R) * m_R
+    """
+    _, _, left, right = node
+    if left is None:
+        ms.append(m)
+        return
+
+    (e_l, v_l, _, _), (e_r, v_r, _, _) = left, right
+    x = e_l * mod_inv(e_l, e_r)
+
+    num = mod_exp(m, x, key.n, context = key.context_n)
+    den = mod_exp(v_l, euclidian_div(x, e_l)[0], key.n, context = key.context_n) * mod_exp(v_r, euclidian_div(x - 1, e_r)[0], key.n, context = key.context_n)
+    _, m_r = euclidian_div(num * mod_inv(euclidian_div(den, key.n)[1], key.n), key.n)
+    _, m_l = euclidian_div(m * mod_inv(m_r, key.n), key.n)
+
+    _batch_down(left, m_l, key, ms)
+    _batch_down(right, m_r, key, ms)
+
+
+def rsa_dec_many(cs, key, exponents = None):
+    """
+    Performs the RSA decryption of many cipher integers under the same private key. Without 
+    exponents, every ciphertext is decrypted by the CRT with the precomputed parameters of 
+    the key. When the ciphertexts were encrypted under the same modulus with distinct small 
+    public exponents (pairwise coprime), Fiat's batch RSA decryption (as in Shacham-Boneh) 
+    replaces the b full size expenentiations by a single one, plus small exponent ones and 
+    modular inversions along a binary tree.
+
+    Args: 
+        cs (iterable) : The cipher integers to decrypt 
+        key (RSAPrivateKey) : The private key 
+        exponents (list) : Optional, the public exponent each ciphertext was encrypted with
+
+    Raises:
+        ValueError : If the number of exponents doesn't match the number of ciphertexts
+        ValueError : If the exponents are not pairwise coprime, or not coprime with (p - 1)(q - 1) 
+        ValueError : If a ciphertext is not invertible modulo n (batch mode) 
+
+    Returns: 
+        ms (list) : The decrypted messages, in the order of the ciphertexts 
+
+    Example:
+        >>> rsa_dec_many([29, 9], RSAPrivateKey(3, 11, 7))
+        [2, 3]
+    """
+    cs = list(cs)
+    if exponents is None:
+        return key.decrypt_many(cs)
+
+    exponents = list(exponents)
+    if len(exponents) != len(cs):
+        raise ValueError("The number of exponents and ciphertexts is not equal")
+
+    if len(cs) == 0:
+        return []
+
+    root = _batch_up(cs, exponents, key)
+    ms = []
+    _batch_down(root, key.root(root[1], root[0]), key, ms)
+
+    return ms
@@ -0,0 +1,266 @@
+"""
+rsa_parallel.py 
+
+This module contains an opt-in process pool layer for the bulk RSA operations. Since all the
+big integer arithmetic is pure python, and hence bound to a single core by the GIL, we spread
+the work over processes with concurrent.futures. The key is shipped to every worker once, when 
+the pool starts (through the initializer), instead of being pickled with every task. The work 
+is cut into chunks, and the results keep the order of the inputs. For the latency of a single 
+decryption, the half expenentiations modulo each prime factor can also run concurrently. 
+
+    Classes: 
+        - RSAPool(key = None, max_workers = None, chunksize = None) : 
+            - encrypt_many(ms) 
+            - decrypt_many(cs)
+            - decrypt(c, builtin = False) : the half expenentiations of one decryption on the workers
+            - is_prime_many(values, method) : the primality tests of a batch on the workers
+            - find_primes(count, bits)
+    Functions: 
+        - rsa_dec_concurrent(c, key, executor = None, builtin = False) : the half expenentiations on a process pool
+"""
+
+import os 
+import secrets    # Cryptographically secure random candidates for the prime search
+from concurrent.futures import ProcessPoolExecutor
+
+from rsa.rsa_algorithm import *
+from utils.prime_utils import is_prime, is_prime_many
+
+# The key of the worker process, set once by the pool initializer
+_worker_key = None
+
+# The process pool of the concurrent decryptions, started on first use for the last key used
+_default_pool = None
+
+
+def _init_worker(key):
+    """
+    Initializer of the worker processes, stores the key for all the tasks of the pool
+    """
+    global _worker_key
+    _worker_key = key
+
+
+def _encrypt_chunk(chunk):
+    """
+    Task of the workers, encrypts a chunk of messages with the key of the worker
+    """
+    key = _worker_key
+    if isinstance(key, RSAPrivateKey):
+        key = key.public_key()
+    return key.encrypt_many(chunk)
+
+
+def _decrypt_chunk(chunk):
+    """
+    Task of the workers, decrypts a chunk of ciphertexts with the key of the worker
+    """
+    return _worker_key.decrypt_many(chunk)
+
+
+def _half_exp_task(i, c, builtin):
+    """
+    Task of the workers, the i'th half expenentiation of a decryption with the key of the worker
+    """
+    return _worker_key.half_exp(i, c, builtin)
+
+
+def _search_prime(bits, attempts, e):
+    """
+    Task of the workers, tests odd candidates from a random starting point of the given 
+    size, returns the first prime p with gcd(e, p - 1) = 1 found, or None after the given 
+    number of attempts
+    """
+    n = secrets.randbits(bits) | (1 << (bits - 1)) | 1
+    for _ in range(attempts):
+        if n.bit_length() > bits:
+            return None
+        if gcd(e, n - 1) == 1 and is_prime(n, "miller-rabin"):
+            return n
+        n += 2
+    return None
+
+
+class RSAPool:
+    """
+    A process pool for the bulk RSA operations under a fixed key. It can be used as a context 
+    manager, the worker processes are stopped when leaving it (or with close).
+
+    Args:
+        key (RSAPrivateKey | RSAPublicKey) : The key shipped to the workers, None for the prime search only 
+        max_workers (int) : The number of worker processes, the number of cores by default
+        chunksize (int) : The number of items per task, chosen to give each worker 4 tasks if not given
+
+    Example:
+        >>> with RSAPool(RSAPrivateKey(43, 11, 17), max_workers = 2) as pool:
+        ...     pool.decrypt_many(pool.encrypt_many([2, 3, 4]))
+        [2, 3, 4]
+    """
+
+    def __init__(self, key = None, max_workers = None, chunksize = None):
+        self.key = key
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.executor = ProcessPoolExecutor(
+            max_workers = self.max_workers, initializer = _init_worker, initargs = (key,)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Stops the worker processes
+        """
+        self.executor.shutdown()
+
+    def _chunks(self, items):
+        """
+        Cuts a list of items into the chunks sent to the workers
+        """
+        size = self.chunksize or max(1, -(-len(items) // (4 * self.max_workers)))
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _map(self, task, items):
+        """
+        Runs a task over the chunks of the items, and flattens the results in order
+        """
+        if self.key is None:
+            raise ValueError("The pool has no key")
+
+        res = []
+        for chunk in self.executor.map(task, self._chunks(list(items))):
+            res.extend(chunk)
+        return res
+
+    def encrypt_many(self, ms):
+        """
+        Encrypts message integers in parallel, returns the cipher integers in order 
+        """
+        return self._map(_encrypt_chunk, ms)
+
+    def decrypt_many(self, cs):
+        """
+        Decrypts cipher integers in parallel, needs a private key, returns the messages in order 
+        """
+        if not isinstance(self.key, RSAPrivateKey):
+            raise ValueError("Decryption needs a private key")
+        return self._map(_decrypt_chunk, cs)
+
+    def decrypt(self, c, builtin = False):
+        """
+        Decrypts a single cipher integer, with its half expenentiations (one per prime factor) 
+        running concurrently on the workers. This reduces the latency of one decryption rather 
+        than the throughput, for which decrypt_many is better.
+        """
+        if not isinstance(self.key, RSAPrivateKey):
+            raise ValueError("Decryption needs a private key")
+
+        tasks = [self.executor.submit(_half_exp_task, i, c, builtin) for i in range(len(self.key.primes))]
+        return self.key.combine([task.result() for task in tasks])
+
+    def is_prime_many(self, values, method = "miller-rabin", rounds = None):
+        """
+        Tests the primality of a batch of integers: the small-prime filter of the whole batch runs
+        in this process, and the primality tests of the survivors run on the workers
+
+        Example:
+            >>> with RSAPool() as pool:
+            ...     pool.is_prime_many([7, 15, 1000003, 1000005])
+            [True, False, True, False]
+        """
+        return is_prime_many(values, method, rounds, executor = self.executor, chunksize = self.chunksize)
+
+    def find_primes(self, count, bits, e = 65537, attempts = 64, max_rounds = 1000):
+        """
+        Searches distinct random odd primes p of the given size with gcd(e, p - 1) = 1 (so that
+        they can be used in a key with the public exponent e) in parallel. Every task tests up to 
+        'attempts' consecutive odd candidates from its own random starting point, and every round
+        runs one task per worker.
+
+        Args:
+            count (int) : The number of primes to find 
+            bits (int) : The size of the primes in bits, >= 2
+            e (int) : The public exponent 
+            attempts (int) : The number of candidates tested per task
+            max_rounds (int) : The number of rounds after which the search gives up
+
+        Raises:
+            ValueError : If the size is smaller than 2 bits, or if there are less than 'count' such 
+            primes of that size (checked directly for sizes up to 16 bits)
+            RuntimeError : If the primes are not found after max_rounds rounds
+
+        Returns:
+            primes (list) : The primes found
+        """
+        if bits < 2:
+            raise ValueError("Primes have at least 2 bits")
+
+        # For small sizes, we count the available primes instead of searching forever
+        if bits <= 16:
+            available = sum(
+                1 for n in range((1 << (bits - 1)) | 1, 1 << bits, 2) 
+                if gcd(e, n - 1) == 1 and is_prime(n, "naive")
+            )
+            if count > available:
+                raise ValueError(f"There are only {available} such primes of {bits} bits")
+
+        primes = set()
+        for _ in range(max_rounds):
+            if len(primes) >= count:
+                return list(primes)
+
+            tasks = [self.executor.submit(_search_prime, bits, attempts, e) for _ in range(self.max_workers)]
+            for task in tasks:
+                p = task.result()
+                if p is not None and len(primes) < count:
+                    primes.add(p)
+
+        if len(primes) < count:
+            raise RuntimeError(f"Found only {len(primes)} primes of {bits} bits in {max_rounds} rounds")
+        return list(primes)
+
+
+def _key_pool(key):
+    """
+    Returns the default process pool of the concurrent decryptions for the given key, the pool of 
+    the previous key is stopped when the key changes
+    """
+    global _default_pool
+    if _default_pool is None or _default_pool.key is not key:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = RSAPool(key, max_workers = len(key.primes))
+    return _default_pool
+
+
+def rsa_dec_concurrent(c, key, executor = None, builtin = False):
+    """
+    Decrypts a single cipher integer with its half expenentiations (one per prime factor, so k of 
+    them for a k-prime key) running concurrently. By default they run on a process pool of one 
+    worker per prime factor, which holds the key and is kept for the next decryptions under the
+    same key. Another executor can be given instead, such as a thread pool, but threads only run in
+    parallel when the expenentiation releases the GIL: this is the case of a free threaded python
+    build, not of the usual CPython, where neither pow nor mod_exp release it.
+
+    Args:
+        c (int) : The cipher text 
+        key (RSAPrivateKey) : The private key 
+        executor (Executor) : The executor of the half expenentiations, a process pool for the key by default
+        builtin (bool) : Whether to use python's pow instead of mod_exp
+
+    Returns:
+        m (int) : The decrypted message 
+
+    Example:
+        >>> rsa_dec_concurrent(rsa_enc(42, 473, 17), RSAPrivateKey(43, 11, 17))
+        42
+    """
+    if executor is None:
+        return _key_pool(key).decrypt(c, builtin)
+
+    tasks = [executor.submit(key.half_exp, i, c, builtin) for i in range(len(key.primes))]
+    return key.combine([task.result() for task in tasks])
@@ -1,3 +1,616 @@
 """
+rsa_pkcs1.py
 
+This module contains the encryption paddings of PKCS#1 (RFC 8017) as interchangeable schemes for
+the block pipeline of rsa_txt. The v1.5 padding (see utils.padding_pkcs1) is simple but malleable
+and open to Bleichenbacher's padding oracle, RSAES-OAEP is its modern replacement: the message is
+put in a data block DB = lHash || 0x00...0x00 || 0x01 || message, with lHash the hash of a label,
+and a random seed of the size of the hash masks it through the mask generation function MGF1,
+which in turn masks the seed:
+
+    EM = 0x00 || (seed xor MGF1(maskedDB)) || (DB xor MGF1(seed)) = 0x00 || maskedSeed || maskedDB
+
+MGF1(seed, length) is the concatenation of H(seed || counter) for counter = 0, 1, ... so the seed
+is hashed once, and the hash state after it is copied (hashlib .copy()) for every counter instead of
+being hashed again. The label hash is computed once per scheme object, and a batch of blocks draws
+all of its seeds from a single os.urandom call. Every block costs about 2 + (k - hLen - 1) / hLen
+compressions of the hash, e.g 10 SHA-256 compressions for a 2048 bits key, next to which the
+private key expenentiation is several hundred times slower.
+
+A scheme exposes the number of bytes it adds to a block (overhead) and encodes or decodes a batch
+of blocks for a modulus of k bytes (encode_many / decode_many).
+
+The module also contains the signatures of PKCS#1, RSASSA-PKCS1-v1_5 (the DigestInfo of the hash of
+the message, padded with 0xff bytes) and RSASSA-PSS (a salted hash masked by MGF1). A signature is
+made on the CRT path of the private key (two half size expenentiations), and checked with the public
+exponent before being returned, since a fault in one half of the CRT would otherwise give the
+factorisation of n away (Boneh, DeMillo and Lipton). The verification only needs s^e mod n, which for
+e = 2^k + 1 (3, 65537) is the short ladder of fermat_exp: 16 squarings and one multiplication for
+65537, against the 1000 or so multiplications of a 2048 bits signature. Many signatures under one key
+can be verified together (verify_many), each with the ladder, or for the deterministic v1.5 encoding
+by a single product test (see verify_many).
+
+    Classes:
+        - PKCS1v15() : The PKCS#1 v1.5 encryption padding
+        - OAEP(hash_name = "sha256", label = b"") : RSAES-OAEP with MGF1 on the same hash
+        - PKCS1v15Signature(hash_name = "sha256") : The RSASSA-PKCS1-v1_5 signature encoding
+        - PSS(hash_name = "sha256", salt_length = None) : The RSASSA-PSS signature encoding
+    Functions:
+        - mgf1(seed, length, hash_name) : The mask generation function MGF1
+        - get_padding(name) : Returns the scheme of a padding name
+        - get_signature(name) : Returns the scheme of a signature name
+        - sign(message, key, scheme) / sign_many(messages, key, scheme) : Signs messages with a private key
+        - verify(message, signature, key, scheme) / verify_many(messages, signatures, key, scheme, screening)
 """
+
+import hashlib
+import hmac
+import os
+
+from rsa.rsa_algorithm import *
+from utils.padding_pkcs1 import pad_many, strip_many
+
+
+def _counter(i: int) -> bytes:
+    """
+    The counter of MGF1, on 4 bytes big endian
+    """
+    return i.to_bytes(4, "big")
+
+
+def mgf1(seed, length: int, hash_name: str = "sha256") -> bytes:
+    """
+    The mask generation function MGF1: the first 'length' bytes of H(seed || 0) || H(seed || 1) || ...
+    The seed is hashed once, and the state of the hash is copied for every counter
+
+    Example:
+        >>> mgf1(b"seed", 4).hex()
+        '336f28a0'
+    """
+    base = hashlib.new(hash_name, seed)
+    blocks = -(-length // base.digest_size)
+
+    mask = bytearray()
+    for i in range(blocks):
+        h = base.copy()
+        h.update(_counter(i))
+        mask += h.digest()
+    return bytes(mask[:length])
+
+
+def _xor(a, b) -> bytes:
+    """
+    The xor of two byte strings of the same length, through integers
+    """
+    return (int.from_bytes(a, "big") ^ int.from_bytes(b, "big")).to_bytes(len(a), "big")
+
+
+class PKCS1v15:
+    """
+    The PKCS#1 v1.5 encryption padding, 0x00 0x02 (at least 8 random nonzero bytes) 0x00 message
+
+    Example:
+        >>> scheme = PKCS1v15()
+        >>> scheme.decode_many(scheme.encode_many([b"Hello"], 32), 32)
+        [b'Hello']
+    """
+
+    overhead = 11
+
+    def encode_many(self, messages, k: int) -> list:
+        """
+        Pads a batch of messages into blocks of k bytes, see utils.padding_pkcs1.pad_many
+        """
+        return pad_many(messages, k)
+
+    def decode_many(self, blocks, k: int) -> list:
+        """
+        Removes the padding of a batch of blocks of k bytes, see utils.padding_pkcs1.strip_many
+        """
+        return strip_many(blocks, k)
+
+
+class OAEP:
+    """
+    The RSAES-OAEP encoding of RFC 8017, with MGF1 on the same hash as the label. The hash of the
+    label is computed once, at construction, and shared by all the blocks encoded with the object.
+    A message of a modulus of k bytes holds at most k - 2 * hLen - 2 bytes (190 bytes for a 2048
+    bits key with SHA-256, 126 with SHA-512).
+
+    Args:
+        hash_name (str) : A hashlib hash of a fixed size, "sha256" or "sha512" typically
+        label (bytes) : The label bound to the messages, which the decoding checks
+
+    Raises:
+        ValueError : If the hash doesn't exist or doesn't have a fixed size
+
+    Example:
+        >>> scheme = OAEP("sha256", label = b"files")
+        >>> em = scheme.encode(b"Hello, World!", 128)
+        >>> len(em), scheme.decode(em, 128)
+        (128, b'Hello, World!')
+    """
+
+    def __init__(self, hash_name: str = "sha256", label: bytes = b""):
+        h = hashlib.new(hash_name, bytes(label))
+        if h.digest_size == 0:
+            raise ValueError(f"The hash {hash_name} doesn't have a fixed size")
+
+        self.hash_name = hash_name
+        self.label = bytes(label)
+        self.lhash = h.digest()
+        self.h_len = h.digest_size
+        self.overhead = 2 * self.h_len + 2
+
+    def max_length(self, k: int) -> int:
+        """
+        The largest message that fits in a block of k bytes
+        """
+        return k - self.overhead
+
+    def _encode(self, message, k: int, seed: bytes) -> bytes:
+        """
+        Encodes a message into a block of k bytes with the given seed of hLen bytes
+        """
+        message = message.encode("utf-8") if isinstance(message, str) else message
+        m_len = len(message)
+        if m_len > self.max_length(k):
+            raise ValueError(f"The message is too long, at most {max(self.max_length(k), 0)} bytes fit in a block of {k} bytes")
+
+        # DB = lHash || PS || 0x01 || M, in a preallocated bytearray (PS is made of zeros)
+        db_len = k - self.h_len - 1
+        db = bytearray(db_len)
+        db[:self.h_len] = self.lhash
+        db[db_len - m_len - 1] = 0x01
+        db[db_len - m_len:] = message
+
+        masked_db = _xor(db, mgf1(seed, db_len, self.hash_name))
+        masked_seed = _xor(seed, mgf1(masked_db, self.h_len, self.hash_name))
+        return b"\x00" + masked_seed + masked_db
+
+    def encode(self, message, k: int) -> bytes:
+        """
+        Encodes a message (bytes-like, or str encoded in utf-8) into a block of k bytes, with a fresh random seed
+
+        Raises:
+            ValueError : If the message is longer than k - 2 * hLen - 2 bytes
+        """
+        return self._encode(message, k, os.urandom(self.h_len))
+
+    def encode_many(self, messages, k: int) -> list:
+        """
+        Encodes a batch of messages into blocks of k bytes, all the seeds coming from one os.urandom call
+        """
+        messages = list(messages)
+        seeds = os.urandom(self.h_len * len(messages))
+        return [
+            self._encode(message, k, seeds[i * self.h_len:(i + 1) * self.h_len])
+            for i, message in enumerate(messages)
+        ]
+
+    def decode(self, em, k: int) -> bytes:
+        """
+        Decodes a block of k bytes back into its message. Every failure raises the same error, so
+        that a decryption service doesn't tell which check failed (Manger's attack relies on it)
+
+        Raises:
+            ValueError : If the block isn't a valid OAEP encoding under this hash and label
+        """
+        if len(em) != k or k < self.overhead:
+            raise ValueError("OAEP decoding error")
+
+        em = bytes(em)
+        masked_seed, masked_db = em[1:1 + self.h_len], em[1 + self.h_len:]
+        seed = _xor(masked_seed, mgf1(masked_db, self.h_len, self.hash_name))
+        db = _xor(masked_db, mgf1(seed, k - self.h_len - 1, self.hash_name))
+
+        # After lHash, the zeros of PS and then the 0x01 separator
+        rest = db[self.h_len:]
+        idx = len(rest) - len(rest.lstrip(b"\x00"))
+
+        valid = hmac.compare_digest(db[:self.h_len], self.lhash)
+        valid &= em[0] == 0
+        valid &= idx < len(rest) and rest[idx] == 0x01
+        if not valid:
+            raise ValueError("OAEP decoding error")
+        return rest[idx + 1:]
+
+    def decode_many(self, blocks, k: int) -> list:
+        """
+        Decodes a batch of blocks of k bytes, see decode
+        """
+        return [self.decode(em, k) for em in blocks]
+
+
+# The paddings by name, for the 'padding' argument of the pipeline of rsa_txt
+PADDINGS = {
+    "pkcs1": PKCS1v15,
+    "oaep": OAEP,
+    "oaep-sha256": lambda: OAEP("sha256"),
+    "oaep-sha512": lambda: OAEP("sha512"),
+}
+
+
+def get_padding(name):
+    """
+    Returns the padding scheme of a name, a scheme object being returned as it is
+
+    Raises:
+        ValueError : If the padding doesn't exist
+
+    Example:
+        >>> get_padding("oaep-sha512").overhead
+        130
+    """
+    if not isinstance(name, str):
+        return name
+    if name not in PADDINGS:
+        raise ValueError(f"Unknown padding {name}, the paddings are {list(PADDINGS)}")
+    return PADDINGS[name]()
+
+
+# The DER encoding of the DigestInfo of each hash, which precedes the digest (RFC 8017, section 9.2)
+DIGEST_INFO = {
+    "sha224": bytes.fromhex("302d300d06096086480165030402040500041c"),
+    "sha256": bytes.fromhex("3031300d060960864801650304020105000420"),
+    "sha384": bytes.fromhex("3041300d060960864801650304020205000430"),
+    "sha512": bytes.fromhex("3051300d060960864801650304020305000440"),
+}
+
+
+def _digest(message, hash_name: str) -> bytes:
+    """
+    The hash of a message (bytes-like, or str encoded in utf-8)
+    """
+    message = message.encode("utf-8") if isinstance(message, str) else message
+    return hashlib.new(hash_name, message).digest()
+
+
+class PKCS1v15Signature:
+    """
+    The RSASSA-PKCS1-v1_5 encoding, EM = 0x00 0x01 0xff...0xff 0x00 DigestInfo || H(message) on the
+    bytes of the modulus. It is deterministic: the verification encodes the message again and 
+    compares it with s^e mod n.
+
+    Args:
+        hash_name (str) : One of the hashes of DIGEST_INFO
+
+    Raises:
+        ValueError : If the hash doesn't have a DigestInfo
+
+    Example:
+        >>> scheme = PKCS1v15Signature()
+        >>> scheme.check(b"Hello", int.from_bytes(scheme.encode(b"Hello", 1024), "big"), 1024)
+        True
+    """
+
+    deterministic = True
+
+    def __init__(self, hash_name: str = "sha256"):
+        if hash_name not in DIGEST_INFO:
+            raise ValueError(f"No DigestInfo for the hash {hash_name}, the hashes are {list(DIGEST_INFO)}")
+
+        self.hash_name = hash_name
+        self.prefix = DIGEST_INFO[hash_name]
+
+    def encode(self, message, bits: int) -> bytes:
+        """
+        Encodes a message for a modulus of 'bits' bits, into a block of its size in bytes
+
+        Raises:
+            ValueError : If the modulus is too small for the DigestInfo and 11 bytes of padding
+        """
+        k = (bits + 7) >> 3
+        t = self.prefix + _digest(message, self.hash_name)
+        if k < len(t) + 11:
+            raise ValueError(f"The modulus is too small for the signature, it needs at least {len(t) + 11} bytes")
+        return b"\x00\x01" + b"\xff" * (k - len(t) - 3) + b"\x00" + t
+
+    def check(self, message, m: int, bits: int) -> bool:
+        """
+        Whether m = s^e mod n is the encoding of the message for a modulus of 'bits' bits
+        """
+        return m == int.from_bytes(self.encode(message, bits), "big")
+
+
+class PSS:
+    """
+    The RSASSA-PSS encoding of RFC 8017, with MGF1 on the same hash. A random salt is hashed with the
+    hash of the message, H = Hash(0x00 * 8 || Hash(message) || salt), and the salt is hidden in a data
+    block DB = 0x00...0x00 || 0x01 || salt masked by MGF1(H):
+
+        EM = (DB xor MGF1(H)) || H || 0xbc, on the bits of the modulus but the first one
+
+    Args:
+        hash_name (str) : A hashlib hash of a fixed size
+        salt_length (int) : The size of the salt in bytes, the size of the hash by default
+
+    Raises:
+        ValueError : If the hash doesn't have a fixed size, or the salt length is negative
+
+    Example:
+        >>> scheme = PSS()
+        >>> scheme.check(b"Hello", int.from_bytes(scheme.encode(b"Hello", 1024), "big"), 1024)
+        True
+    """
+
+    deterministic = False
+
+    def __init__(self, hash_name: str = "sha256", salt_length: int = None):
+        h_len = hashlib.new(hash_name).digest_size
+        if h_len == 0:
+            raise ValueError(f"The hash {hash_name} doesn't have a fixed size")
+        if salt_length is not None and salt_length < 0:
+            raise ValueError("The salt length has to be >= 0")
+
+        self.hash_name = hash_name
+        self.h_len = h_len
+        self.salt_length = h_len if salt_length is None else salt_length
+
+    def _hash(self, m_hash: bytes, salt: bytes) -> bytes:
+        """
+        The hash H of the hash of the message and the salt
+        """
+        return hashlib.new(self.hash_name, b"\x00" * 8 + m_hash + salt).digest()
+
+    def encode(self, message, bits: int) -> bytes:
+        """
+        Encodes a message with a fresh random salt for a modulus of 'bits' bits, into a block of
+        ceil((bits - 1) / 8) bytes
+
+        Raises:
+            ValueError : If the modulus is too small for the hash and the salt
+        """
+        em_bits = bits - 1
+        em_len = (em_bits + 7) >> 3
+        if em_len < self.h_len + self.salt_length + 2:
+            raise ValueError(f"The modulus is too small for the signature, it needs at least {self.h_len + self.salt_length + 2} bytes")
+
+        salt = os.urandom(self.salt_length)
+        h = self._hash(_digest(message, self.hash_name), salt)
+
+        db_len = em_len - self.h_len - 1
+        db = bytearray(db_len)
+        db[db_len - self.salt_length - 1] = 0x01
+        db[db_len - self.salt_length:] = salt
+
+        # The bits of the first byte above em_bits are cleared, so that EM < 2^em_bits < n
+        masked_db = int.from_bytes(_xor(db, mgf1(h, db_len, self.hash_name)), "big")
+        masked_db &= (1 << (em_bits - 8 * (self.h_len + 1))) - 1
+        return masked_db.to_bytes(db_len, "big") + h + b"\xbc"
+
+    def check(self, message, m: int, bits: int) -> bool:
+        """
+        Whether m = s^e mod n is a valid encoding of the message for a modulus of 'bits' bits
+        """
+        em_bits = bits - 1
+        em_len = (em_bits + 7) >> 3
+        if m.bit_length() > em_bits or em_len < self.h_len + self.salt_length + 2 or m & 0xff != 0xbc:
+            return False
+
+        em = m.to_bytes(em_len, "big")
+        db_len = em_len - self.h_len - 1
+        h = em[db_len:-1]
+
+        db = int.from_bytes(_xor(em[:db_len], mgf1(h, db_len, self.hash_name)), "big")
+        db &= (1 << (em_bits - 8 * (self.h_len + 1))) - 1
+        db = db.to_bytes(db_len, "big")
+
+        # DB = 0x00...0x00 || 0x01 || salt
+        ps_len = db_len - self.salt_length - 1
+        if db[ps_len] != 0x01 or db[:ps_len].count(0) != ps_len:
+            return False
+
+        salt = db[ps_len + 1:]
+        return hmac.compare_digest(h, self._hash(_digest(message, self.hash_name), salt))
+
+
+# The signatures by name
+SIGNATURES = {
+    "pkcs1": PKCS1v15Signature,
+    "pkcs1-sha512": lambda: PKCS1v15Signature("sha512"),
+    "pss": PSS,
+    "pss-sha512": lambda: PSS("sha512"),
+}
+
+
+def get_signature(name):
+    """
+    Returns the signature scheme of a name, a scheme object being returned as it is
+
+    Raises:
+        ValueError : If the signature scheme doesn't exist
+
+    Example:
+        >>> get_signature("pss").salt_length
+        32
+    """
+    if not isinstance(name, str):
+        return name
+    if name not in SIGNATURES:
+        raise ValueError(f"Unknown signature {name}, the signatures are {list(SIGNATURES)}")
+    return SIGNATURES[name]()
+
+
+def _checked_signature(s: int, m: int, key) -> int:
+    """
+    Checks a signature made on the CRT path with the public exponent (the short ladder for 65537),
+    so that a faulty half expenentiation never leaves the function
+    """
+    if rsa_enc(s, key.n, key.e, context = key.context_n) != m:
+        raise RuntimeError("The signature doesn't verify, the CRT computation is faulty")
+    return s
+
+
+def sign(message, key, scheme = "pss") -> bytes:
+    """
+    Signs a message (bytes-like, or str encoded in utf-8) with a private key: the encoding of the
+    scheme is raised to the private exponent by the CRT, and checked with the public exponent
+
+    Args:
+        message (str | bytes-like) : The message to sign
+        key (RSAPrivateKey) : The private key
+        scheme (str | object) : A name of SIGNATURES, or a scheme object
+
+    Raises:
+        ValueError : If the modulus is too small for the scheme
+        RuntimeError : If the CRT computation is faulty
+
+    Returns:
+        signature (bytes) : The signature, on the bytes of the modulus
+
+    Example:
+        >>> key = generate_keypair(1024)
+        >>> verify(b"Hello", sign(b"Hello", key), key.public_key())
+        True
+    """
+    scheme = get_signature(scheme)
+    bits = key.n.bit_length()
+    m = int.from_bytes(scheme.encode(message, bits), "big")
+    return _checked_signature(key.decrypt(m), m, key).to_bytes((bits + 7) >> 3, "big")
+
+
+def sign_many(messages, key, scheme = "pss") -> list:
+    """
+    Signs a batch of messages with a private key, the recodings of the CRT exponents being shared
+    by all the signatures (see RSAPrivateKey.decrypt_many)
+
+    Example:
+        >>> key = generate_keypair(1024)
+        >>> verify_many([b"a", b"b"], sign_many([b"a", b"b"], key), key)
+        [True, True]
+    """
+    scheme = get_signature(scheme)
+    bits = key.n.bit_length()
+    ms = [int.from_bytes(scheme.encode(message, bits), "big") for message in messages]
+    return [
+        _checked_signature(s, m, key).to_bytes((bits + 7) >> 3, "big")
+        for s, m in zip(key.decrypt_many(ms), ms)
+    ]
+
+
+def _signature_int(signature, n: int) -> int:
+    """
+    The integer of a signature, None if it isn't on the bytes of the modulus or not below it
+    """
+    if len(signature) != (n.bit_length() + 7) >> 3:
+        return None
+    s = int.from_bytes(signature, "big")
+    return s if s < n else None
+
+
+def verify(message, signature, key, scheme = "pss") -> bool:
+    """
+    Verifies the signature of a message with a public key (or a private key): s^e mod n, by the 
+    short ladder of fermat_exp for e = 2^k + 1, has to be a valid encoding of the message
+
+    Args:
+        message (str | bytes-like) : The signed message
+        signature (bytes-like) : The signature
+        key (RSAPublicKey | RSAPrivateKey) : The key
+        scheme (str | object) : A name of SIGNATURES, or a scheme object
+
+    Returns:
+        valid (bool) : Whether the signature is valid
+
+    Example:
+        >>> key = generate_keypair(1024)
+        >>> verify(b"Hello", sign(b"Hello", key, "pkcs1"), key, "pkcs1"), verify(b"Hallo", sign(b"Hello", key), key)
+        (True, False)
+    """
+    scheme = get_signature(scheme)
+    s = _signature_int(signature, key.n)
+    if s is None:
+        return False
+    return scheme.check(message, rsa_enc(s, key.n, key.e, context = key.context_n), key.n.bit_length())
+
+
+def _product(values, n: int, context) -> int:
+    """
+    The product of integers modulo n, in the Montgomery domain when there is a context
+    """
+    if context is None:
+        acc = 1
+        for v in values:
+            acc = euclidian_div(acc * v, n)[1]
+        return acc
+
+    acc = context.r
+    for v in values:
+        acc = context.mul(acc, context.to_mont(v))
+    return context.from_mont(acc)
+
+
+def _screen(indices, ss, ms, key, valid):
+    """
+    The product test over a set of signatures, (s_1 ... s_b)^e = m_1 ... m_b mod n. When it fails,
+    the set is split in two halves, down to the single signatures which fail it
+    """
+    if not indices:
+        return
+    s = _product([ss[i] for i in indices], key.n, key.context_n)
+    if rsa_enc(s, key.n, key.e, context = key.context_n) == _product([ms[i] for i in indices], key.n, key.context_n):
+        for i in indices:
+            valid[i] = True
+        return
+    if len(indices) > 1:
+        mid = len(indices) // 2
+        _screen(indices[:mid], ss, ms, key, valid)
+        _screen(indices[mid:], ss, ms, key, valid)
+
+
+def verify_many(messages, signatures, key, scheme = "pss", screening: bool = False) -> list:
+    """
+    Verifies many signatures under the same key, the scheme object, the size of the modulus and the
+    Montgomery context of n being shared by all the verifications, each being the short ladder of 
+    fermat_exp for e = 2^k + 1.
+
+    With screening (for a deterministic encoding, RSASSA-PKCS1-v1_5), the whole batch is checked
+    by a single public expenentiation, (s_1 ... s_b)^e = EM_1 ... EM_b mod n: two modular products
+    per signature instead of a ladder. If the batch fails, it is split in halves to find the bad 
+    signatures. The product test is a screening test (Bellare, Garay and Rabin): it tells that the
+    messages were signed by the owner of the key, but not that every signature is the right one, 
+    two invalid signatures s_1 * t and s_2 / t pass together. Use it only when the authenticity of
+    the messages is what matters, not the signatures themselves.
+
+    Args:
+        messages (iterable) : The signed messages
+        signatures (iterable) : Their signatures, in the same order
+        key (RSAPublicKey | RSAPrivateKey) : The key
+        scheme (str | object) : A name of SIGNATURES, or a scheme object
+        screening (bool) : Whether to use the product test, False by default
+
+    Raises:
+        ValueError : If the number of messages and signatures is not equal
+        ValueError : If screening is asked for a randomized encoding (PSS)
+
+    Returns:
+        valid (list) : Whether each signature is valid, in order
+
+    Example:
+        >>> key = generate_keypair(1024)
+        >>> sigs = sign_many([b"a", b"b", b"c"], key, "pkcs1")
+        >>> verify_many([b"a", b"x", b"c"], sigs, key, "pkcs1", screening = True)
+        [True, False, True]
+    """
+    scheme = get_signature(scheme)
+    messages, signatures = list(messages), list(signatures)
+    if len(messages) != len(signatures):
+        raise ValueError("The number of messages and signatures is not equal")
+
+    ss = [_signature_int(signature, key.n) for signature in signatures]
+    if not screening:
+        bits = key.n.bit_length()
+        return [
+            s is not None and scheme.check(message, rsa_enc(s, key.n, key.e, context = key.context_n), bits)
+            for message, s in zip(messages, ss)
+        ]
+
+    if not scheme.deterministic:
+        raise ValueError("The product test needs a deterministic encoding, as RSASSA-PKCS1-v1_5")
+
+    bits = key.n.bit_length()
+    ms = [int.from_bytes(scheme.encode(message, bits), "big") for message in messages]
+    valid = [False] * len(ss)
+    _screen([i for i, s in enumerate(ss) if s is not None], ss, ms, key, valid)
+    return valid
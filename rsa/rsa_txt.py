@@ -0,0 +1,440 @@
+"""
+rsa_txt.py
+
+This module connects the RSA to messages of any length: texts, files or any stream of bytes.
+With k the size of the modulus in bytes, the message is cut into blocks of k - 11 bytes, every
+block is padded with PKCS#1 v1.5 into k bytes (see utils.padding_pkcs1), read as an integer and
+encrypted, and its cipher text is written on exactly k bytes. The padding can be replaced by
+OAEP (padding = "oaep", see rsa.rsa_pkcs1), the blocks then hold k - 2 * hLen - 2 bytes. The cipher stream is then a sequence
+of fixed size blocks, which the decryption reads back k bytes at a time, decrypts and unpads.
+
+Everything is a generator: the input is read one batch of blocks at a time (a file is never
+loaded in memory), and the next batch is only read when the consumer asks for more output. With
+an executor (a process pool for instance), several batches are encrypted at once, but never more
+than 'max_pending' of them: a slow consumer stops the reading of the input (back-pressure), so the
+memory used stays bounded whatever the size of the input.
+
+For files on disk, the memory mapped mode goes further: since every cipher block has exactly k
+bytes (and every plain block but the last exactly k - 11, for PKCS#1 v1.5), the offset of any block in the output
+is known before encrypting anything. The output file is created at its final size, both files are
+mapped with mmap, and the block ranges are handed to a process pool, whose workers map the files
+themselves and read and write their blocks through memoryview slices of the mappings: nothing is
+sent back to the parent process and there is no reassembly.
+
+    Functions:
+        - modulus_size(n) : the size of the modulus in bytes, the size of the cipher blocks
+        - read_blocks(source, size) : the blocks of a stream, from a file-like object, bytes or an iterable
+        - encrypt_stream(source, key, batch, executor, max_pending) : generator of the cipher blocks
+        - decrypt_stream(source, key, batch, executor, max_pending) : generator of the plain blocks
+        - encrypt_file(src, dst, key) / decrypt_file(src, dst, key) : the streams between two files
+        - encrypt_file_mmap(src, dst, key) / decrypt_file_mmap(src, dst, key) : the memory mapped mode, on a process pool
+        - encrypt_text(txt, key) / decrypt_text(data, key) : for a text message
+"""
+
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from rsa.rsa_algorithm import *
+from rsa.rsa_pkcs1 import get_padding
+from utils.text_message_utils import to_buffer
+
+def modulus_size(n: int) -> int:
+    """
+    The size of the modulus in bytes, i.e the size of every cipher block
+
+    Example:
+        >>> modulus_size(2 ** 2047 + 1)
+        256
+    """
+    return (n.bit_length() + 7) >> 3
+
+
+def _plain_size(k: int, padding) -> int:
+    """
+    The size of the plain blocks of a modulus of k bytes under a padding scheme
+    """
+    if k <= padding.overhead:
+        raise ValueError(f"The modulus is too small for the padding, it needs more than {padding.overhead} bytes")
+    return k - padding.overhead
+
+
+def _chunks(source, size: int):
+    """
+    The chunks of bytes of a source: the source itself for a str or a bytes-like object (an mmap
+    included, without copy), the successive reads of a file-like object (text or binary), or the 
+    items of an iterable
+    """
+    try:
+        view = to_buffer(source)
+    except TypeError:
+        view = None
+    if view is not None:
+        yield view
+        return
+
+    if hasattr(source, "read"):
+        while True:
+            chunk = source.read(size)
+            if not chunk:
+                return
+            yield to_buffer(chunk)
+    else:
+        for chunk in source:
+            yield to_buffer(chunk)
+
+
+def read_blocks(source, size: int, chunk_blocks: int = 64):
+    """
+    Cuts a stream into consecutive blocks of 'size' bytes, the last one being shorter if needed.
+    The source is read 'chunk_blocks' blocks at a time, and the blocks lying inside a chunk are
+    memoryview slices of it, without copy. Only the blocks straddling two chunks are copied.
+
+    Args:
+        source : A file-like object (with a read method, text or binary), a str, a bytes-like
+        object (bytes, bytearray, memoryview, mmap) or an iterable of str or bytes-like chunks
+        size (int) : The size of the blocks in bytes
+        chunk_blocks (int) : The number of blocks read at once from a file-like object
+
+    Example:
+        >>> [bytes(block) for block in read_blocks([b"ab", b"cdefg"], 3)]
+        [b'abc', b'def', b'g']
+    """
+    if size < 1:
+        raise ValueError("The blocks have at least 1 byte")
+
+    pending = bytearray()
+    for view in _chunks(source, size * chunk_blocks):
+        start = 0
+
+        # Completing the block started by the previous chunks
+        if pending:
+            start = min(size - len(pending), len(view))
+            pending += view[:start]
+            if len(pending) < size:
+                continue
+            yield bytes(pending)
+            pending = bytearray()
+
+        while len(view) - start >= size:
+            yield view[start:start + size]
+            start += size
+        pending += view[start:]
+
+    if pending:
+        yield bytes(pending)
+
+
+def _batched(blocks, batch: int):
+    """
+    Groups the blocks into lists of 'batch' blocks
+    """
+    group = []
+    for block in blocks:
+        group.append(block)
+        if len(group) == batch:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
+def _encrypt_batch(blocks: list, key, k: int, padding) -> list:
+    """
+    Pads and encrypts a batch of plain blocks, returns the cipher blocks of k bytes
+    """
+    ms = [int.from_bytes(padded, "big") for padded in padding.encode_many(blocks, k)]
+    return [c.to_bytes(k, "big") for c in key.encrypt_many(ms)]
+
+
+def _decrypt_batch(blocks: list, key, k: int, padding) -> list:
+    """
+    Decrypts and unpads a batch of cipher blocks of k bytes, returns the plain blocks
+    """
+    cs = []
+    for block in blocks:
+        if len(block) != k:
+            raise ValueError(f"The cipher stream isn't made of blocks of {k} bytes")
+        c = int.from_bytes(block, "big")
+        if c >= key.n:
+            raise ValueError("A cipher block is not below the modulus")
+        cs.append(c)
+    return padding.decode_many([m.to_bytes(k, "big") for m in key.decrypt_many(cs)], k)
+
+
+def _pipeline(batches, task, args: tuple, executor, max_pending: int):
+    """
+    Runs the task over the batches and yields the blocks of its results in order. With an executor,
+    up to max_pending batches run at once, and the next batch is only read once the oldest one has
+    been consumed
+    """
+    if executor is None:
+        for blocks in batches:
+            yield from task(blocks, *args)
+        return
+
+    if max_pending < 1:
+        raise ValueError("At least one batch has to be pending")
+
+    pending = deque()
+    for blocks in batches:
+        # The memoryview slices can't be sent to another process
+        pending.append(executor.submit(task, [bytes(block) for block in blocks], *args))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+
+def encrypt_stream(source, key, batch: int = 64, executor = None, max_pending: int = 4, padding = "pkcs1"):
+    """
+    Encrypts a stream of any length with the RSA and the PKCS#1 v1.5 padding: the stream is cut
+    into blocks of k - 11 bytes (k the size of the modulus in bytes), each of them is padded into
+    k bytes and encrypted into a cipher block of exactly k bytes. This is a generator, the memory
+    used is bounded by (max_pending + 1) batches whatever the size of the stream.
+
+    Args:
+        source : The stream, see read_blocks (a file object, bytes, str or an iterable of chunks)
+        key (RSAPublicKey | RSAPrivateKey) : The key to encrypt with, with a modulus of at least 12 bytes
+        batch (int) : The number of blocks encrypted together
+        executor (Executor) : If given, the batches are encrypted on it (a ProcessPoolExecutor for instance)
+        max_pending (int) : The number of batches running at once on the executor
+        padding (str | scheme) : The padding, "pkcs1", "oaep" or a scheme of rsa.rsa_pkcs1 such as OAEP("sha512", label)
+
+    Raises:
+        ValueError : If the modulus is too small for the padding
+
+    Yields:
+        block (bytes) : The cipher blocks of k bytes, in order
+
+    Example:
+        >>> key = RSAPrivateKey(759902534011993492390886979244737626978083, 1462428735316547974645342609)
+        >>> blocks = list(encrypt_stream(b"Hello, World!" * 2, key))
+        >>> [len(block) for block in blocks]
+        [29, 29]
+        >>> b"".join(decrypt_stream(b"".join(blocks), key))
+        b'Hello, World!Hello, World!'
+    """
+    if isinstance(key, RSAPrivateKey):
+        key = key.public_key()
+
+    padding = get_padding(padding)
+    k = modulus_size(key.n)
+    batches = _batched(read_blocks(source, _plain_size(k, padding)), batch)
+    yield from _pipeline(batches, _encrypt_batch, (key, k, padding), executor, max_pending)
+
+
+def decrypt_stream(source, key, batch: int = 64, executor = None, max_pending: int = 4, padding = "pkcs1"):
+    """
+    Decrypts a stream encrypted by encrypt_stream: it is read k bytes at a time, every cipher block
+    is decrypted (with the CRT) and unpadded. As encrypt_stream, this is a generator with a bounded
+    memory use.
+
+    Args:
+        source : The cipher stream, see read_blocks
+        key (RSAPrivateKey) : The private key
+        batch (int) : The number of blocks decrypted together
+        executor (Executor) : If given, the batches are decrypted on it
+        max_pending (int) : The number of batches running at once on the executor
+        padding (str | scheme) : The padding the stream was encrypted with
+
+    Raises:
+        ValueError : If the stream isn't made of cipher blocks of k bytes, or a block isn't well padded
+
+    Yields:
+        block (bytes) : The plain blocks, in order
+    """
+    if not isinstance(key, RSAPrivateKey):
+        raise ValueError("Decryption needs a private key")
+
+    padding = get_padding(padding)
+    k = modulus_size(key.n)
+    batches = _batched(read_blocks(source, k), batch)
+    yield from _pipeline(batches, _decrypt_batch, (key, k, padding), executor, max_pending)
+
+
+def encrypt_file(src: str, dst: str, key, **kwargs) -> int:
+    """
+    Encrypts the file at path src into the file at path dst, streaming it (see encrypt_stream
+    for the other arguments). Returns the number of bytes written
+    """
+    written = 0
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for block in encrypt_stream(fin, key, **kwargs):
+            written += fout.write(block)
+    return written
+
+
+def decrypt_file(src: str, dst: str, key, **kwargs) -> int:
+    """
+    Decrypts the file at path src, encrypted by encrypt_file, into the file at path dst (see
+    decrypt_stream for the other arguments). Returns the number of bytes written
+    """
+    written = 0
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for block in decrypt_stream(fin, key, **kwargs):
+            written += fout.write(block)
+    return written
+
+
+def encrypt_text(txt: str, key, padding = "pkcs1") -> bytes:
+    """
+    Encrypts a text message (encoded in utf-8), returns the cipher blocks joined together
+
+    Example:
+        >>> key = RSAPrivateKey(759902534011993492390886979244737626978083, 1462428735316547974645342609)
+        >>> decrypt_text(encrypt_text("Hello, World!", key), key)
+        'Hello, World!'
+    """
+    return b"".join(encrypt_stream(txt, key, padding = padding))
+
+
+def decrypt_text(data: bytes, key, padding = "pkcs1") -> str:
+    """
+    Decrypts the cipher blocks of a text message encrypted by encrypt_text
+    """
+    return b"".join(decrypt_stream(data, key, padding = padding)).decode("utf-8")
+
+
+def _map_blocks(task, src: str, dst: str, args: tuple, sizes: tuple, first: int, last: int, batch: int):
+    """
+    Task of the workers: maps both files, and runs the task (_encrypt_batch or _decrypt_batch) on
+    the input blocks first to last - 1, a batch at a time, writing every result at its offset in
+    the output. The blocks are read and written through memoryview slices of the mappings
+    """
+    size_in, size_out = sizes
+    with open(src, "rb") as fin, open(dst, "r+b") as fout:
+        with mmap.mmap(fin.fileno(), 0, access = mmap.ACCESS_READ) as min_, \
+             mmap.mmap(fout.fileno(), 0, access = mmap.ACCESS_WRITE) as mout:
+            with memoryview(min_) as view_in, memoryview(mout) as view_out:
+                for start in range(first, last, batch):
+                    end = min(start + batch, last)
+                    blocks = [view_in[i * size_in:(i + 1) * size_in] for i in range(start, end)]
+                    try:
+                        results = task(blocks, *args)
+                    finally:
+                        # The mappings can't be closed while a slice of them is alive
+                        for block in blocks:
+                            block.release()
+
+                    for i, block in enumerate(results, start):
+                        offset = i * size_out
+                        if len(block) != min(size_out, len(view_out) - offset):
+                            raise ValueError(f"Block {i} doesn't fill its {size_out} bytes in the output")
+                        view_out[offset:offset + size_out] = block
+
+
+def _run_ranges(task, src: str, dst: str, args: tuple, sizes: tuple, count: int, executor, max_workers: int, 
+                blocks_per_task: int, batch: int):
+    """
+    Cuts the blocks 0 to count - 1 into ranges and runs _map_blocks on them, on the given executor,
+    on a process pool started for the call, or in this process for a single range or worker
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    size = blocks_per_task or max(batch, -(-count // (4 * max_workers)))
+    ranges = [(first, min(first + size, count)) for first in range(0, count, size)]
+
+    if executor is None and (max_workers == 1 or len(ranges) <= 1):
+        for first, last in ranges:
+            _map_blocks(task, src, dst, args, sizes, first, last, batch)
+        return
+
+    own_pool = executor is None
+    if own_pool:
+        executor = ProcessPoolExecutor(max_workers = max_workers)
+    try:
+        tasks = [
+            executor.submit(_map_blocks, task, src, dst, args, sizes, first, last, batch) 
+            for first, last in ranges
+        ]
+        for future in tasks:
+            future.result()
+    finally:
+        if own_pool:
+            executor.shutdown()
+
+
+def encrypt_file_mmap(src: str, dst: str, key, executor = None, max_workers: int = None, 
+                      blocks_per_task: int = None, batch: int = 64, padding = "pkcs1") -> int:
+    """
+    Encrypts the file at path src into the file at path dst as encrypt_file does (same format), but
+    with both files memory mapped and the blocks encrypted in parallel: the output is created at
+    its final size (k bytes per block of k - 11 bytes of the input), and every worker encrypts a
+    range of blocks, writing them straight into the mapped output at their offsets.
+
+    Args:
+        src (str) : The path of the file to encrypt
+        dst (str) : The path of the encrypted file, overwritten
+        key (RSAPublicKey | RSAPrivateKey) : The key to encrypt with
+        executor (Executor) : The process pool to run on, by default one is started for the call
+        max_workers (int) : The number of processes of that pool, the number of cores by default
+        blocks_per_task (int) : The number of blocks of a range, to give each worker 4 ranges by default
+        batch (int) : The number of blocks encrypted together inside a range
+        padding (str | scheme) : The padding, see encrypt_stream
+
+    Raises:
+        ValueError : If the modulus is too small for the padding
+
+    Returns:
+        written (int) : The size of the encrypted file
+    """
+    if isinstance(key, RSAPrivateKey):
+        key = key.public_key()
+
+    padding = get_padding(padding)
+    k = modulus_size(key.n)
+    size = _plain_size(k, padding)
+    count = -(-os.path.getsize(src) // size)
+    with open(dst, "wb") as fout:
+        fout.truncate(count * k)
+
+    if count:
+        _run_ranges(_encrypt_batch, src, dst, (key, k, padding), (size, k), count, executor, max_workers, blocks_per_task, batch)
+    return count * k
+
+
+def decrypt_file_mmap(src: str, dst: str, key, executor = None, max_workers: int = None, 
+                      blocks_per_task: int = None, batch: int = 64, padding = "pkcs1") -> int:
+    """
+    Decrypts the file at path src, encrypted by encrypt_file or encrypt_file_mmap, into the file at
+    path dst with both files memory mapped and the blocks decrypted in parallel. Every block but the
+    last one holds exactly k - 11 bytes of the message (k - 2 * hLen - 2 with OAEP), so the last block is decrypted first, which
+    gives the size of the output, and the workers then decrypt ranges of the other blocks straight
+    into the mapped output. The arguments are the ones of encrypt_file_mmap.
+
+    Raises:
+        ValueError : If the file isn't made of cipher blocks of k bytes, or a block isn't well padded,
+        or isn't full without being the last one
+
+    Returns:
+        written (int) : The size of the decrypted file
+    """
+    if not isinstance(key, RSAPrivateKey):
+        raise ValueError("Decryption needs a private key")
+
+    padding = get_padding(padding)
+    k = modulus_size(key.n)
+    size = _plain_size(k, padding)
+    length = os.path.getsize(src)
+    if length % k:
+        raise ValueError(f"The cipher file isn't made of blocks of {k} bytes")
+
+    count = length // k
+    if count == 0:
+        open(dst, "wb").close()
+        return 0
+
+    with open(src, "rb") as fin:
+        fin.seek(length - k)
+        last = _decrypt_batch([fin.read(k)], key, k, padding)[0]
+
+    written = (count - 1) * size + len(last)
+    with open(dst, "wb") as fout:
+        fout.truncate(written)
+        fout.seek(written - len(last))
+        fout.write(last)
+
+    if count > 1:
+        _run_ranges(_decrypt_batch, src, dst, (key, k, padding), (k, size), count - 1, executor, max_workers, blocks_per_task, batch)
+    return written
@@ -6,6 +6,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pytest
+import random
 from rsa.modular_arithmetic import * 
 
 def test_euclidian_div():
@@ -26,6 +27,26 @@ def test_euclidian_div():
     with pytest.raises(ValueError):
         euclidian_div(7, 0)
 
+    # Negative operands, the remainder stays in [0, |b|)
+    assert euclidian_div(-7, 3) == (-3, 2)
+    assert euclidian_div(7, -3) == (-2, 1)
+    assert euclidian_div(-7, -3) == (3, 2)
+    assert euclidian_div(-6, 3) == (-2, 0)
+
+def test_euclidian_div_large():
+    """
+    Test the euclidian division on large operands, going through both the 
+    schoolbook limb division and the Burnikel-Ziegler division
+    """
+    random.seed(0)
+    for bits in [64, 512, 2048, 4096, 10000]:
+        b = random.getrandbits(bits) | (1 << (bits - 1))
+        for a_bits in [bits // 2, bits, 2 * bits, 3 * bits + 5]:
+            a = random.getrandbits(a_bits)
+            q, r = euclidian_div(a, b)
+            assert b * q + r == a
+            assert 0 <= r < b
+
 def test_gcd(): 
     """
     Test the gcd function 
@@ -62,6 +83,53 @@ def test_euclidian_ext():
     gc, u, v = euclidian_ext(12345, 54321)
     assert u * 12345 + v * 54321 == gc
 
+def test_lehmer_gcd():
+    """
+    Test the gcd, extended euclid and modular inverse on large operands, 
+    where the single precision steps of Lehmer's algorithm are used
+    """
+    random.seed(4)
+    for bits in [70, 512, 2048]:
+        a, b = random.getrandbits(bits), random.getrandbits(bits // 2 + 1)
+        g = random.getrandbits(bits // 4) + 1
+        gc, u, v = euclidian_ext(a * g, b * g)
+        assert u * a * g + v * b * g == gc
+        assert gcd(a * g, b * g) == gc
+        assert gc % g == 0
+
+    n = 2 ** 521 - 1
+    a = random.getrandbits(1000)
+    assert mod_inv(a, n) * a % n == 1
+    with pytest.raises(ValueError):
+        mod_inv(6, 9)
+
+def test_mod_inv_many():
+    """
+    Test the simultaneous modular inversion 
+    """
+    assert mod_inv_many([2, 3, 4], 7) == [4, 5, 2]
+    assert mod_inv_many([], 7) == []
+
+    n = 2 ** 127 - 1
+    values = [random.randrange(1, n) for _ in range(20)]
+    assert mod_inv_many(values, n) == [mod_inv(a, n) for a in values]
+
+    with pytest.raises(ValueError):
+        mod_inv_many([2, 3, 4], 9)
+
+def test_jacobi():
+    """
+    Test the Jacobi symbol against Euler's criterion for primes, and on composite moduli 
+    """
+    for p in [3, 5, 7, 13, 101]:
+        for a in range(-20, 120):
+            legendre = mod_exp(a, (p - 1) // 2, p)
+            assert jacobi(a, p) == (legendre if legendre <= 1 else -1)
+
+    assert jacobi(5, 21) == 1 and jacobi(7, 15) == -1 and jacobi(3, 9) == 0 and jacobi(0, 1) == 1
+    with pytest.raises(ValueError):
+        jacobi(3, 8)
+
 def test_mod_exp_basic():
     """
     Test for the modular expenentiation function
@@ -71,6 +139,67 @@ def test_mod_exp_basic():
     assert mod_exp(5, 0, 13) == 1
     assert mod_exp(4, 2, 5) == 1
 
+def test_mod_exp_window():
+    """
+    Test the sliding window modular expenentiation against the builtin pow, 
+    for automatic and user given window sizes, and negative exponents
+    """
+    random.seed(1)
+    for bits in [16, 256, 1024]:
+        n = random.getrandbits(bits) | 1
+        a = random.getrandbits(bits + 10)
+        e = random.getrandbits(bits)
+        for window in [None, 1, 2, 4, 6]:
+            assert mod_exp(a, e, n, window) == pow(a, e, n)
+
+    assert mod_exp(3, -1, 7) == 5
+    assert mod_exp(10, 65537, 1) == 0
+
+    with pytest.raises(ValueError):
+        mod_exp(2, 3, 5, window = 0)
+
+def test_fermat_exp():
+    """
+    Test the short ladder of the exponents 2^k + 1 against the builtin pow, with and 
+    without a Montgomery context
+    """
+    assert [fermat_exponent(e) for e in [3, 5, 17, 65537, 2, 7, 65535]] == [1, 2, 4, 16, None, None, None]
+
+    random.seed(5)
+    for bits in [16, 512, 2048]:
+        n = random.getrandbits(bits) | 1
+        ctx = MontgomeryContext(n)
+        for k in [1, 4, 16]:
+            a = random.getrandbits(bits + 10)
+            assert fermat_exp(a, k, n) == fermat_exp(a, k, n, ctx) == pow(a, 2 ** k + 1, n)
+    assert fermat_exp(n - 1, 16, n, ctx) == n - 1
+
+    with pytest.raises(ValueError):
+        fermat_exp(2, 16, 13, MontgomeryContext(11))
+
+def test_montgomery_context():
+    """
+    Test the Montgomery context: conversions, multiplication, and the 
+    expenentiation through mod_exp
+    """
+    ctx = MontgomeryContext(13)
+    assert ctx.from_mont(ctx.to_mont(5)) == 5
+    assert ctx.from_mont(ctx.mul(ctx.to_mont(5), ctx.to_mont(7))) == 9
+    assert ctx.from_mont(ctx.sqr(ctx.to_mont(6))) == 10
+    assert ctx.pow(2, 10) == 10
+
+    random.seed(2)
+    n = random.getrandbits(1024) | 1
+    ctx = MontgomeryContext(n)
+    a, e = random.getrandbits(1100), random.getrandbits(1024)
+    assert mod_exp(a, e, n, context = ctx) == pow(a, e, n)
+
+    # The modulus has to be odd, and to match the context
+    with pytest.raises(ValueError):
+        MontgomeryContext(12)
+    with pytest.raises(ValueError):
+        mod_exp(2, 3, 11, context = MontgomeryContext(13))
+
 def test_chinese_remainders():
     """
     Test for the chinese remainders function 
@@ -78,3 +207,29 @@ def test_chinese_remainders():
     assert chinese_remainders([3, 4, 5],[2, 3, 1]) == 11 
 
 
+
+def test_crt_basis():
+    """
+    Test the precomputed chinese remainders basis 
+    """
+    basis = CRTBasis([3, 4, 5])
+    assert basis.M == 60
+    assert basis.combine([2, 3, 1]) == 11
+    assert basis.combine_many([[2, 3, 1], [0, 0, 1], [5, -1, 7]]) == [11, 36, 47]
+
+    random.seed(3)
+    moduli = [1000003, 1000033, 1000037, 1000039, 2 ** 61 - 1]
+    basis = CRTBasis(moduli)
+    for _ in range(20):
+        x = random.randrange(basis.M)
+        assert basis.combine([x % ai for ai in moduli]) == x
+
+    # The moduli have to be coprime, and the sizes have to match 
+    with pytest.raises(ValueError):
+        CRTBasis([6, 35, 10])
+    with pytest.raises(ValueError):
+        CRTBasis([])
+    with pytest.raises(ValueError):
+        basis.combine([1, 2])
+    with pytest.raises(ValueError):
+        chinese_remainders([4, 6], [1, 1])
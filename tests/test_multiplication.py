@@ -0,0 +1,66 @@
+# tests/test_multiplication.py 
+import sys
+import os
+import pytest 
+import random
+# Adding the module path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.modular_arithmetic import *
+from rsa.multiplication import *
+
+def test_limbs():
+    """
+    Test the conversion to and from limb arrays 
+    """
+    assert to_limbs(0) == []
+    assert to_limbs(2 ** 30 + 5) == [5, 1]
+    assert from_limbs(to_limbs(12345678901234567890)) == 12345678901234567890
+
+def test_multiplication_backends():
+    """
+    Test every multiplication backend against python's multiplication, for signed operands 
+    of various (and unbalanced) sizes, going through the recursions of Karatsuba and Toom-3
+    """
+    random.seed(5)
+    sizes = [0, 1, 30, 100, 1000, 5000, 20000]
+    for a_bits in sizes:
+        for b_bits in sizes:
+            a = random.getrandbits(a_bits) * random.choice([1, -1])
+            b = random.getrandbits(b_bits) * random.choice([1, -1])
+            assert mul_karatsuba(a, b) == a * b
+            assert mul_toom3(a, b) == a * b
+            if a_bits <= 5000 and b_bits <= 5000:
+                assert mul_schoolbook(a, b) == a * b
+
+def test_backends_in_modular_arithmetic():
+    """
+    Test the modular arithmetic routed through the backends 
+    """
+    random.seed(6)
+    n = random.getrandbits(4000) | 1
+    a, e = random.getrandbits(4000), random.getrandbits(32)
+    for name in BACKENDS:
+        mul = get_backend(name)
+        assert mod_exp(a, e, n, mul = mul) == pow(a, e, n)
+        assert MontgomeryContext(n, mul).pow(a, e) == pow(a, e, n)
+        assert CRTBasis([3, 4, 5], mul).combine([2, 3, 1]) == 11
+
+    with pytest.raises(ValueError):
+        get_backend("fft")
+
+def test_tune_thresholds():
+    """
+    Test the tuning of the crossover thresholds, the backends stay correct with the tuned values
+    """
+    import rsa.multiplication as multiplication
+    saved = multiplication.KARATSUBA_THRESHOLD, multiplication.TOOM3_THRESHOLD
+
+    karatsuba, toom3 = tune_thresholds(limit = 128, number = 1)
+    assert 4 <= karatsuba <= toom3 <= 128
+    assert (multiplication.KARATSUBA_THRESHOLD, multiplication.TOOM3_THRESHOLD) == (karatsuba, toom3)
+
+    a, b = random.getrandbits(9000), random.getrandbits(9000)
+    assert mul_toom3(a, b) == a * b
+
+    multiplication.KARATSUBA_THRESHOLD, multiplication.TOOM3_THRESHOLD = saved
@@ -0,0 +1,178 @@
+# tests/test_prime_utils.py 
+import sys
+import os
+import pytest 
+# Adding the module path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.prime_utils import *
+import utils.prime_utils as prime_utils
+from rsa.rsa_algorithm import rsa_enc
+
+def test_gen_rsa_prime():
+    """
+    Test the generation of random primes for the RSA 
+    """
+    for bits in [2, 16, 64, 128]:
+        p = gen_rsa_prime(bits, 3)
+        assert p.bit_length() == bits
+        assert bits > 40 or is_prime(p, "naive")
+        assert is_prime(p, "miller-rabin")
+        assert gcd(3, p - 1) == 1 or p == 2
+
+    with pytest.raises(ValueError):
+        gen_rsa_prime(1)
+
+def test_incremental_prime_search():
+    """
+    Test the incremental sieve search of primes 
+    """
+    stats = {}
+    for bits in [32, 64, 256]:
+        p = incremental_prime_search(bits, 3, stats = stats)
+        assert p.bit_length() == bits
+        assert bits > 40 or is_prime(p, "naive")
+        assert is_prime(p, "miller-rabin")
+        assert gcd(3, p - 1) == 1
+
+    # Only the candidates without small factors are tested
+    assert 3 <= stats["tests"] <= stats["candidates"]
+    assert incremental_prime_search(64, low = 3 << 62) >> 62 == 3
+
+    with pytest.raises(ValueError):
+        incremental_prime_search(16)
+
+def test_sieve_backends(monkeypatch):
+    """
+    Test the residues and the window sieve of the incremental search, with the pure python 
+    backend and the NumPy one when it is installed 
+    """
+    n = 2 ** 1023 + 2 ** 511 + 12345
+    primes = small_primes()[1:]
+    composite = [any((n + 2 * k) % p == 0 for p in primes) for k in range(256)]
+
+    for backend in ["python"] + (["numpy"] if prime_utils.np is not None else []):
+        monkeypatch.setattr(prime_utils, "SIEVE_BACKEND", backend)
+        vector = prime_utils._odd_small_primes()
+        residues = prime_utils._small_residues(n, vector)
+        assert [int(r) for r in residues] == [n % p for p in primes]
+        assert prime_utils._sieve_window(vector, residues, 256).tolist() == composite
+        shifted = prime_utils._shift_residues(vector, residues, 512)
+        assert [int(r) for r in shifted] == [(n + 512) % p for p in primes]
+        assert incremental_prime_search(64).bit_length() == 64
+
+def test_generate_multiprime_keypair():
+    """
+    Test the generation of multi-prime RSA keys 
+    """
+    for k in [2, 3, 5]:
+        key = generate_multiprime_keypair(256, k)
+        assert key.n.bit_length() == 256
+        assert len(set(key.primes)) == k
+        assert key.decrypt(pow(42, key.e, key.n)) == 42
+
+    with pytest.raises(ValueError):
+        generate_multiprime_keypair(256, 1)
+    with pytest.raises(ValueError):
+        generate_multiprime_keypair(40, 3)
+
+def test_primes_up_to():
+    """
+    Test the list of the small primes 
+    """
+    assert primes_up_to(1) == []
+    assert primes_up_to(20) == [2, 3, 5, 7, 11, 13, 17, 19]
+    assert len(primes_up_to(10000)) == 1229
+
+def test_segmented_sieve():
+    """
+    Test the segmented odd-only sieve, with segments smaller than the range 
+    """
+    for n in [0, 1, 2, 3, 25, 26, 1000]:
+        primes = [p for p in range(2, n + 1) if all(p % q for q in range(2, p))]
+        assert list(segmented_sieve(n)) == list(segmented_sieve(n, 8)) == primes
+        assert count_primes(n, 16) == sieve_with_bitarray(n) == len(primes)
+    assert count_primes(10 ** 6, 1000) == 78498
+
+def test_primality_engine():
+    """
+    Test the deterministic Miller-Rabin, the Baillie-PSW test and the FIPS round counts 
+    """
+    primes = set(primes_up_to(60000))
+    for method in ["miller-rabin", "bpsw"]:
+        assert [n for n in range(20001, 60000, 2) if is_prime(n, method)] == sorted(p for p in primes if p > 20000)
+
+        # Strong pseudoprimes to the first 9 and 12 prime bases, and the bound of the 13 bases 
+        for n in [3825123056546413051, 318665857834031151167461, 3317044064679887385961981]:
+            assert not is_prime(n, method)
+        assert is_prime(2 ** 89 - 1, method) and is_prime(2 ** 521 - 1, method)
+        assert not is_prime((2 ** 127 - 1) * (2 ** 89 - 1), method)
+    assert is_prime(2 ** 521 - 1, "miller-rabin", rounds = 1)
+
+    # Strong Lucas pseudoprimes, which the strong test to the base 2 rejects 
+    for n in [5459, 5777, 10877, 16109, 18971, 22499, 24569, 25199, 40309, 58519]:
+        assert prime_utils._strong_lucas(MontgomeryContext(n))
+        assert not is_prime(n, "bpsw")
+
+    assert [miller_rabin_rounds(bits) for bits in [256, 512, 1024, 2048]] == [50, 7, 5, 4]
+    with pytest.raises(ValueError):
+        is_prime(1000003, "aks")
+
+def test_is_prime_many():
+    """
+    Test the batch primality tests, with the small-prime filter of the remainder tree 
+    """
+    values = list(range(-3, 30000)) + [101 * 211, 3 ** 20, 1000003 * 1000033]
+    for method in ["naive", "miller-rabin", "bpsw"]:
+        assert is_prime_many(values, method) == [is_prime(n, method) for n in values]
+
+    values = [2 ** 89 - 1, 2 ** 127 - 1, (2 ** 89 - 1) * (2 ** 127 - 1), 3 ** 80, 1009 * (2 ** 127 - 1)]
+    assert is_prime_many(values, "bpsw") == [True, True, False, False, False]
+    assert is_prime_many(iter([7, 15, 1000003, 1000005])) == [True, False, True, False]
+    assert is_prime_many([]) == []
+
+def test_prime_table(tmp_path):
+    """
+    Test the cached small-prime table and the primorial gcd pre-filter 
+    """
+    assert small_primes()[:8] == [2, 3, 5, 7, 11, 13, 17, 19]
+    assert len(small_primes()) == sieve_with_bitarray(PRIME_TABLE_LIMIT)
+
+    # Persisted to disk, then read back
+    path = tmp_path / "primes.bin"
+    table = load_prime_table(str(path))
+    assert path.exists() and load_prime_table(str(path)) == table
+
+    assert passes_primorial_gcd(19997) and not passes_primorial_gcd(19999 * 3)
+    assert passes_primorial_gcd(1000003 * 1000033)
+    assert not passes_primorial_gcd(1009 * 1000003) and not passes_primorial_gcd(2 ** 64)
+
+    for method in ["naive", "fermat", "miller-rabin"]:
+        assert [n for n in range(-3, 200) if is_prime(n, method)] == primes_up_to(200)
+        assert is_prime(1000003, method) and not is_prime(1000003 * 1009, method)
+
+def test_gen_rand_32():
+    """
+    Test the 32 bits pseudo-random integers and primes 
+    """
+    for size in [4, 16, 32]:
+        assert 0 <= gen_rand_int32(size, init_seed()) < 2 ** size
+    assert is_prime(gen_rand_prime32(16, init_seed()), "naive")
+
+def test_generate_keypair():
+    """
+    Test the generation of RSA keys 
+    """
+    for bits in [64, 255, 512]:
+        key = generate_keypair(bits, 65537)
+        assert key.n.bit_length() == bits
+        assert gcd(65537, key.p - 1) == gcd(65537, key.q - 1) == 1
+        assert key.decrypt(rsa_enc(42, key.n, key.e)) == 42
+
+    key = generate_keypair(128, 3)
+    assert key.e == 3 and key.e * key.d % ((key.p - 1) * (key.q - 1)) == 1
+
+    with pytest.raises(ValueError):
+        generate_keypair(16)
+    with pytest.raises(ValueError):
+        generate_keypair(512, 4)
@@ -0,0 +1,70 @@
+# tests/test_product_tree.py 
+import sys
+import os
+import pytest 
+import random
+# Adding the module path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.product_tree import *
+from utils.prime_utils import primes_up_to, gen_rsa_prime
+
+def test_product_tree():
+    """
+    Test the product tree, with and without a size limit 
+    """
+    assert product_tree([3, 5, 7, 11, 13]) == [[3, 5, 7, 11, 13], [15, 77, 13], [1155, 13], [15015]]
+    assert product_tree([42]) == [[42]]
+
+    values = [random.getrandbits(64) | 1 for _ in range(100)]
+    tree = product_tree(values, 256)
+    assert all(node.bit_length() >= 256 for node in tree[-1][:-1])
+    assert sum(len(level) for level in tree) < 200
+
+def test_remainders():
+    """
+    Test the reductions of an integer modulo many integers 
+    """
+    assert remainder_tree(1000, product_tree([3, 5, 7, 11, 13])) == [1, 0, 6, 10, 12]
+    assert remainders(2 ** 100, [3, 5, 7, 1000003]) == [1, 1, 2, 253109]
+    assert remainders(5, []) == []
+
+    moduli = [random.getrandbits(random.randint(8, 300)) + 1 for _ in range(200)]
+    for x in [0, 12345, random.getrandbits(5000), random.getrandbits(50000)]:
+        assert remainders(x, moduli) == [x % m for m in moduli]
+        assert remainder_tree(x, product_tree(moduli), squares = True) == [x % (m * m) for m in moduli]
+
+def test_chinese_remainders_tree():
+    """
+    Test the reconstruction of an integer from its residues 
+    """
+    assert chinese_remainders_tree([2, 3, 2], [3, 5, 7]) == 23
+    assert chinese_remainders_tree([5], [7]) == 5
+
+    moduli = primes_up_to(10000)[100:400]
+    M = 1
+    for m in moduli:
+        M *= m
+    x = random.randrange(M)
+    assert chinese_remainders_tree([x % m for m in moduli], moduli) == x
+
+    with pytest.raises(ValueError):
+        chinese_remainders_tree([1, 2], [6, 9])
+    with pytest.raises(ValueError):
+        chinese_remainders_tree([1, 2], [7])
+
+def test_batch_gcd():
+    """
+    Test the batch gcd on RSA moduli, a few of which share a prime 
+    """
+    assert batch_gcd([35, 77, 143, 17 * 19]) == [7, 77, 11, 1]
+    assert batch_gcd([]) == []
+
+    primes = [gen_rsa_prime(64) for _ in range(41)]
+    moduli = [primes[2 * i] * primes[2 * i + 1] for i in range(20)]
+    moduli += [primes[40] * primes[7], moduli[0]]
+    gcds = batch_gcd(moduli)
+
+    assert [i for i, g in enumerate(gcds) if g != 1] == [0, 3, 20, 21]
+    assert gcds[3] == gcds[20] == primes[7]
+    assert gcds[0] == gcds[21] == moduli[0]
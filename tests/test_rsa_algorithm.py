@@ -17,7 +17,8 @@ def test_rsa_enc():
     assert rsa_enc(2, 33, e = 7) == 29
 
     # For larger values, and e supposed known 
-    assert
+    p, q, e = 57704576143051, 838744063, 2237
+    assert rsa_enc(123456789, p * q, e) == pow(123456789, e, p * q)
     
 
 def test_deterministic():
@@ -26,3 +27,85 @@ def test_deterministic():
     """
 
 
+
+
+def test_rsa_dec():
+    """
+    Test the decryption function with the private exponent and with the prime factorisation
+    """
+    assert rsa_dec(29, 33, d = 3) == 2
+    assert rsa_dec(29, 33, p = 3, q = 11, e = 7) == 2
+
+    # Wrong factorisation 
+    with pytest.raises(ValueError):
+        rsa_dec(29, 33, p = 3, q = 13, e = 7)
+
+def test_rsa_private_key():
+    """
+    Test the private key object with precomputed CRT parameters, with the key sets of the examples
+    """
+    key_sets = [
+        (43, 11, 17),
+        (57704576143051, 838744063, 2237),
+        (759902534011993492390886979244737626978083, 1462428735316547974645342609, 789063169),
+    ]
+    for p, q, e in key_sets:
+        key = RSAPrivateKey(p, q, e)
+        assert key.n == p * q
+        assert key.e * key.d % ((p - 1) * (q - 1)) == 1
+        assert key.q_inv * q % p == 1
+        for m in [0, 1, 2, 42, key.n - 1]:
+            c = rsa_enc(m, key.n, e)
+            assert key.decrypt(c) == m
+            assert rsa_dec(c, key) == m
+            assert rsa_dec(c, key.n, d = key.d) == m
+
+    # The prime factors have to be distinct, and e invertible
+    with pytest.raises(ValueError):
+        RSAPrivateKey(11, 11, 3)
+    with pytest.raises(ValueError):
+        RSAPrivateKey(43, 11, 5)
+
+def test_rsa_batch():
+    """
+    Test the batch encryption and decryption, with the CRT decryption and with 
+    the batch RSA decryption for distinct small public exponents
+    """
+    p, q, e = 759902534011993492390886979244737626978083, 1462428735316547974645342609, 789063169
+    key = RSAPrivateKey(p, q, e)
+    ms = [0, 1, 2, 42, 123456789, key.n - 1]
+
+    cs = rsa_enc_many(ms, key.public_key())
+    assert cs == [rsa_enc(m, key.n, e) for m in ms]
+    assert rsa_dec_many(iter(cs), key) == ms
+
+    # Batch decryption, the exponents are pairwise coprime and coprime with phi(n)
+    exponents = [5, 7, 11, 17, 23, 29]
+    ms = [3, 42, 2 ** 100 + 7, 987654321, key.n - 2, 12345]
+    cs = [rsa_enc(m, key.n, ei) for m, ei in zip(ms, exponents)]
+    assert rsa_dec_many(cs, key, exponents) == ms
+    assert rsa_dec_many([], key, []) == []
+
+    # Mismatched sizes and non coprime exponents
+    with pytest.raises(ValueError):
+        rsa_dec_many(cs, key, exponents[:-1])
+    with pytest.raises(ValueError):
+        rsa_dec_many(cs[:2], key, [5, 5])
+
+def test_rsa_multiprime_key():
+    """
+    Test a multi-prime private key, the decryption recombines the residues modulo every prime 
+    """
+    primes = [1000003, 1000033, 1000037, 1000039, 1000081]
+    key = RSAPrivateKey(primes[0], primes[1], 65537, extra_primes = primes[2:])
+    assert key.n == 1000003 * 1000033 * 1000037 * 1000039 * 1000081
+    assert len(key.crt_exponents) == len(key.coefficients) + 2 == 5
+
+    ms = [0, 1, 2, 42, 2 ** 90 + 1, key.n - 1]
+    cs = rsa_enc_many(ms, key)
+    assert [key.decrypt(c) for c in cs] == ms
+    assert rsa_dec_many(cs, key) == ms
+
+    # The primes have to be distinct
+    with pytest.raises(ValueError):
+        RSAPrivateKey(1000003, 1000033, 65537, extra_primes = [1000003])
@@ -0,0 +1,73 @@
+# tests/test_rsa_parallel.py 
+import sys
+import os
+import pytest 
+# Adding the module path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import ThreadPoolExecutor
+from rsa.rsa_parallel import *
+
+def test_rsa_pool():
+    """
+    Test the process pool: the results are those of the sequential functions, in order
+    """
+    key = RSAPrivateKey(57704576143051, 838744063, 2237)
+    ms = list(range(2, 60))
+
+    with RSAPool(key, max_workers = 2, chunksize = 7) as pool:
+        cs = pool.encrypt_many(ms)
+        assert cs == rsa_enc_many(ms, key)
+        assert pool.decrypt_many(cs) == ms
+        assert pool.decrypt(cs[5]) == ms[5]
+        assert pool.decrypt(cs[6], builtin = True) == ms[6]
+
+        primes = pool.find_primes(3, 40, e = 3)
+        assert len(set(primes)) == 3
+        assert all(p.bit_length() == 40 and is_prime(p, "naive") for p in primes)
+        assert all(gcd(3, p - 1) == 1 for p in primes)
+
+        # There is a single odd prime of 2 bits, and of the 4 bits primes only 11 is usable with e = 3
+        assert pool.find_primes(1, 2) == [3]
+        with pytest.raises(ValueError):
+            pool.find_primes(2, 2)
+        with pytest.raises(ValueError):
+            pool.find_primes(2, 4, e = 3)
+
+    # Decryption needs a private key, and encryption a key 
+    with RSAPool(key.public_key(), max_workers = 1) as pool:
+        with pytest.raises(ValueError):
+            pool.decrypt_many(cs)
+    with RSAPool(max_workers = 1) as pool:
+        with pytest.raises(ValueError):
+            pool.encrypt_many(ms)
+        values = list(range(50000, 50200)) + [2 ** 521 - 1, (2 ** 89 - 1) * (2 ** 127 - 1)]
+        assert pool.is_prime_many(values) == [is_prime(n, "bpsw") for n in values]
+
+def test_rsa_dec_concurrent():
+    """
+    Test the decryption with concurrent half expenentiations, on the default process 
+    pool and on a given thread pool 
+    """
+    key = RSAPrivateKey(759902534011993492390886979244737626978083, 1462428735316547974645342609, 789063169)
+    with ThreadPoolExecutor(max_workers = 2) as executor:
+        for m in [2, 42, key.n - 1]:
+            c = rsa_enc(m, key.n, key.e)
+            assert rsa_dec_concurrent(c, key) == m
+            assert rsa_dec_concurrent(c, key, builtin = True) == m
+            assert rsa_dec_concurrent(c, key, executor) == m
+
+def test_multiprime_concurrent():
+    """
+    Test the fan out of the k half expenentiations of a multi-prime key 
+    """
+    for primes in [[1000003, 1000033, 1000037], [1000003, 1000033, 1000037, 1000039, 1000081]]:
+        key = RSAPrivateKey(primes[0], primes[1], 65537, extra_primes = primes[2:])
+        ms = [2, 42, 2 ** 40 + 3, key.n - 1]
+        cs = rsa_enc_many(ms, key)
+
+        with RSAPool(key, max_workers = len(primes)) as pool:
+            assert [pool.decrypt(c) for c in cs] == ms
+        assert [rsa_dec_concurrent(c, key) for c in cs] == ms
+        with ThreadPoolExecutor() as executor:
+            assert [rsa_dec_concurrent(c, key, executor, builtin = True) for c in cs] == ms
@@ -0,0 +1,171 @@
+# tests/test_rsa_pkcs1.py 
+import sys
+import os
+import io
+import pickle
+import hashlib
+import pytest 
+# Adding the module path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.rsa_pkcs1 import *
+from rsa.rsa_txt import *
+from utils.prime_utils import generate_keypair
+
+# OAEP with SHA-256 needs more than 66 bytes of modulus
+KEY = generate_keypair(1024)
+
+def test_mgf1():
+    """
+    Test MGF1 against its definition on the first counters 
+    """
+    seed = b"some seed"
+    expected = hashlib.sha256(seed + b"\x00" * 4).digest() + hashlib.sha256(seed + b"\x00\x00\x00\x01").digest()
+    assert mgf1(seed, 64) == expected
+    assert mgf1(seed, 40) == expected[:40]
+    assert mgf1(seed, 0) == b""
+    assert len(mgf1(seed, 100, "sha512")) == 100
+
+def test_oaep_roundtrip():
+    """
+    Test the OAEP encoding and decoding of messages of every size, with SHA-256 and SHA-512 
+    """
+    for hash_name in ["sha256", "sha512"]:
+        scheme = OAEP(hash_name)
+        k = 200
+        for msg in [b"", b"\x00", "Hello, World!", b"a" * scheme.max_length(k)]:
+            em = scheme.encode(msg, k)
+            assert len(em) == k and em[0] == 0
+            plain = msg.encode("utf-8") if isinstance(msg, str) else msg
+            assert scheme.decode(em, k) == plain
+
+        # Two encodings of the same message differ by their seed
+        assert scheme.encode(b"a", k) != scheme.encode(b"a", k)
+        with pytest.raises(ValueError):
+            scheme.encode(b"a" * (scheme.max_length(k) + 1), k)
+
+def test_oaep_errors():
+    """
+    Test that tampered blocks, a wrong label or a wrong length are rejected 
+    """
+    scheme = OAEP(label = b"files")
+    em = bytearray(scheme.encode(b"Hello", 128))
+    for i in [0, 1, 40, 127]:
+        tampered = bytearray(em)
+        tampered[i] ^= 1
+        with pytest.raises(ValueError, match = "OAEP decoding error"):
+            scheme.decode(tampered, 128)
+    with pytest.raises(ValueError, match = "OAEP decoding error"):
+        OAEP().decode(em, 128)
+    with pytest.raises(ValueError, match = "OAEP decoding error"):
+        scheme.decode(em[1:], 127)
+    with pytest.raises(ValueError):
+        OAEP("shake_128")
+
+def test_schemes():
+    """
+    Test the batch interface of the schemes, their names and their pickling (for process pools) 
+    """
+    for name in ["pkcs1", "oaep", "oaep-sha256", "oaep-sha512"]:
+        scheme = pickle.loads(pickle.dumps(get_padding(name)))
+        messages = [b"a", b"", "bc"]
+        blocks = scheme.encode_many(messages, 150)
+        assert all(len(block) == 150 for block in blocks)
+        assert scheme.decode_many(blocks, 150) == [b"a", b"", b"bc"]
+
+    scheme = OAEP("sha512")
+    assert get_padding(scheme) is scheme
+    assert get_padding("pkcs1").overhead == 11
+    assert get_padding("oaep").overhead == 66
+    with pytest.raises(ValueError):
+        get_padding("pss")
+
+def test_oaep_pipeline(tmp_path):
+    """
+    Test the stream, text and mmap modes of rsa_txt with the OAEP padding 
+    """
+    message = os.urandom(5000)
+    for padding in ["oaep", OAEP(label = b"stream")]:
+        cipher = b"".join(encrypt_stream(io.BytesIO(message), KEY.public_key(), batch = 8, padding = padding))
+        assert len(cipher) % modulus_size(KEY.n) == 0
+        assert b"".join(decrypt_stream(io.BytesIO(cipher), KEY, padding = padding)) == message
+
+    assert decrypt_text(encrypt_text("Hello, World!", KEY, padding = "oaep"), KEY, padding = "oaep") == "Hello, World!"
+
+    src, enc, dec = tmp_path / "plain", tmp_path / "cipher", tmp_path / "decrypted"
+    src.write_bytes(message)
+    encrypt_file_mmap(str(src), str(enc), KEY.public_key(), max_workers = 1, padding = "oaep")
+    decrypt_file_mmap(str(enc), str(dec), KEY, max_workers = 1, padding = "oaep")
+    assert dec.read_bytes() == message
+
+    # A cipher text of the v1.5 padding doesn't decode as OAEP
+    cipher = b"".join(encrypt_stream(io.BytesIO(b"abc"), KEY.public_key()))
+    with pytest.raises(ValueError):
+        b"".join(decrypt_stream(io.BytesIO(cipher), KEY, padding = "oaep"))
+
+def test_sign_verify():
+    """
+    Test the signatures of every scheme with public and private keys, and the rejection of 
+    other messages, tampered signatures and signatures of the wrong size 
+    """
+    for name in ["pkcs1", "pkcs1-sha512", "pss", "pss-sha512", PSS(salt_length = 0)]:
+        for key in [KEY, generate_keypair(1025)]:
+            if name == "pss-sha512" and key.n.bit_length() < 1048:
+                with pytest.raises(ValueError):
+                    sign(b"Hello", key, name)
+                continue
+
+            signature = sign("Hello, World!", key, name)
+            assert len(signature) == modulus_size(key.n)
+            assert verify("Hello, World!", signature, key.public_key(), name)
+            assert verify(b"Hello, World!", signature, key, name)
+            assert not verify(b"Hello, World?", signature, key, name)
+
+            tampered = bytearray(signature)
+            tampered[-1] ^= 1
+            assert not verify(b"Hello, World!", tampered, key, name)
+            assert not verify(b"Hello, World!", signature[1:], key, name)
+            assert not verify(b"Hello, World!", key.n.to_bytes(len(signature), "big"), key, name)
+
+    # The v1.5 signature is deterministic, PSS is salted
+    assert sign(b"a", KEY, "pkcs1") == sign(b"a", KEY, "pkcs1")
+    assert sign(b"a", KEY) != sign(b"a", KEY)
+    assert not verify(b"a", sign(b"a", KEY, "pkcs1"), KEY, "pss")
+    with pytest.raises(ValueError):
+        get_signature("dsa")
+    with pytest.raises(ValueError):
+        PKCS1v15Signature("md5")
+
+def test_sign_fault():
+    """
+    Test that a signature made with a faulty CRT parameter is never returned 
+    """
+    key = generate_keypair(1024)
+    key.crt_exponents[0] += 2
+    with pytest.raises(RuntimeError):
+        sign(b"Hello", key)
+
+def test_verify_many():
+    """
+    Test the batch signatures and verifications, one by one and by the product test 
+    """
+    messages = [os.urandom(20) for _ in range(13)]
+    for name in ["pkcs1", "pss"]:
+        signatures = sign_many(messages, KEY, name)
+        assert verify_many(messages, signatures, KEY.public_key(), name) == [True] * 13
+        assert all(verify(m, s, KEY, name) for m, s in zip(messages, signatures))
+
+    signatures = sign_many(messages, KEY, "pkcs1")
+    assert verify_many(messages, signatures, KEY, "pkcs1", screening = True) == [True] * 13
+
+    bad = list(signatures)
+    bad[2], bad[7], bad[12] = bad[3], bad[7][:-1], b"\x00" * len(bad[0])
+    expected = [i not in (2, 7, 12) for i in range(13)]
+    assert verify_many(messages, bad, KEY, "pkcs1", screening = True) == expected
+    assert verify_many(messages, bad, KEY, "pkcs1") == expected
+    assert verify_many([], [], KEY, "pkcs1", screening = True) == []
+
+    with pytest.raises(ValueError):
+        verify_many(messages, signatures[1:], KEY, "pkcs1")
+    with pytest.raises(ValueError):
+        verify_many(messages, signatures, KEY, "pss", screening = True)
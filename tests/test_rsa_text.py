@@ -0,0 +1,150 @@
+# tests/test_rsa_text.py 
+import sys
+import os
+import io
+import mmap
+import pytest 
+from concurrent.futures import ProcessPoolExecutor
+# Adding the module path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from rsa.rsa_txt import *
+from utils.padding_pkcs1 import *
+
+KEY = RSAPrivateKey(759902534011993492390886979244737626978083, 1462428735316547974645342609)
+
+def test_padding_pkcs1():
+    """
+    Test the PKCS#1 v1.5 padding of bytes and str messages, and its removal 
+    """
+    for msg in [b"", b"a", b"\x00\x00", "Hello, World!", "é" * 9]:
+        padded = pad_pkcs1(msg, 29)
+        assert len(padded) == 29 and padded[:2] == b"\x00\x02"
+        plain = msg.encode("utf-8") if isinstance(msg, str) else msg
+        assert strip_pkcs1(padded, 29) == plain
+
+    with pytest.raises(ValueError):
+        pad_pkcs1(b"a" * 19, 29)
+    with pytest.raises(ValueError):
+        strip_pkcs1(b"\x00\x02" + b"\x01" * 7 + b"\x00" + b"a" * 19, 29)
+
+    # The random bytes of the pool are never zero, also across refills
+    random_bytes = nonzero_random_bytes(3 * POOL_SIZE)
+    assert len(random_bytes) == 3 * POOL_SIZE and 0 not in random_bytes
+    assert len(set(random_bytes)) == 255
+
+def test_padding_batch():
+    """
+    Test the padding of batches of messages, from bytes-like objects 
+    """
+    plains = [b"", b"abc", bytearray(b"x" * 18), memoryview(b"Hello, World!"), "été"]
+    padded = pad_many(plains, 29)
+    assert all(len(block) == 29 and block[:2] == b"\x00\x02" and 0 not in block[2:10] for block in padded)
+    assert strip_many(padded, 29) == [b"", b"abc", b"x" * 18, b"Hello, World!", "été".encode("utf-8")]
+
+    # Every message gets its own random padding
+    assert len({bytes(block[2:18]) for block in pad_many([b"a"] * 100, 29)}) == 100
+    assert pad_many([], 29) == []
+    with pytest.raises(ValueError):
+        pad_many([b"a", b"a" * 19], 29)
+
+def test_read_blocks():
+    """
+    Test that every kind of source is cut into the same blocks 
+    """
+    data = bytes(range(256)) * 3
+    expected = [data[i:i + 7] for i in range(0, len(data), 7)]
+
+    sources = [
+        data, bytearray(data), memoryview(data), io.BytesIO(data),
+        [data[:5], data[5:100], b"", data[100:]], (data[i:i + 3] for i in range(0, len(data), 3)),
+    ]
+    for source in sources:
+        assert [bytes(block) for block in read_blocks(source, 7, chunk_blocks = 2)] == expected
+
+    assert [bytes(block) for block in read_blocks(io.StringIO("héllo"), 2)] == [b"h\xc3", b"\xa9l", b"lo"]
+    assert list(read_blocks(b"", 7)) == []
+
+def test_stream_roundtrip():
+    """
+    Test the encryption and decryption of streams of diffirent sizes, around the block size 
+    """
+    k = modulus_size(KEY.n)
+    assert k == 29
+
+    for length in [0, 1, 17, 18, 19, 36, 1000]:
+        data = os.urandom(length)
+        blocks = list(encrypt_stream(data, KEY, batch = 4))
+        assert len(blocks) == -(-length // (k - 11)) and all(len(block) == k for block in blocks)
+        assert b"".join(decrypt_stream(b"".join(blocks), KEY, batch = 3)) == data
+
+    # The padding is random, the same message is never encrypted twice the same
+    assert encrypt_text("Hello, World!", KEY) != encrypt_text("Hello, World!", KEY)
+    assert decrypt_text(encrypt_text("Hello, World! été", KEY), KEY) == "Hello, World! été"
+
+def test_stream_errors():
+    """
+    Test the rejection of truncated streams, of a public key for decryption and of small moduli 
+    """
+    cipher = encrypt_text("Hello, World!" * 3, KEY)
+    with pytest.raises(ValueError):
+        list(decrypt_stream(cipher[:-1], KEY))
+    with pytest.raises(ValueError):
+        list(decrypt_stream(cipher, KEY.public_key()))
+    with pytest.raises(ValueError):
+        list(decrypt_stream(b"\xff" * 29, KEY))
+    with pytest.raises(ValueError):
+        list(encrypt_stream(b"a", RSAPrivateKey(57704576143051, 838744063, 2237)))
+    with pytest.raises(ValueError):
+        list(encrypt_stream(b"a", KEY, executor = object(), max_pending = 0))
+
+def test_stream_files(tmp_path):
+    """
+    Test the encryption of files, of an mmap and of an executor pipeline 
+    """
+    data = os.urandom(5000)
+    src, enc, dec = tmp_path / "plain", tmp_path / "cipher", tmp_path / "decrypted"
+    src.write_bytes(data)
+
+    assert encrypt_file(str(src), str(enc), KEY, batch = 8) == os.path.getsize(enc)
+    assert decrypt_file(str(enc), str(dec), KEY) == len(data)
+    assert dec.read_bytes() == data
+
+    with open(src, "rb") as f, mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+        cipher = b"".join(encrypt_stream(mm, KEY))
+    assert b"".join(decrypt_stream(cipher, KEY)) == data
+
+    with ProcessPoolExecutor(2) as executor:
+        cipher = b"".join(encrypt_stream(io.BytesIO(data), KEY, batch = 16, executor = executor, max_pending = 2))
+        assert b"".join(decrypt_stream(cipher, KEY, batch = 16, executor = executor, max_pending = 1)) == data
+
+def test_file_mmap(tmp_path):
+    """
+    Test the memory mapped mode, in this process and on a process pool, against the streaming one 
+    """
+    src, enc, dec = tmp_path / "plain", tmp_path / "cipher", tmp_path / "decrypted"
+
+    for length in [0, 1, 18, 19, 5000]:
+        data = os.urandom(length)
+        src.write_bytes(data)
+        for workers in [1, 2]:
+            written = encrypt_file_mmap(str(src), str(enc), KEY, max_workers = workers, blocks_per_task = 7, batch = 3)
+            assert written == os.path.getsize(enc) == -(-length // 18) * 29
+            assert b"".join(decrypt_stream(enc.read_bytes(), KEY)) == data
+
+            encrypt_file(str(src), str(enc), KEY)
+            assert decrypt_file_mmap(str(enc), str(dec), KEY, max_workers = workers, blocks_per_task = 5, batch = 2) == length
+            assert dec.read_bytes() == data
+
+    with ProcessPoolExecutor(2) as executor:
+        encrypt_file_mmap(str(src), str(enc), KEY, executor = executor, blocks_per_task = 16)
+        decrypt_file_mmap(str(enc), str(dec), KEY, executor = executor, blocks_per_task = 16)
+    assert dec.read_bytes() == data
+
+    # A truncated file, and a short block which isn't the last one
+    enc.write_bytes(enc.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        decrypt_file_mmap(str(enc), str(dec), KEY)
+    enc.write_bytes(encrypt_text("short", KEY) + encrypt_text("a" * 18, KEY))
+    with pytest.raises(ValueError):
+        decrypt_file_mmap(str(enc), str(dec), KEY, max_workers = 1)
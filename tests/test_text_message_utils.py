@@ -0,0 +1,66 @@
+# tests/test_text_message_utils.py 
+import sys
+import os
+import mmap
+import pytest 
+# Adding the module path 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.text_message_utils import *
+
+def test_text_to_int():
+    """
+    Test the conversions between messages and integers, and their inverse 
+    """
+    assert text_to_int("Hello, World!") == long_to_bytes("Hello, World!") == 5735816763073854918203775149089
+    assert int_to_text(5735816763073854918203775149089) == bytes_to_long(5735816763073854918203775149089) == "Hello, World!"
+
+    for txt in ["", "a", "été \U0001F600", "\x00leading zero"]:
+        assert int_to_text(text_to_int(txt), len(txt.encode("utf-8"))) == txt
+    assert text_to_int(bytearray(b"\x01\x00")) == text_to_int(memoryview(b"\x01\x00")) == 256
+
+    assert int_to_bytes(258) == b"\x01\x02" and int_to_bytes(258, 4) == b"\x00\x00\x01\x02"
+    with pytest.raises(ValueError):
+        int_to_bytes(2 ** 16, 2)
+    with pytest.raises(ValueError):
+        int_to_bytes(-1)
+
+def test_blocks():
+    """
+    Test the blocks of a message below a modulus, from bytes, bytearray and mmap inputs 
+    """
+    assert block_size(2 ** 2048 - 1) == 255 and block_size(2 ** 2048 + 1) == 256
+    with pytest.raises(ValueError):
+        block_size(255)
+
+    data = os.urandom(1000)
+    n = 2 ** 127 - 1
+    size = block_size(n)
+    for message in [data, bytearray(data), memoryview(data)]:
+        values = bytes_to_ints(message, size)
+        assert len(values) == -(-1000 // size) and all(v < n for v in values)
+        assert ints_to_bytes(values, size, len(data)) == data
+
+    # The blocks are views of the message, not copies
+    message = bytearray(b"abcdefg")
+    blocks = list(iter_blocks(message, 3))
+    message[0] = ord("z")
+    assert [bytes(block) for block in blocks] == [b"zbc", b"def", b"g"]
+    del blocks
+
+    assert bytes_to_ints(b"", 3) == [] and ints_to_bytes([], 3) == bytearray()
+    with pytest.raises(ValueError):
+        ints_to_bytes([1, 2], 3, 7)
+
+def test_blocks_mmap(tmp_path):
+    """
+    Test the blocks of a memory mapped file 
+    """
+    data = os.urandom(5000)
+    path = tmp_path / "message.bin"
+    path.write_bytes(data)
+
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        assert bytes_to_ints(mapped, 100) == bytes_to_ints(data, 100)
+        mapped.close()
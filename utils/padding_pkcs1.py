@@ -1,102 +1,214 @@
 """
-This module contains the functions necessary to apply paddings on texts (or even chunks from images) 
-for RSA encryption (for security, for example to survive attack like the plaintext attack). 
-
-Functions: 
-    - pad_pkcs1(plain, key_size)
-    - strip_pkcs1(padded)
+This module contains the functions necessary to apply paddings on texts (or even chunks from images)
+for RSA encryption (for security, for example to survive attack like the plaintext attack).
+
+The PKCS#1 v1.5 padding of a message of a key of k bytes is 0x00 0x02 PS 0x00 message, where PS is
+a string of k - 3 - len(message) >= 8 random nonzero bytes. These random bytes are taken from a
+buffered pool: the pool is refilled from os.urandom in bulk (one system call for thousands of bytes
+instead of one per byte), and its zero bytes are removed at once by bytes.translate. The padded
+block is then written into a single preallocated bytearray, and a batch of messages draws all of
+its random bytes from the pool in one go.
+
+Functions:
+    - nonzero_random_bytes(count) : count random nonzero bytes from the pool
+    - pad_pkcs1(plain, key_size) / pad_many(plains, key_size)
+    - strip_pkcs1(padded, key_size) / strip_many(padded, key_size)
 """
 
 # We import os to generate the random bytes
-import os 
+import os
+import threading
+
+# The number of random bytes requested from the operating system at every refill of the pool
+POOL_SIZE = 4096
+
+# The random bytes not used yet, and the lock sharing them between threads
+_pool = bytearray()
+_pool_lock = threading.Lock()
+
 
-def pad_pkcs1(plain: str, key_size: int) -> str:
+def _clear_pool():
     """
-    This function applies the pkcs1 padding on a given RSA message in order to encypt the result 
-    padded message (since we need the message to be coprime with n, the public key) and also of a 
-    proper size. 
+    Empties the pool in a child process after a fork, which would otherwise pad its messages with
+    the same random bytes as its parent
+    """
+    global _pool, _pool_lock
+    _pool = bytearray()
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child = _clear_pool)
+
+
+def nonzero_random_bytes(count: int) -> bytearray:
+    """
+    Returns count random nonzero bytes from the buffered pool. When the pool runs short, it is
+    refilled with a bulk read of os.urandom whose zero bytes are deleted by bytes.translate, so
+    the remaining bytes are uniform over 1..255
+
+    Example:
+        >>> len(nonzero_random_bytes(100)), 0 in nonzero_random_bytes(100)
+            (100, False)
+    """
+    with _pool_lock:
+        while len(_pool) < count:
+            _pool.extend(os.urandom(max(POOL_SIZE, 2 * count)).translate(None, b"\x00"))
+        chunk = _pool[:count]
+        del _pool[:count]
+    return chunk
 
-    Args:
-        - plain (str) : the plain text to be encrypted (it has to be of a relatively small size to ensure the capability for
-        - padding) 
-        - key_size (int) : the key size (in bytes) for the RSA encryption to ensure text is encrypted securely 
-    
-    Raises: 
-        - ValueError: if the message is larger than the key size for the ecryption 
-    Returns:
-        - padded (int) : the padded integer as an input for RSA encryption 
 
-    Example: 
-        >>> pad_pkcs1("Hello, World!")
-            output
+def _encode(plain) -> memoryview:
     """
+    The bytes of a message, a str is encoded in utf-8 and a bytes-like object is used without copy
+    """
+    if isinstance(plain, str):
+        plain = plain.encode("utf-8")
+    return memoryview(plain).cast("B")
+
+
+def _pad_into(plain: memoryview, key_size: int, padding: memoryview) -> bytearray:
+    """
+    Writes 0x00 0x02 padding 0x00 plain into a preallocated bytearray of key_size bytes
+    """
+    padded = bytearray(key_size)
+    padded[1] = 0x02
+    padded[2:2 + len(padding)] = padding
+    padded[key_size - len(plain):] = plain
+    return padded
+
 
-    max_length = key_size - 11 
+def _padding_length(plain: memoryview, key_size: int) -> int:
+    """
+    The number of random bytes of the padding of a message, the 3 other bytes being 0x00 0x02 and
+    the separator 0x00
+    """
+    max_length = key_size - 11
     if len(plain) > max_length:
         raise ValueError("Given message is too long for the RSA key size")
+    return key_size - 3 - len(plain)
+
+
+def pad_pkcs1(plain, key_size: int) -> bytearray:
+    """
+    This function applies the pkcs1 padding on a given RSA message in order to encypt the result
+    padded message (since we need the message to be coprime with n, the public key) and also of a
+    proper size.
+
+    Args:
+        - plain (str | bytes-like) : the plain text to be encrypted (it has to be of a relatively small size to ensure the capability for
+        - padding), a str is encoded in utf-8 and bytes are used as they are
+        - key_size (int) : the key size (in bytes) for the RSA encryption to ensure text is encrypted securely
 
-    # We generate the random padding first 
-    padding_length = key_size - len(plain)
-    
-    # Initializing the padding string 
-    padding= b""
+    Raises:
+        - ValueError: if the message is longer than key_size - 11 bytes
+    Returns:
+        - padded (bytearray) : the padded message of key_size bytes, to read as an integer for the RSA encryption
+
+    Example:
+        >>> padded = pad_pkcs1("Hello, World!", 50)
+        >>> len(padded), padded[:2], padded[-14:]
+            (50, bytearray(b'\\x00\\x02'), bytearray(b'\\x00Hello, World!'))
+    """
+    plain = _encode(plain)
+    padding = nonzero_random_bytes(_padding_length(plain, key_size))
+    return _pad_into(plain, key_size, memoryview(padding))
+
+
+def pad_many(plains, key_size: int) -> list:
+    """
+    Pads a batch of messages as pad_pkcs1 does, the random bytes of all the paddings being drawn
+    from the pool at once
 
-    while len(padding) < padding_length:
-        # We generate one random padding byte by a time from the operating system 
-        pad_byte = os.urandom(1)
-        if pad_byte != b"\x00": # The padding can't include the byte 0x00
-            padding += pad_byte
+    Args:
+        - plains (iterable) : the messages (str or bytes-like)
+        - key_size (int) : the key size in bytes
+
+    Raises:
+        - ValueError: if a message is longer than key_size - 11 bytes
 
-    # Final contruction of the padded message 
-    padded = b"\x00\x02" + padding + b"\x00" + plain.encode("utf-8") 
+    Returns:
+        - padded (list) : the padded messages (bytearray of key_size bytes), in order
 
+    Example:
+        >>> [len(padded) for padded in pad_many([b"a", "bc", b""], 20)]
+            [20, 20, 20]
+    """
+    plains = [_encode(plain) for plain in plains]
+    lengths = [_padding_length(plain, key_size) for plain in plains]
+    padding = memoryview(nonzero_random_bytes(sum(lengths)))
+
+    padded, start = [], 0
+    for plain, length in zip(plains, lengths):
+        padded.append(_pad_into(plain, key_size, padding[start:start + length]))
+        start += length
     return padded
-        
 
-def strip_pkcs1(padded: str, key_size: int):
+
+def strip_pkcs1(padded, key_size: int) -> bytes:
     """
     This function removes the PKCS padding from a padded message (incase we want to decrypt)
-    and get the original message, or just as an extra utility 
-    
-    Args: 
-        - padded (str): The given padded string with PKCS1 
-        - key_size(int): The RSA key size in bytes 
+    and get the original message, or just as an extra utility
+
+    Args:
+        - padded (bytes | bytearray): The given padded string with PKCS1
+        - key_size(int): The RSA key size in bytes
 
     Raises:
         - ValueError: if the padded text is not of the right size or doesn't match the padding scheme, or if the separator index is not found
 
-    Returns: 
-        - plain (str): The plain text  
+    Returns:
+        - plain (bytes): The plain text
 
-    Example: 
-        >>> strip_pkcs1()
-            output
+    Example:
+        >>> strip_pkcs1(pad_pkcs1("Hello, World!", 50), 50)
+            b'Hello, World!'
     """
-    
+
     # We raise an error if the sizes don't match
     if len(padded) != key_size:
         raise ValueError("Invalid padded message length for the given key size")
-    
+
     # We raise an error if the padding scheme is not matched
     if padded[0] != 0x00 or padded[1] != 0x02:
         raise ValueError("The PKCS1 padding scheme is not matched")
 
     # We find the position of the separtor in the padding scheme (0x00 after the padding string)
-    idx = padded.find(b"\0x00", 2)
+    idx = padded.find(b"\x00", 2)
     if idx == -1:
         raise ValueError("The padding seperator is not found")
 
+    # At least 8 bytes of padding
+    if idx < 10:
+        raise ValueError("The padding string is too short")
+
     # We simply extract the plaintext according to the PKCS1 padding scheme
-    plaintext = padded[idx +1:]
+    plaintext = bytes(padded[idx +1:])
 
     return plaintext
-    
+
+
+def strip_many(padded, key_size: int) -> list:
+    """
+    Removes the padding of a batch of padded messages, see strip_pkcs1
+
+    Example:
+        >>> strip_many(pad_many([b"a", b"bc"], 20), 20)
+            [b'a', b'bc']
+    """
+    return [strip_pkcs1(block, key_size) for block in padded]
+
+
 def main():
     print("===== Example of a padded message ======")
     print(pad_pkcs1("Hello, World!", 50))
-    
+
     print("===== Example of stripping off the padding")
-    return 
-    print(strip_pkcs1(pad_pkcs1("Hello, World!", 50)))
+    print(strip_pkcs1(pad_pkcs1("Hello, World!", 50), 50))
+
+    print("===== Example of a batch of padded messages")
+    print(strip_many(pad_many(["Hello,", "World!"], 50), 50))
+    return
 if __name__ == "__main__":
     main()
@@ -19,33 +19,195 @@ needed, we provide them in this module
 
 Function: 
     - is prime(n, method) : given an integer and a method, this functions applies a primality 
-    check on the given integer 
+    check on the given integer (naive, fermat, deterministic or FIPS Miller-Rabin, Baillie-PSW)
+    - is_prime_many(values, method) : the primality of a batch of integers, with a shared small-prime filter
+    - miller_rabin_rounds(bits) : the number of Miller-Rabin rounds for a random candidate of the given size
     - init_seed() : for seed initializeation in order to generate pseu-random numebrs
     - gen_rand_int(bits) : given a certain size (in bits) the function generates a random integer
     - gen_rand_prime(bits) : given a certain size (in bits) the function generates a random prime number 
-    -  
+    - segmented_sieve(n) / count_primes(n) : the primes up to n from the segmented odd-only sieve, and their number
+    - primes_up_to(n) : the list of the primes up to n
+    - load_prime_table(path) / small_primes() : the cached small-prime table, optionally persisted to disk
+    - passes_primorial_gcd(n) : the pre-filter of the primality tests, a gcd with the product of the small primes
+    - incremental_prime_search(bits, e) : a random prime by the incremental sieve search
+    - gen_rsa_prime(bits, e) : a random prime p of the given size with gcd(e, p - 1) = 1
+    - generate_keypair(bits, e) : generates an RSA private key 
+    - generate_multiprime_keypair(bits, k, e) : generates a multi-prime RSA private key 
 """
 
 # We need the sqrt function from the math module and our own modular arithmetic functions
 from math import sqrt 
 from rsa.modular_arithmetic import *
+from rsa.rsa_algorithm import RSAPrivateKey
+from rsa.product_tree import product_tree, remainder_tree
 import time 
 import os
+import secrets # Cryptographically secure random numbers for the keys
+from itertools import repeat
 
+# NumPy is optional: when it's installed, the residues of the prime candidates modulo the small
+# primes are computed on vectors of primes instead of one prime at a time 
+try:
+    import numpy as np 
+except ImportError:
+    np = None
 
-def is_prime(n: int, method = "naive") -> bool:
+# The backend of the small-prime residues, "numpy" or "python", selected on import 
+SIEVE_BACKEND = "numpy" if np is not None else "python"
+
+
+# Deterministic Miller-Rabin: below each bound, the strong tests to the first primes as bases 
+# never fail (Jaeschke, Zhang, Sorenson and Webster), (bound, number of bases)
+_MR_BASES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+_MR_BOUNDS = [
+    (2047, 1),
+    (1373653, 2),
+    (25326001, 3),
+    (3215031751, 4),
+    (2152302898747, 5),
+    (3474749660383, 6),
+    (341550071728321, 7),
+    (3825123056546413051, 9),
+    (318665857834031151167461, 12),
+    (3317044064679887385961981, 13),
+]
+
+# Rounds of Miller-Rabin with random bases for a random candidate of a given size (in bits), from the 
+# tables of FIPS 186-5 (appendix B.3) for an error probability of 2^-100 or less, (size, rounds)
+_FIPS_ROUNDS = [(1536, 4), (1024, 5), (512, 7)]
+
+
+def miller_rabin_rounds(bits: int) -> int:
+    """
+    The number of Miller-Rabin rounds with random bases for a random candidate of the given size,
+    following FIPS 186-5: the larger the candidate, the less likely a composite passes a round. 
+    Below 512 bits, the worst case bound of 4^-t is used, i.e 50 rounds for 2^-100
+
+    Example: 
+        >>> miller_rabin_rounds(1024)
+            5
+    """
+    for size, rounds in _FIPS_ROUNDS:
+        if bits >= size:
+            return rounds
+    return 50
+
+
+def _strong_test(ctx: MontgomeryContext, a: int, d: int, s: int) -> bool:
+    """
+    The strong probable prime test of n = ctx.n to the base a, with n - 1 = d * 2^s and d odd: 
+    a^d = 1 or a^(d * 2^r) = -1 mod n for some r < s. The squarings are done in the Montgomery
+    representation, where -1 is represented by n - R mod n
+    """
+    n = ctx.n
+    x = ctx.pow(a, d)
+    if x == 1 or x == n - 1:
+        return True
+
+    x, minus_one = ctx.to_mont(x), n - ctx.r
+    for _ in range(s - 1):
+        x = ctx.sqr(x)
+        if x == minus_one:
+            return True
+    return False
+
+
+def _strong_lucas(ctx: MontgomeryContext) -> bool:
+    """
+    The strong Lucas probable prime test of n = ctx.n, with Selfridge's parameters: D is the first
+    of 5, -7, 9, -11, ... with (D / n) = -1, P = 1 and Q = (1 - D) / 4. With n + 1 = d * 2^s and d odd,
+    n passes if U_d = 0 or V_(d * 2^r) = 0 mod n for some r < s. The Lucas sequences are computed
+    by doubling along the bits of d, in the Montgomery representation (halving mod n commutes with it)
+    """
+    n = ctx.n
+
+    # A square has no D with (D / n) = -1
+    if math.isqrt(n) ** 2 == n:
+        return False
+
+    D = 5
+    while True:
+        symbol = jacobi(D, n)
+        if symbol == -1:
+            break
+        if symbol == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    Q = euclidian_div(1 - D, 4)[0]
+
+    s = ((n + 1) & -(n + 1)).bit_length() - 1
+    d = (n + 1) >> s
+
+    def add(x, y):
+        z = x + y
+        return z - n if z >= n else z
+
+    def sub(x, y):
+        z = x - y
+        return z + n if z < 0 else z
+
+    def half(x):
+        return (x + n) >> 1 if x & 1 else x >> 1
+
+    D, Q = ctx.to_mont(D), ctx.to_mont(Q)
+
+    # U_1 = 1, V_1 = P = 1, and Q^1
+    U, V, Qk = ctx.r, ctx.r, Q
+    for i in range(d.bit_length() - 2, -1, -1):
+        # U_2k = U_k V_k, V_2k = V_k² - 2Q^k
+        U, V, Qk = ctx.mul(U, V), sub(ctx.sqr(V), add(Qk, Qk)), ctx.sqr(Qk)
+        if (d >> i) & 1:
+            # U_2k+1 = (U_2k + V_2k) / 2, V_2k+1 = (D U_2k + V_2k) / 2
+            U, V, Qk = half(add(U, V)), half(add(ctx.mul(D, U), V)), ctx.mul(Qk, Q)
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V, Qk = sub(ctx.sqr(V), add(Qk, Qk)), ctx.sqr(Qk)
+        if V == 0:
+            return True
+    return False
+
+
+def _miller_rabin(n: int, rounds: int = None) -> bool:
+    """
+    The Miller-Rabin test of an odd n > 41: deterministic with the first primes as bases below
+    3.3 * 10^24, otherwise with 'rounds' random bases (miller_rabin_rounds of the size by default)
+    """
+    ctx = MontgomeryContext(n)
+    s = ((n - 1) & (1 - n)).bit_length() - 1
+    d = (n - 1) >> s
+
+    for bound, count in _MR_BOUNDS:
+        if n < bound:
+            return all(_strong_test(ctx, a, d, s) for a in _MR_BASES[:count])
+
+    if rounds is None:
+        rounds = miller_rabin_rounds(n.bit_length())
+    return all(_strong_test(ctx, 2 + secrets.randbelow(n - 3), d, s) for _ in range(rounds))
+
+
+def is_prime(n: int, method = "naive", rounds: int = None) -> bool:
     """
     This function verifies wether a given number is prime or not using various methods
     of the choice of the user. 
+    The "miller-rabin" method is deterministic for n < 3.3 * 10^24, and uses random bases 
+    above (FIPS 186-5 rounds by default, meant for random candidates). The "bpsw" method is
+    the Baillie-PSW test, a strong test to the base 2 and a strong Lucas test, no composite
+    is known to pass it. 
     
     Args: 
         - n (int) : The integers we want to verify wether is prime or not 
-        - method (str) : The method to check primality 
+        - method (str) : The method to check primality, "naive", "fermat", "miller-rabin" or "bpsw"
+        - rounds (int) : The number of random bases of the Miller-Rabin test for large n 
 
     Returns: 
         - boolean : The truth value of primaly, true if the input is prime, otherwise
         false 
 
+    Raises:
+        - ValueError : if the method doesn't exist 
+
     Example: 
         >>> is_prime(53) 
             True 
@@ -54,22 +216,38 @@ def is_prime(n: int, method = "naive") -> bool:
             False
     """
     # Basic values
-    if n in [0, 1]:
+    if n < 2:
         return False 
 
-    if n in [2, 3]:
-        return True
+    # The small integers are looked up in the prime table 
+    small = _table_lookup(n)
+    if small is not None:
+        return small
     
-    # Basic cases eliminiation 
-    if euclidian_div(n, 2)[1] == 0 or euclidian_div(n, 3)[1] == 0:    # Divisiblity by 2 and 3
+    # Basic cases eliminiation, a single gcd with the product of the small primes
+    if not passes_primorial_gcd(n):
         return False 
 
+    return _probable_prime(n, method, rounds)
+
+
+def _probable_prime(n: int, method: str = "miller-rabin", rounds: int = None) -> bool:
+    """
+    The primality test of the given method, for an odd n above the prime table without small factors
+    """
     # We perform the test depending on the primality check method
     
     if method == "naive":
-        # We check if there are any prime deviders ( they come of the form 6 * k (+ or -) 1 , where k is an integer) 
-        # initilizing the index to 5 
-        i = 5 
+        # We first trial divide by the primes of the table, then by the numbers of the form 6 * k (+ or -) 1
+        # (where k is an integer) above it
+        for p in small_primes():
+            if p * p > n:
+                return True
+            if euclidian_div(n, p)[1] == 0:
+                return False
+
+        limit = 2 * len(_table)
+        i = limit - euclidian_div(limit, 6)[1] + 5
         while i*i <= n: 
             if euclidian_div(n, i)[1] == 0 or euclidian_div(n, i + 2)[1] == 0:
                 return False
@@ -93,33 +271,15 @@ def is_prime(n: int, method = "naive") -> bool:
         return True
     
     elif method == "miller-rabin":
-        if n <= 1:
-            return False
-        if n <= 3:
-            return True
-        if n % 2 == 0:
-            return False
+        return _miller_rabin(n, rounds)
 
-        # Write n as d*2^r + 1
-        r, d = 0, n - 1
-        while euclidian_div(d, 2)[1] == 0:
-            r += 1
-            d = euclidian_div(d, 2)[0] 
-        
-        k = 5 
-        # Test k times, k an adjustable parameter
-        for _ in range(k):
-            a = random.randint(2, n - 2)
-            x = mod_exp(a, d, n)  # Compute a^d % n
-            if x == 1 or x == n - 1:
-                continue
-            for _ in range(r - 1):
-                x = mod_exp(x, 2, n)
-                if x == n - 1:
-                    break
-            else:
-                return False
-        return True
+    elif method == "bpsw":
+        # Strong test to the base 2, then the strong Lucas test, sharing the Montgomery context
+        ctx = MontgomeryContext(n)
+        s = ((n - 1) & (1 - n)).bit_length() - 1
+        return _strong_test(ctx, 2, (n - 1) >> s, s) and _strong_lucas(ctx)
+
+    raise ValueError(f"Unknown primality test {method}, the methods are naive, fermat, miller-rabin and bpsw")
 
 def sieve_of_eratosthenes(limit):
     """
@@ -177,20 +337,394 @@ def sieve_with_bitarray(n):
     primes.setall(True)
     primes[0:2] = False  # 0 and 1 are not primes
 
-    # Sieve of Eratosthenes algorithm
+    # Sieve of Eratosthenes algorithm, the multiples are cleared by slice assignment
     for i in range(2, int(n**0.5) + 1):
         if primes[i]:  # If i is prime
-            for multiple in range(i * i, n + 1, i):
-                primes[multiple] = False
+            primes[i * i::i] = False
 
     # Count the number of True values in the bitarray
     return primes.count(True)
 
-n = 100
-prime_count = sieve_with_bitarray(n)
-print(f"Number of primes ≤ {n}: {prime_count}")
 
-    
+# Size (in bits) of the segments of the segmented sieve, 32 KB to stay in the L1/L2 cache
+SEGMENT_BITS = 1 << 18
+
+
+def _odd_segments(n: int, segment_bits: int = SEGMENT_BITS):
+    """
+    The segmented sieve of Eratosthenes on the odd numbers <= n: bit i stands for 2i + 1, and the 
+    bits are sieved one segment of 'segment_bits' bits at a time, so the memory used stays bounded
+    whatever n is. Only the odd primes up to sqrt(n) are kept in memory, and each of them clears its 
+    odd multiples in the segment with a single slice assignment (a step of p bits is a step of 2p).
+
+    Yields: 
+        - (start, segment) : the index of the first bit of the segment, and the sieved bitarray
+    """
+    total = (n + 1) >> 1  # The odd numbers 1, 3, ..., <= n
+    root = math.isqrt(n)
+
+    # The odd primes up to sqrt(n), with a plain odd-only sieve
+    base = bitarray((root + 1) >> 1)
+    base.setall(True)
+    i = 1
+    while (2 * i + 1) ** 2 <= root:
+        if base[i]:
+            p = 2 * i + 1
+            base[(p * p) >> 1::p] = False
+        i += 1
+    base_primes = [2 * i + 1 for i in base.search(bitarray("1")) if i > 0]
+
+    for start in range(0, total, segment_bits):
+        end = min(start + segment_bits, total)
+        segment = bitarray(end - start)
+        segment.setall(True)
+        if start == 0:
+            segment[0] = False  # 1 is not prime
+
+        for p in base_primes:
+            # The first odd multiple of p to clear is p², or the first one of the segment: 
+            # 2j + 1 = 0 mod p for j = (p - 1) / 2 mod p
+            first = (p * p) >> 1
+            if first >= end:
+                break
+            if first < start:
+                first = start + ((p >> 1) - start) % p
+            segment[first - start::p] = False
+
+        yield start, segment
+
+
+def segmented_sieve(n: int, segment_bits: int = SEGMENT_BITS):
+    """
+    Generates the primes <= n in increasing order, with the segmented odd-only sieve: the memory 
+    used is bounded by the segment size and the primes up to sqrt(n), so n = 10^10 is reachable
+
+    Args: 
+        - n (int) : the upper bound of the primes 
+        - segment_bits (int) : the size of the segments in bits
+
+    Example: 
+        >>> list(segmented_sieve(20))
+            [2, 3, 5, 7, 11, 13, 17, 19]
+    """
+    if n < 2:
+        return
+    yield 2
+    for start, segment in _odd_segments(n, segment_bits):
+        for i in segment.search(bitarray("1")):
+            yield 2 * (start + i) + 1
+
+
+def count_primes(n: int, segment_bits: int = SEGMENT_BITS) -> int:
+    """
+    The number of primes <= n, pi(n), by counting the bits of the segmented odd-only sieve 
+
+    Example: 
+        >>> count_primes(10 ** 6)
+            78498
+    """
+    if n < 2:
+        return 0
+    return 1 + sum(segment.count() for _, segment in _odd_segments(n, segment_bits))
+
+
+def primes_up_to(n: int) -> list:
+    """
+    Returns the list of the primes <= n, with the segmented sieve
+
+    Example: 
+        >>> primes_up_to(20)
+            [2, 3, 5, 7, 11, 13, 17, 19]
+    """
+    return list(segmented_sieve(n))
+
+
+# The small-prime table: the odd-only bitarray of the sieve up to PRIME_TABLE_LIMIT (bit i for 2i + 1), the list of its primes
+# and the product of its first PRIMORIAL_PRIMES odd primes, built once on first use
+PRIME_TABLE_LIMIT = 20000
+PRIMORIAL_PRIMES = 300
+_table = None
+_table_primes = None
+_primorial = None
+_odd_table_product = None
+
+
+def load_prime_table(path: str = None) -> bitarray:
+    """
+    Builds the small-prime table with the segmented sieve, and caches it in the module. 
+    With a path, the table is read from that file when it exists and holds enough bits,
+    otherwise it is built and written to it (about 1.3 KB), for the next processes
+
+    Args: 
+        - path (str) : the file where the table is persisted, or None to keep it in memory only
+
+    Returns: 
+        - table (bitarray) : bit i is set when 2i + 1 is prime, for 2i + 1 <= PRIME_TABLE_LIMIT
+    """
+    global _table, _table_primes, _primorial, _odd_table_product
+
+    size = (PRIME_TABLE_LIMIT + 1) >> 1
+
+    table = None
+    if path is not None and os.path.exists(path):
+        table = bitarray()
+        with open(path, "rb") as f:
+            table.fromfile(f)
+        table = table[:size] if len(table) >= size else None
+
+    if table is None:
+        table = bitarray()
+        for _, segment in _odd_segments(PRIME_TABLE_LIMIT):
+            table += segment
+        if path is not None:
+            with open(path, "wb") as f:
+                table.tofile(f)
+
+    _table = table
+    _table_primes = [2] + [2 * i + 1 for i in table.search(bitarray("1"))]
+
+    _primorial = 1
+    for p in _table_primes[1:PRIMORIAL_PRIMES + 1]:
+        _primorial *= p
+    _odd_table_product = None
+
+    return _table
+
+
+def _table_lookup(n: int):
+    """
+    Looks n >= 0 up in the cached small-prime table (built on first use)
+
+    Returns: 
+        - True or False whether n is prime, or None if n is above the table
+    """
+    if _table is None:
+        load_prime_table()
+    if n >> 1 >= len(_table):
+        return None
+    return n == 2 or (n & 1 == 1 and bool(_table[n >> 1]))
+
+
+def small_primes() -> list:
+    """
+    The cached list of the primes <= PRIME_TABLE_LIMIT, built on first use
+
+    Example: 
+        >>> small_primes()[:5]
+            [2, 3, 5, 7, 11]
+    """
+    if _table is None:
+        load_prime_table()
+    return _table_primes
+
+
+def passes_primorial_gcd(n: int) -> bool:
+    """
+    Pre-filter of the primality tests: rejects the odd n > PRIME_TABLE_LIMIT with a small prime
+    factor, with a single gcd against the product of the first odd primes (the primorial) instead
+    of one trial division per prime. It removes about 85% of the odd candidates
+
+    Returns: 
+        - False if n has a factor among the first PRIMORIAL_PRIMES odd primes (or is even), 
+        True otherwise 
+
+    Example: 
+        >>> passes_primorial_gcd(1000003 * 1000033), passes_primorial_gcd(1009 * 1000003)
+            (True, False)
+    """
+    small = _table_lookup(n)
+    if small is not None:
+        return small
+    return n & 1 == 1 and gcd(n, _primorial) == 1
+
+
+def _table_product() -> int:
+    """
+    The product of all the odd primes of the table, computed once with a product tree
+    """
+    global _odd_table_product
+    if _odd_table_product is None:
+        _odd_table_product = product_tree(small_primes()[1:])[-1][0]
+    return _odd_table_product
+
+
+def is_prime_many(values, method: str = "miller-rabin", rounds: int = None, executor = None, chunksize: int = None) -> list:
+    """
+    Tests the primality of a batch of integers. The integers of the prime table are looked up, 
+    the others go through a single small-prime filter for the whole batch: the product of all 
+    the odd primes of the table is reduced modulo every integer with a remainder tree of the
+    batch, O(n log n) multiplications for n integers instead of n times k trial divisions, and
+    an integer is kept when it is coprime with that remainder. Only the survivors go through 
+    the primality test of the given method, on the executor (a process pool for instance) if given.
+
+    Args: 
+        - values (iterable) : the integers to test 
+        - method (str) : the primality test of the survivors, as in is_prime
+        - rounds (int) : the number of random bases of the Miller-Rabin test for large integers
+        - executor (Executor) : the executor of the primality tests, they run in this process if None
+        - chunksize (int) : the number of tests per task of the executor, 4 tasks per core by default
+
+    Returns: 
+        - results (list) : whether each integer is prime, in order 
+
+    Example: 
+        >>> is_prime_many([7, 15, 1000003, 1000005])
+            [True, False, True, False]
+    """
+    values = list(values)
+    results = [False] * len(values)
+
+    # The small integers are looked up, the large odd ones go through the batch filter
+    large = []
+    for i, n in enumerate(values):
+        if n < 2:
+            continue
+        small = _table_lookup(n)
+        if small is not None:
+            results[i] = small
+        elif n & 1:
+            large.append(i)
+
+    survivors = []
+    if large:
+        # The tree stops at the size of the product of the primes, above it the remainders are the product itself
+        product = _table_product()
+        tree = product_tree([values[i] for i in large], product.bit_length())
+        remainders = remainder_tree(product, tree)
+        survivors = [i for i, r in zip(large, remainders) if r != 0 and gcd(values[i], r) == 1]
+
+    candidates = [values[i] for i in survivors]
+    if executor is None:
+        tests = [_probable_prime(n, method, rounds) for n in candidates]
+    else:
+        size = chunksize or max(1, -(-len(candidates) // (4 * (os.cpu_count() or 1))))
+        tests = executor.map(_probable_prime, candidates, repeat(method), repeat(rounds), chunksize = size)
+
+    for i, test in zip(survivors, tests):
+        results[i] = test
+    return results
+
+
+def _odd_small_primes():
+    """
+    The odd primes of the table, as a vector with the NumPy backend and a list otherwise
+    """
+    primes = small_primes()[1:]
+    if SIEVE_BACKEND == "numpy":
+        return np.array(primes, dtype = np.int64)
+    return primes
+
+
+def _small_residues(n: int, primes):
+    """
+    The residues of n >= 0 modulo the small primes. With NumPy, n is cut into 32 bits limbs and 
+    reduced by Horner's rule on the whole vector of primes at once: r = (r * 2^32 + limb) mod p
+    stays below 2^47 since the primes have less than 16 bits
+    """
+    if SIEVE_BACKEND != "numpy":
+        return [euclidian_div(n, p)[1] for p in primes]
+
+    limbs = np.frombuffer(n.to_bytes(-(-n.bit_length() // 32) * 4, "big"), dtype = ">u4")
+    residues = np.zeros_like(primes)
+    for limb in limbs.tolist():
+        residues = ((residues << 32) + limb) % primes
+    return residues
+
+
+def _shift_residues(primes, residues, shift: int):
+    """
+    The residues of n + shift from those of n
+    """
+    if SIEVE_BACKEND == "numpy":
+        return (residues + shift) % primes
+    return [(r + shift) % p for p, r in zip(primes, residues)]
+
+
+def _sieve_window(primes, residues, window: int) -> bitarray:
+    """
+    Sieves the window of candidates n, n + 2, ..., n + 2(window - 1) from the residues of n:
+    n + 2k is divisible by p exactly when k = -n / 2 mod p, the bit k of the returned bitarray
+    is set when n + 2k has a small prime factor. The first offsets are computed on the whole 
+    vector with NumPy, the marking is a bitarray slice assignment per prime in both backends
+    """
+    if SIEVE_BACKEND == "numpy":
+        firsts = ((primes - residues) * ((primes + 1) >> 1) % primes).tolist()
+        primes = primes.tolist()
+    else:
+        firsts = [(p - r) * ((p + 1) >> 1) % p for p, r in zip(primes, residues)]
+
+    composite = bitarray(window)
+    composite.setall(False)
+    for p, first in zip(primes, firsts):
+        composite[first::p] = True
+    return composite
+
+
+def incremental_prime_search(bits: int, e: int = 65537, low: int = None, window: int = 4096, stats: dict = None) -> int:
+    """
+    Searches a random prime p of the given size with gcd(e, p - 1) = 1 by an incremental sieve,
+    as done by OpenSSL. From a random odd starting point n, the residues of n modulo the first 
+    few thousand primes are computed once. A whole window of candidates n, n + 2, n + 4, ... is 
+    then sieved with these residues: n + 2k is divisible by pi exactly when k = -n / 2 mod pi, 
+    which marks every pi'th candidate of the window from there. Moving to the next window only
+    updates the residues (they are small integers). Only the candidates which survive the sieve 
+    go through the Miller-Rabin test, about 1 in 9 of the odd candidates. The residues are 
+    vectorised when NumPy is installed (SIEVE_BACKEND).
+
+    Args:
+        - bits (int): the size in bits of the prime, >= 32
+        - e (int): the public exponent 
+        - low (int): lower bound of the prime, 2^(bits - 1) by default
+        - window (int): the number of odd candidates sieved at once
+        - stats (dict): if given, the numbers of candidates sieved and tested are added to its 
+        "candidates" and "tests" entries
+
+    Raises:
+        - ValueError: if the size is smaller than 32 bits
+
+    Returns: 
+        - p (int): a random prime of the given size 
+    """
+    if bits < 32:
+        raise ValueError("The incremental search is for primes of at least 32 bits")
+
+    if low is None:
+        low = 1 << (bits - 1)
+    high = 1 << bits
+
+    # The odd primes of the table, their residues are updated from one candidate to the next
+    primes = _odd_small_primes()
+
+    candidates, tests = 0, 0
+    try:
+        while True:
+            # Random odd starting point in [low, 2^bits), and its residues
+            n = (low + secrets.randbelow(high - low)) | 1
+            residues = _small_residues(n, primes)
+
+            while n < high:
+                composite = _sieve_window(primes, residues, window)
+
+                for k in composite.search(bitarray("0")):
+                    candidate = n + 2 * k
+                    if candidate >= high:
+                        break
+                    candidates += 1
+                    if gcd(e, candidate - 1) != 1:
+                        continue
+                    tests += 1
+                    if is_prime(candidate, "miller-rabin"):
+                        return candidate
+
+                # Moving to the next window
+                n += 2 * window
+                residues = _shift_residues(primes, residues, 2 * window)
+    finally:
+        if stats is not None:
+            stats["candidates"] = stats.get("candidates", 0) + candidates
+            stats["tests"] = stats.get("tests", 0) + tests
+
+
 
 def gen_rand_int32(size: int, seed: int) -> int:
     """
@@ -212,7 +746,7 @@ def gen_rand_int32(size: int, seed: int) -> int:
     if size > 32:
         size = 32    # Size limit is 32 bits 
     # We define the LGC constants 
-    modulus = mod_exp(2, 32, 1)
+    modulus = 1 << 32
     multiplier = 1664525
     increment = 1013904223
     
@@ -221,7 +755,7 @@ def gen_rand_int32(size: int, seed: int) -> int:
     state = (multiplier * state + increment) % modulus
     
     # We return the number limited to the desired bit length 
-    return state >> (32 - bits)
+    return state >> (32 - size)
 
 def gen_rand_prime32(size: int, seed: int) -> int:
     """
@@ -241,16 +775,163 @@ def gen_rand_prime32(size: int, seed: int) -> int:
     """
     
     # We generate a random integer first
-    n = randint(size ,init_seed())
+    n = gen_rand_int32(size, seed)
     
     # since n initself is random, by increamenting we get the nearest upper bounding prime
     while is_prime(n, "fermat") == False:
-        n=+1
+        n += 1
 
     return n
     
 
 
+def _iroot(n: int, k: int) -> int:
+    """
+    The integer k'th root of n >= 0, i.e the largest x such that x^k <= n, by Newton's method
+    """
+    if n < 2:
+        return n
+
+    # We start from a power of 2 above the root, the iterations then decrease towards it
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = euclidian_div((k - 1) * x + euclidian_div(n, x ** (k - 1))[0], k)[0]
+        if y >= x:
+            return x
+        x = y
+
+
+def gen_rsa_prime(bits: int, e: int = 65537, low: int = None) -> int:
+    """
+    Returns a random prime p of exactly the given size, suitable for an RSA key with the 
+    public exponent e, i.e with gcd(e, p - 1) = 1. This is the key generation pipeline:
+    every candidate is a fresh odd integer of the right size, drawn from the cryptographically
+    secure generator of the operating system (secrets). Those with a small prime factor are 
+    rejected by a single gcd (passes_primorial_gcd), then the condition on e is checked, and 
+    only the survivors go through the Miller-Rabin test. From 32 bits, the incremental sieve search is used instead,
+    which sieves whole windows of candidates.
+
+    Args:
+        - bits (int): the size in bits of the prime, >= 2
+        - e (int): the public exponent 
+        - low (int): lower bound of the prime, 2^(bits - 1) by default
+
+    Raises:
+        - ValueError: if the size is smaller than 2 bits
+
+    Returns: 
+        - p (int): a random prime of the given size 
+
+    Example: 
+        >>> gen_rsa_prime(16)
+            52879
+    """
+    if bits < 2:
+        raise ValueError("Primes have at least 2 bits")
+
+    if bits >= 32:
+        return incremental_prime_search(bits, e, low)
+
+    if low is None:
+        low = 1 << (bits - 1)
+    high = 1 << bits
+
+    while True:
+        # Random odd candidate in [low, 2^bits)
+        n = (low + secrets.randbelow(high - low)) | 1
+        if n >= high:
+            continue
+
+        if passes_primorial_gcd(n) and gcd(e, n - 1) == 1 and is_prime(n, "miller-rabin"):
+            return n
+
+
+def generate_keypair(bits: int, e: int = 65537) -> RSAPrivateKey:
+    """
+    Generates an RSA key with a modulus n = p * q of the given size. The primes are drawn 
+    through the pipeline of gen_rsa_prime, with their two leading bits set so that n always 
+    has the full size, and far enough from each other (|p - q| > 2^(bits/2 - 100), as 
+    required by FIPS 186) for n not to be factored by Fermat's method. The private key holds 
+    the precomputed CRT parameters, and the public key is given by its public_key method.
+
+    Args:
+        - bits (int): the size in bits of the modulus, >= 32
+        - e (int): the public exponent, odd and >= 3
+
+    Raises:
+        - ValueError: if the modulus is too small or the public exponent is invalid
+
+    Returns: 
+        - key (RSAPrivateKey): the private key 
+
+    Example: 
+        >>> key = generate_keypair(2048)
+        >>> key.n.bit_length(), key.e
+            (2048, 65537)
+    """
+    if bits < 32:
+        raise ValueError("The modulus is too small")
+    if e < 3 or e & 1 == 0:
+        raise ValueError("The public exponent has to be odd and >= 3")
+
+    p_bits = bits - bits // 2
+    q_bits = bits // 2
+    min_distance = 1 << max(bits // 2 - 100, 0)
+
+    p = gen_rsa_prime(p_bits, e, 3 << (p_bits - 2))
+    while True:
+        q = gen_rsa_prime(q_bits, e, 3 << (q_bits - 2))
+        if abs(p - q) > min_distance:
+            break
+
+    return RSAPrivateKey(p, q, e)
+
+
+def generate_multiprime_keypair(bits: int, k: int = 3, e: int = 65537) -> RSAPrivateKey:
+    """
+    Generates a multi-prime RSA key, i.e with a modulus n of the given size which is the product
+    of k distinct primes of about bits / k bits. Each prime of b bits is drawn above 2^(b - 1/k), 
+    so that the product always has the full size. The private key holds the precomputed CRT 
+    parameters, and the public key is given by its public_key method.
+
+    Args:
+        - bits (int): the size in bits of the modulus
+        - k (int): the number of prime factors (3 to 5 in practice)
+        - e (int): the public exponent 
+
+    Raises:
+        - ValueError: if k < 2, or if the primes would have less than 16 bits
+
+    Returns: 
+        - key (RSAPrivateKey): the private key 
+
+    Example: 
+        >>> key = generate_multiprime_keypair(1024, 3)
+        >>> len(key.primes), key.n.bit_length()
+            (3, 1024)
+    """
+    if k < 2:
+        raise ValueError("An RSA modulus has at least 2 prime factors")
+    if bits // k < 16:
+        raise ValueError("The modulus is too small for that number of primes")
+
+    # The sizes of the primes, summing up to the size of the modulus
+    sizes = [bits // k] * k
+    for i in range(bits % k):
+        sizes[i] += 1
+
+    primes = []
+    while len(primes) < k:
+        b = sizes[len(primes)]
+        # 2^(b - 1/k) rounded up, i.e the k'th root of 2^(kb - 1)
+        low = _iroot((1 << (k * b - 1)) - 1, k) + 1
+        p = gen_rsa_prime(b, e, low)
+        if p not in primes:
+            primes.append(p)
+
+    return RSAPrivateKey(primes[0], primes[1], e, extra_primes = primes[2:])
+
+
 def num_of_primes(n: int, formula = "gauss") -> int:
     """
     Give the number of primes under a given integer using the formula
@@ -288,14 +969,15 @@ def main():
     print("We use the various methods defined in our functions in order to compare")
     # The integers to check:
     integers = [11, 2, 3, 7753, 15, 2 ** 11 -1, 1559, 18233, 35419, 1000000, 5, 123142231, 2 ** 12 - 1]
-    methods = ["naive", "fermat", "miller-rabin"] 
+    methods = ["naive", "fermat", "miller-rabin", "bpsw"] 
     
     # We put down the primality check methods to compare
     for method in methods:
          start_time = time.time()
          print(f"===== The method used is: " + method + "=====")
-         for i, integer in enumerate(integers):
-             if is_prime(integer) == True:
+         # The whole list is tested at once, through the batch small-prime filter
+         for i, prime in enumerate(is_prime_many(integers, method)):
+             if prime == True:
                  print(f"The {i + 1}'th integer is prime")
              else: 
                  print(f"The {i + 1}'th integer is not prime")
@@ -313,15 +995,15 @@ def main():
     gauss_ratios = []
     legendre_ratios = []
     
-    k = 3 # The power of 10 we want to enumate the primes up to 
+    k = 9 # The power of 10 we want to enumate the primes up to 
     # Populate table
     for n in range(1, k):
         num = 10 ** n
         gauss = num_of_primes(num, "gauss")
         legendre = num_of_primes(num, "legendre")
 
-        # We use the seive technique to enumerate the primes, more memory efficient since we utilize bit arrays
-        real_num = sieve_with_bitarray(num)
+        # We use the segmented seive to enumerate the primes, bounded memory since we utilize bit arrays of the odd numbers, segment by segment
+        real_num = count_primes(num)
 
         ratio1 = gauss / real_num
         ratio2 = legendre / real_num
@@ -1,69 +1,224 @@
 """
 This modules contains utilities and helper functions for text encryption using the RSA.
-We build these functions from scratch, while they do exist in modules like pycryptodome, 
-take (bytes_to_long) for example. However to deepen understanding for the functionalities for 
+We build these functions from scratch, while they do exist in modules like pycryptodome,
+take (bytes_to_long) for example. However to deepen understanding for the functionalities for
 the RSA cryptosystem and the entire logic of it, we implement these utils ourselves using only
 built in functions in Python.
 
-Function: 
+The conversions between bytes and integers are done by int.from_bytes / int.to_bytes (big endian),
+which work on whole buffers at C speed. A message longer than the modulus is cut into blocks of a
+fixed size, as memoryview slices of the input: bytes, bytearray, memoryview and mmap inputs are
+never copied (only str messages are encoded first), so a large file mapped with mmap can be cut
+into integers without being read into a python bytes object.
+
+Function:
+    - to_buffer(data) : a memoryview of bytes over a message, without copy for bytes-like inputs
+    - text_to_int(data) / int_to_text(value, length) : a message to an integer and back
+    - int_to_bytes(value, length) : an integer to its big endian bytes
+    - block_size(n) : the size in bytes of the blocks of data below the modulus n
+    - iter_blocks(data, size) : the blocks of a message, as memoryview slices
+    - bytes_to_ints(data, size) / ints_to_bytes(values, size, length) : a message to block integers and back
     - long_to_bytes : converts a text into an integer to encrypt using the RSA
     - bytes_to_long : converts an integer back to its utf-8 text encoding
 """
 
+def to_buffer(data) -> memoryview:
+    """
+    Returns a flat memoryview of unsigned bytes over a message. For bytes, bytearray, memoryview
+    and mmap objects (and any object with the buffer protocol) the memory is shared, not copied.
+    A str is encoded in utf-8 first.
+
+    Args:
+        data (str | bytes-like) : the message
+
+    Returns:
+        view (memoryview) : the bytes of the message
+
+    Example:
+        >>> bytes(to_buffer("Hé"))
+            b'H\\xc3\\xa9'
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    view = memoryview(data)
+    if view.format != "B" or view.ndim != 1:
+        view = view.cast("B")
+    return view
+
+
+def text_to_int(data) -> int:
+    """
+    Converts a message (str or bytes-like) into an integer, its bytes read in big endian order
+
+    Example:
+        >>> text_to_int("Hello, World!")
+            5735816763073854918203775149089
+    """
+    return int.from_bytes(to_buffer(data), "big")
+
+
+def int_to_bytes(value: int, length: int = None) -> bytes:
+    """
+    Converts an integer >= 0 into its big endian bytes, on 'length' bytes if given (with leading
+    zeros), otherwise on the least number of bytes
+
+    Raises:
+        - ValueError: if the integer is negative or doesn't fit in the given length
+
+    Example:
+        >>> int_to_bytes(258), int_to_bytes(258, 4)
+            (b'\\x01\\x02', b'\\x00\\x00\\x01\\x02')
+    """
+    if value < 0:
+        raise ValueError("Only integers >= 0 are converted to bytes")
+    if length is None:
+        length = (value.bit_length() + 7) >> 3
+    try:
+        return value.to_bytes(length, "big")
+    except OverflowError:
+        raise ValueError(f"The integer doesn't fit in {length} bytes")
+
+
+def int_to_text(value: int, length: int = None) -> str:
+    """
+    Converts an integer back to the utf-8 text it was made of by text_to_int. The leading zero
+    bytes of a message are only restored when its length (in bytes) is given
+
+    Example:
+        >>> int_to_text(5735816763073854918203775149089)
+            'Hello, World!'
+    """
+    return int_to_bytes(value, length).decode("utf-8")
+
+
+def block_size(n: int) -> int:
+    """
+    The size in bytes of the blocks of a message to encrypt modulo n: the largest size for which
+    every block, read as an integer, is below n
+
+    Example:
+        >>> block_size(2 ** 2048 - 1), block_size(2 ** 2048 + 1)
+            (255, 256)
+    """
+    size = (n.bit_length() - 1) >> 3
+    if size < 1:
+        raise ValueError("The modulus is too small to hold a byte")
+    return size
+
+
+def iter_blocks(data, size: int):
+    """
+    Cuts a message into consecutive blocks of 'size' bytes (the last one can be shorter), as
+    memoryview slices of the message: no byte is copied
+
+    Example:
+        >>> [bytes(block) for block in iter_blocks(b"abcdefg", 3)]
+            [b'abc', b'def', b'g']
+    """
+    if size < 1:
+        raise ValueError("The blocks have at least 1 byte")
+    view = to_buffer(data)
+    for start in range(0, len(view), size):
+        yield view[start:start + size]
+
+
+def bytes_to_ints(data, size: int) -> list:
+    """
+    Converts a message into the integers of its blocks of 'size' bytes, see iter_blocks. For the
+    RSA, size = block_size(n) so that every integer is below the modulus n
+
+    Example:
+        >>> bytes_to_ints(b"abcdefg", 3)
+            [6382179, 6579558, 103]
+    """
+    return [int.from_bytes(block, "big") for block in iter_blocks(data, size)]
+
+
+def ints_to_bytes(values, size: int, length: int = None) -> bytearray:
+    """
+    The reverse of bytes_to_ints: writes the integers of the blocks into a single preallocated
+    bytearray, every block on 'size' bytes but the last one, which takes the remaining bytes of
+    the message of the given length
+
+    Args:
+        - values (list) : the integers of the blocks
+        - size (int) : the size of the blocks in bytes
+        - length (int) : the length of the message, size * len(values) by default
+
+    Raises:
+        - ValueError: if the length doesn't match the number of blocks, or a block doesn't fit
+
+    Returns:
+        - data (bytearray) : the message
+
+    Example:
+        >>> ints_to_bytes([6382179, 6579558, 103], 3, 7)
+            bytearray(b'abcdefg')
+    """
+    values = list(values)
+    if length is None:
+        length = size * len(values)
+    if -(-length // size) != len(values):
+        raise ValueError(f"A message of {length} bytes doesn't have {len(values)} blocks of {size} bytes")
+
+    data = bytearray(length)
+    view = memoryview(data)
+    for i, value in enumerate(values):
+        start = i * size
+        end = min(start + size, length)
+        view[start:end] = int_to_bytes(value, end - start)
+    return data
+
+
 def long_to_bytes(txt: str) -> int:
     """
-    This function converts a text message into an integer by slicing it into bytes, 
-    and giving each the correspoding numerical value. Since this is for edcuational 
-    purpposes, we build it ourselves even though it exists in libraries like pycryptodome
+    This function converts a text message into an integer by slicing it into bytes,
+    and reading them as the digits of a number in base 256 (see text_to_int). Unlike
+    joining the decimal ASCII codes, this is invertible by bytes_to_long
 
     Args:
-        txt (str) : the text message we want to encrypt using the RSA 
-    
-    Returns: 
+        txt (str) : the text message we want to encrypt using the RSA
+
+    Returns:
         int_txt (int) : the integer resulting from trasforming the given text into bytes
 
-    Example: 
+    Example:
         >>> long_to_bytes("Hello, World!")
-            7210110810811144328711111410810033
+            5735816763073854918203775149089
     """
-    
-    int_txt = ''.join([str(ord(i)) for i in txt])   # Simply we join the ASCII of composing characters to get an integer
-    
-    return int_txt
+    return text_to_int(txt)
 
 def bytes_to_long(value: int) -> str:
     """
-    This function does the opposite convertion of long_to_bytes. i.e given an integer it converts back 
-    to a string (usually after the RSA decryption), with each carachter correspoding the asccii value of the the byte in the same position 
+    This function does the opposite convertion of long_to_bytes. i.e given an integer it converts back
+    to a string (usually after the RSA decryption), with each byte of the integer in base 256
+    being a byte of the utf-8 text
 
-    Args: 
-        value (int): The message in its integer form 
+    Args:
+        value (int): The message in its integer form
 
-    Returns: 
-        text_msg (int): The message back into its text (ASCII) form 
+    Returns:
+        text_msg (int): The message back into its text form
 
-    Example: 
-        >>> bytes_to_long(7210110810811144328711111410810033)
+    Example:
+        >>> bytes_to_long(5735816763073854918203775149089)
             Hello, World!
     """
-
-    # We put down the binary representation of our integer information 
-    byte_array = value.to_bytes((value.bit_length() + 7) // 8, 'big')
-    
-    # Convert each byte to its ASCII representation
-    ascii_string = ''.join(chr(byte) for byte in byte_array)
-    
-    return ascii_string 
+    return int_to_text(value)
 
 def main():
     print("===== the string /Hello, World!/ in an integer format")
     print(long_to_bytes("Hello, World!"))
 
     print("===== Showing that we retreive the integer information back ======")
-    print(bytes_to_long(7210110810811144328711111410810033))
+    print(bytes_to_long(5735816763073854918203775149089))
 
+    print("===== A longer message cut into blocks below a 64 bits modulus ======")
+    blocks = bytes_to_ints("Hello, World! " * 3, block_size(2 ** 64 - 59))
+    print(blocks)
+    print(ints_to_bytes(blocks, block_size(2 ** 64 - 59), 42).decode("utf-8"))
 
-    return 
+    return
 
 if __name__ == "__main__":
     main()